@@ -0,0 +1,226 @@
+# analisis_incremental.py
+"""
+Análisis semántico incremental por función.
+
+El cuerpo de cada función (y el de main) es una unidad: todo lo que su
+análisis produce queda dentro de su propio ámbito. Para cada unidad se
+guarda el resultado (su subárbol ya anotado, sus errores, las entradas del
+historial de ámbitos que abrió, las llamadas que hace y sus declaraciones
+y referencias) junto con sus dependencias: los nombres que resolvió en el
+ámbito global (o que no encontró) y la firma con la que los encontró.
+
+La clave de una unidad es su texto fuente (desde su primer token hasta el
+primer token de la siguiente declaración de nivel superior) y la posición
+en que empieza: con el mismo texto en la misma posición, el analizador
+sintáctico produce el mismo subárbol. Comparar texto es mucho más barato
+que recorrer el árbol, de modo que una unidad reutilizada no cuesta nada
+por nodo: su subárbol anotado sustituye al recién construido.
+
+Tras una edición solo se re-analizan los cuerpos cuyo texto o posición
+cambió y los de las funciones que usan un símbolo global cuya firma cambió.
+"""
+from analizador_sintactico import ASTNodeType
+from analizador_semantico import SymbolTable
+from indice_posiciones import line_starts
+
+# Declaraciones de nivel superior que forman una unidad
+UNIT_TYPES = (ASTNodeType.FUNCTION_DECLARATION, ASTNodeType.MAIN)
+
+
+def _first_position(node):
+    """(línea, columna) del primer token de una declaración (el hijo más a la izquierda)."""
+    position = None
+    while node is not None:
+        if node.line is not None and node.column is not None:
+            candidate = (node.line, node.column)
+            if position is None or candidate < position:
+                position = candidate
+        node = node.children[0] if node.children else None
+    return position
+
+
+def symbol_signature(info):
+    """Lo que el análisis de un cuerpo usa de un símbolo global (None si no existe)."""
+    if info is None:
+        return None
+    param_types = info.get('param_types')
+    return (info['type'], None if param_types is None else tuple(param_types), info.get('return_type'))
+
+
+def dependencies_hold(lookup, result):
+    """Indica si las dependencias de 'result' siguen resolviendo a la misma firma."""
+    for name, signature in result.dependencies.items():
+        if symbol_signature(lookup(name)) != signature:
+            return False
+    return True
+
+
+def replay_references(analyzer, references):
+    """
+    Añade las referencias guardadas de una unidad. Las que apuntan a un
+    símbolo global se vuelven a resolver por nombre: la firma es la misma
+    (dependencies_hold), pero su declaración puede haberse movido dentro de
+    su línea sin que cambie la clave de la unidad.
+    """
+    global_name = analyzer.symbol_table.scope_names[SymbolTable.GLOBAL_SCOPE]
+    for key, line, column, kind in references:
+        if key[1] == global_name:
+            info = analyzer.symbol_table.lookup(key[0])
+            if info is not None:
+                key = (key[0], global_name, info['line'], info['column'])
+        analyzer.references.append((key, line, column, kind))
+
+
+def _analyze_in_scope(analyzer, scope_base, visit_body):
+    analyzer.symbol_table.enter_scope(scope_base)
+    visit_body()
+    analyzer.symbol_table.exit_scope()
+
+
+def record_unit(analyzer, node, scope_base, visit_body):
+    """Analiza una unidad anotando sus dependencias y devuelve su UnitResult."""
+    symbol_table = analyzer.symbol_table
+    errors_before = len(analyzer.errors)
+    history_before = len(symbol_table.scope_history)
+    calls_before = len(analyzer.calls)
+    declarations_before = len(analyzer.declarations)
+    references_before = len(analyzer.references)
+
+    # Mientras se analiza el cuerpo, cada búsqueda que no resuelve a un
+    # símbolo local se anota como dependencia
+    dependencies = {}
+    bindings = symbol_table.bindings
+    global_scope = SymbolTable.GLOBAL_SCOPE
+    unrecorded_lookup = symbol_table.lookup
+
+    def recording_lookup(name):
+        info = unrecorded_lookup(name)
+        if name not in dependencies:
+            stack = bindings.get(name)
+            if not stack or stack[-1][0] == global_scope:
+                dependencies[name] = symbol_signature(info)
+        return info
+
+    symbol_table.lookup = recording_lookup
+    try:
+        _analyze_in_scope(analyzer, scope_base, visit_body)
+    finally:
+        del symbol_table.lookup
+
+    return UnitResult(
+        node,
+        dependencies,
+        analyzer.errors[errors_before:],
+        [dict(entry) for entry in symbol_table.scope_history[history_before:]],
+        analyzer.calls[calls_before:],
+        analyzer.declarations[declarations_before:],
+        analyzer.references[references_before:],
+    )
+
+
+class UnitResult:
+    """Resultado guardado del análisis de una unidad."""
+    def __init__(self, node, dependencies, errors, history, calls, declarations, references):
+        # Subárbol anotado: se reutiliza tal cual en los AST siguientes
+        self.node = node
+        # nombre -> firma con la que se resolvió en el ámbito global
+        self.dependencies = dependencies
+        self.errors = errors
+        # Copias de las entradas del historial de ámbitos que abrió la unidad
+        self.history = history
+        # Llamadas (función que llama, función llamada) para el grafo de llamadas
+        self.calls = calls
+        # Declaraciones y referencias de la unidad para el índice de
+        # referencias cruzadas (ver replay_references)
+        self.declarations = declarations
+        self.references = references
+
+
+class FunctionAnalysisCache:
+    """
+    Caché de unidades entre compilaciones de un mismo documento. Se pasa a
+    SemanticAnalyzer(unit_cache=...) y se usa cuando analyze() recibe el
+    código fuente; al terminar cada análisis se descartan las unidades que
+    ya no aparecen en el programa.
+    """
+    def __init__(self):
+        self.units = {}
+        self.used = {}
+        # id(nodo de la unidad) -> (clave, nodo padre, posición en el padre)
+        self.slots = {}
+        # Estadísticas del último análisis
+        self.reused = 0
+        self.analyzed = 0
+
+    def begin(self, program, source):
+        """Calcula la clave de cada unidad del programa que se va a analizar."""
+        self.used = {}
+        self.slots = {}
+        self.reused = 0
+        self.analyzed = 0
+        if program is None or program.type is not ASTNodeType.PROGRAM:
+            return
+
+        starts = line_starts(source)
+        children = program.children
+        offsets = []
+        for child in children:
+            position = None if child is None else _first_position(child)
+            if position is None:
+                # Sin posiciones no se pueden delimitar las unidades
+                return
+            line, column = position
+            offsets.append(starts[line - 1] + column - 1)
+        offsets.append(len(source))
+
+        for index, child in enumerate(children):
+            if child.type in UNIT_TYPES:
+                key = (child.line, child.column, source[offsets[index]:offsets[index + 1]])
+                self.slots[id(child)] = (key, program, index)
+
+    def finish(self):
+        self.units = self.used
+        self.used = {}
+        self.slots = {}
+
+    def analyze(self, analyzer, node, scope_base, visit_body):
+        """
+        Equivale a enter_scope(scope_base); visit_body(); exit_scope(),
+        reutilizando el resultado guardado si sigue siendo válido.
+        """
+        slot = self.slots.get(id(node))
+        if slot is None:
+            _analyze_in_scope(analyzer, scope_base, visit_body)
+            return
+        key, parent, index = slot
+
+        result = self.units.get(key)
+        # Si sus errores no caben en el presupuesto se re-analiza, para que el
+        # análisis se detenga en el mismo punto que sin caché
+        if (result is not None and analyzer.diagnostics.has_room(len(result.errors))
+                and dependencies_hold(analyzer.symbol_table.lookup, result)):
+            self.used[key] = result
+            self.reused += 1
+            parent.children[index] = result.node
+            for error in result.errors:
+                analyzer.diagnostics.add(error)
+            analyzer.calls.extend(result.calls)
+            analyzer.declarations.extend(result.declarations)
+            replay_references(analyzer, result.references)
+            # Copias: el último diccionario del historial recibe después los
+            # símbolos globales definidos a continuación
+            analyzer.symbol_table.scope_history.extend(dict(entry) for entry in result.history)
+            return
+
+        self.analyzed += 1
+        self.used[key] = record_unit(analyzer, node, scope_base, visit_body)
+
+    def key_for(self, node):
+        """Clave de una unidad del programa en análisis (None si no tiene)."""
+        slot = self.slots.get(id(node))
+        return None if slot is None else slot[0]
+
+    def store(self, key, result):
+        """Añade un resultado calculado fuera del análisis (p. ej. en otro proceso)."""
+        self.units[key] = result
+
@@ -0,0 +1,178 @@
+# analisis_paralelo.py
+"""
+Análisis semántico de los cuerpos de función en un pool de procesos.
+
+Fase 1 (proceso principal): se recorren las declaraciones de nivel superior
+y se reúnen en una tabla de solo lectura los símbolos globales (variables y
+firmas de función) junto con la posición en que se declararon. Un cuerpo
+solo ve los globales declarados antes que él, igual que en el recorrido
+secuencial, así que la tabla guarda para cada nombre su primera declaración.
+
+Fase 2 (pool): cada proceso analiza un lote de cuerpos consultando esa
+tabla y devuelve, por cuerpo, su UnitResult (errores, historial de ámbitos,
+dependencias, llamadas, referencias) y los subárboles anotados
+serializados en un único bloque.
+
+Fase 3 (proceso principal): los resultados se guardan en la caché de
+unidades y el recorrido secuencial habitual los reutiliza en orden de
+aparición, por lo que errores, anotaciones y scope_history salen idénticos
+a los del análisis secuencial.
+"""
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from analizador_sintactico import ASTNode, ASTNodeType, PARALLEL_MIN_FUNCTIONS
+from analizador_semantico import SymbolTable, SemanticAnalyzer
+from analisis_incremental import UNIT_TYPES, UnitResult, dependencies_hold, record_unit
+
+
+def collect_global_symbols(program):
+    """
+    Fase 1: nombre -> (posición en el programa, información) de la primera
+    declaración global de cada nombre (las siguientes son redefiniciones).
+    La línea y la columna sirven para el índice de referencias.
+    """
+    symbols = {}
+    for index, child in enumerate(program.children):
+        if child is None:
+            continue
+        if child.type == ASTNodeType.DECLARATION:
+            for declared in child.children:
+                var_node = declared.children[0] if declared.type == ASTNodeType.ASSIGNMENT else declared
+                if var_node.value not in symbols:
+                    symbols[var_node.value] = (index, {
+                        'type': child.value, 'line': var_node.line, 'column': var_node.column,
+                    })
+        elif child.type == ASTNodeType.FUNCTION_DECLARATION:
+            if child.value not in symbols:
+                param_types = [param.children[0].value for param in child.children[1].children]
+                symbols[child.value] = (index, {
+                    'type': 'function',
+                    'line': child.line,
+                    'column': child.column,
+                    'param_types': param_types,
+                    'return_type': child.children[0].value,
+                })
+    return symbols
+
+
+def global_lookup(symbols, position):
+    """Búsqueda en la tabla global tal como la ve el cuerpo en 'position'."""
+    def lookup(name):
+        entry = symbols.get(name)
+        if entry is not None and entry[0] <= position:
+            return entry[1]
+        return None
+    return lookup
+
+
+class _UnitSymbolTable(SymbolTable):
+    """
+    Tabla de símbolos de un proceso del pool: los símbolos locales se
+    gestionan como siempre y los globales se leen de la tabla de la fase 1.
+    Las definiciones en el ámbito global ya las hizo el proceso principal.
+    """
+    def __init__(self, global_symbols, position):
+        super().__init__()
+        self.global_lookup = global_lookup(global_symbols, position)
+
+    def define(self, name, symbol_type, line, column, extra_info=None):
+        if self.current_scope_id() == self.GLOBAL_SCOPE:
+            return None
+        return super().define(name, symbol_type, line, column, extra_info)
+
+    def lookup(self, name):
+        stack = self.bindings.get(name)
+        if stack:
+            return stack[-1][1]
+        return self.global_lookup(name)
+
+
+class _UnitRecorder:
+    """Sustituye a la caché de unidades en el pool: solo graba el resultado."""
+    def __init__(self):
+        self.result = None
+
+    def analyze(self, analyzer, node, scope_base, visit_body):
+        self.result = record_unit(analyzer, node, scope_base, visit_body)
+
+
+# Programa y tabla global compartidos con los procesos del pool
+_worker_program = None
+_worker_symbols = None
+
+def _init_semantic_worker(program, symbols):
+    """
+    Inicializa un proceso del pool. Con 'fork' el programa se hereda sin
+    copiar; con 'spawn' se envía una vez por proceso.
+    """
+    global _worker_program, _worker_symbols
+    _worker_program = program
+    _worker_symbols = symbols
+
+def _analyze_unit_chunk(positions):
+    """
+    Trabajo de un proceso: analiza los cuerpos de las posiciones indicadas.
+    Los subárboles anotados vuelven serializados en un único bloque.
+    """
+    from cache_ast import serialize_ast  # Import local: cache_ast importa el analizador sintáctico
+
+    results = []
+    container = ASTNode(ASTNodeType.PROGRAM)
+    for position in positions:
+        node = _worker_program.children[position]
+        recorder = _UnitRecorder()
+        # Sin presupuesto: el proceso principal lo aplica al reutilizar los resultados
+        analyzer = SemanticAnalyzer(unit_cache=recorder, max_errors=None)
+        analyzer.symbol_table = _UnitSymbolTable(_worker_symbols, position)
+        analyzer.visit(node)
+
+        result = recorder.result
+        results.append((position, result.dependencies, result.errors, result.history, result.calls,
+                        result.declarations, result.references))
+        container.children.append(node)
+    return results, serialize_ast(container)
+
+def analyze_units_parallel(program, unit_cache, max_workers=None):
+    """
+    Analiza en un pool de procesos los cuerpos del programa que no tengan
+    ya un resultado válido en 'unit_cache' (cuyo begin() ya se llamó) y
+    guarda allí los resultados. Devuelve el número de cuerpos analizados.
+    """
+    from cache_ast import deserialize_ast
+
+    workers = max_workers or os.cpu_count() or 1
+    if workers < 2 or program is None or program.type is not ASTNodeType.PROGRAM:
+        return 0
+
+    symbols = collect_global_symbols(program)
+    pending = []
+    for position, child in enumerate(program.children):
+        if child is None or child.type not in UNIT_TYPES:
+            continue
+        key = unit_cache.key_for(child)
+        if key is None:
+            continue
+        cached = unit_cache.units.get(key)
+        if cached is not None and dependencies_hold(global_lookup(symbols, position), cached):
+            continue
+        pending.append(position)
+
+    if len(pending) < PARALLEL_MIN_FUNCTIONS:
+        return 0
+
+    # Varios lotes por proceso para repartir bien cuerpos de distinto tamaño
+    chunk_count = workers * 4
+    chunks = [[] for _ in range(chunk_count)]
+    for n, position in enumerate(pending):
+        chunks[n * chunk_count // len(pending)].append(position)
+
+    children = program.children
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_semantic_worker,
+                             initargs=(program, symbols)) as executor:
+        for results, data in executor.map(_analyze_unit_chunk, [c for c in chunks if c]):
+            container = deserialize_ast(data)
+            for (position, *fields), node in zip(results, container.children):
+                key = unit_cache.key_for(children[position])
+                unit_cache.store(key, UnitResult(node, *fields))
+    return len(pending)
@@ -1,90 +1,278 @@
 # analizador_semantico.py
 from platform import node
 from analizador_sintactico import ASTNodeType
+from renderizador_ast import render_ast, SemanticHTMLEmitter
+from visitante import ASTVisitor
+from grafo_llamadas import CallGraph, MAIN, declared_functions
+from referencias import CrossReferenceIndex, READ, WRITE, CALL
+from tipos import (BINARY_RESULT, UNARY_RESULT, OPERATOR_KIND, ARITHMETIC, COMPARISON, LOGICAL,
+                   CONDITION_TYPES, ACCEPTED_DESCRIPTION, INT, FLOAT, STRING, BOOLEAN, ERROR, FUNCTION,
+                   is_assignable)
+from diagnosticos import (Diagnostic, DiagnosticSink, ErrorBudgetExceeded, DEFAULT_MAX_ERRORS,
+    SYMBOL_REDEFINED, UNDECLARED_VARIABLE, INCOMPATIBLE_ASSIGNMENT, INCOMPATIBLE_ARITHMETIC,
+    INCOMPATIBLE_COMPARISON, INVALID_LOGICAL_OPERANDS, INVALID_UNARY_OPERAND, INVALID_CONDITION,
+    UNDECLARED_INPUT_VARIABLE, INVALID_SWITCH_TYPE, DUPLICATE_CASE, DUPLICATE_DEFAULT,
+    RETURN_OUTSIDE_FUNCTION, EMPTY_RETURN, INCOMPATIBLE_RETURN, UNDECLARED_FUNCTION, NOT_A_FUNCTION,
+    WRONG_ARGUMENT_COUNT, INCOMPATIBLE_ARGUMENT)
 
 class SymbolTable:
     """
     Tabla de símbolos para rastrear variables y sus tipos.
-    asumimos un único ámbito global dentro de 'main'.
+
+    Cada nombre tiene su propia pila de enlaces (ámbito, información), de
+    modo que lookup, define y exit_scope no dependen de la profundidad de
+    anidamiento: la búsqueda mira la cima de la pila del nombre y al salir
+    de un ámbito se deshacen solo los nombres que ese ámbito definió (su
+    registro de deshacer). Los nombres de ámbito ("main,if_block") se
+    internan y se construyen una sola vez por combinación padre/base.
     """
+    GLOBAL_SCOPE = 0
+
     def __init__(self):
-        # La pila de ámbitos. El primero es siempre el ámbito global.
-        self.scopes = [{'__name__': 'global'}]
-        # Historial de ámbitos
+        # Nombres de ámbito internados: id -> nombre completo
+        self.scope_names = ['global']
+        # (id del ámbito padre, nombre base) -> id del ámbito
+        self.scope_ids = {}
+
+        # Pila de ámbitos activos: (id del ámbito, nombres definidos en él)
+        self.scopes = [(self.GLOBAL_SCOPE, [])]
+        # nombre -> pila de (id del ámbito, información del símbolo)
+        self.bindings = {}
+
+        # Historial de ámbitos para to_dict(): un diccionario por ámbito
+        # abierto, en orden de entrada. Reproduce el formato original, en
+        # el que cada símbolo también se anota en el último ámbito abierto.
         self.scope_history = [{'__name__': 'global'}]
+        # Diccionario del historial de cada ámbito activo (None para global,
+        # cuyos símbolos solo van al historial a través del último ámbito)
+        self.history_stack = [None]
 
     def enter_scope(self, base_name):
-        parent_scope_name = self.scopes[-1]['__name__']
-        
-        if parent_scope_name == 'global':
-            new_scope_name = base_name
-        else:
-            new_scope_name = f"{parent_scope_name},{base_name}"
-        
-        new_scope = {'__name__': new_scope_name}
-        self.scopes.append(new_scope)
-        self.scope_history.append(new_scope)
+        parent_id = self.scopes[-1][0]
+        key = (parent_id, base_name)
+        scope_id = self.scope_ids.get(key)
+        if scope_id is None:
+            if parent_id == self.GLOBAL_SCOPE:
+                new_scope_name = base_name
+            else:
+                new_scope_name = f"{self.scope_names[parent_id]},{base_name}"
+            scope_id = len(self.scope_names)
+            self.scope_names.append(new_scope_name)
+            self.scope_ids[key] = scope_id
+
+        self.scopes.append((scope_id, []))
+        history_entry = {'__name__': self.scope_names[scope_id]}
+        self.scope_history.append(history_entry)
+        self.history_stack.append(history_entry)
 
     def exit_scope(self):
-        """Sale del ámbito actual."""
+        """Sale del ámbito actual deshaciendo sus definiciones."""
         if len(self.scopes) > 1:
-            self.scopes.pop()
+            _, defined_names = self.scopes.pop()
+            self.history_stack.pop()
+            for name in defined_names:
+                stack = self.bindings[name]
+                stack.pop()
+                if not stack:
+                    del self.bindings[name]
+
+    def current_scope_id(self):
+        return self.scopes[-1][0]
 
+    def current_scope_name(self):
+        return self.scope_names[self.scopes[-1][0]]
 
     def define(self, name, symbol_type, line, column, extra_info=None):
         """Define un nuevo símbolo en el ámbito ACTUAL."""
-        current_scope_for_history = self.scope_history[-1]
-        current_scope_for_lookup = self.scopes[-1]
-        
-        if name in current_scope_for_lookup:
-            return (f"Error Semántico en línea {line}, columna {column}: "
-                    f"El símbolo '{name}' ya ha sido declarado en el ámbito '{current_scope_for_lookup['__name__']}'.")
+        scope_id, defined_names = self.scopes[-1]
+        stack = self.bindings.get(name)
+
+        # Si el nombre ya está en este ámbito, su enlace está en la cima
+        if stack and stack[-1][0] == scope_id:
+            return Diagnostic(SYMBOL_REDEFINED, line, column, (name, self.scope_names[scope_id]))
         
         symbol_info = {'type': symbol_type, 'line': line, 'column': column}
         
         if extra_info:
             symbol_info.update(extra_info) # Para 'value', 'param_types', etc.
-        
-        current_scope_for_lookup[name] = symbol_info
-        current_scope_for_history[name] = symbol_info
+
+        if stack is None:
+            self.bindings[name] = [(scope_id, symbol_info)]
+        else:
+            stack.append((scope_id, symbol_info))
+        defined_names.append(name)
+
+        current_history = self.history_stack[-1]
+        if current_history is not None:
+            current_history[name] = symbol_info
+        self.scope_history[-1][name] = symbol_info
         
         return None
 
     def lookup(self, name):
         """Busca un símbolo desde el ámbito actual hacia el global."""
-        for scope in reversed(self.scopes):
-            if name in scope:
-                return scope[name]
-        return None
+        stack = self.bindings.get(name)
+        return stack[-1][1] if stack else None
+
+    def lookup_binding(self, name):
+        """Como lookup, pero devuelve (id del ámbito, información) o None."""
+        stack = self.bindings.get(name)
+        return stack[-1] if stack else None
     
     def to_dict(self):
         """Convierte la tabla de símbolos a un diccionario para fácil visualización."""
         return self.scope_history
 
-class SemanticAnalyzer:
+class SemanticAnalyzer(ASTVisitor):
     """
     Recorre el AST para realizar el análisis semántico Y
     ANOTAR los nodos con información semántica.
     """
-    def __init__(self):
+    def __init__(self, dag=None, profile=False, unit_cache=None, parallel=False, max_workers=None,
+                 max_errors=DEFAULT_MAX_ERRORS):
+        super().__init__(profile=profile)
         self.symbol_table = SymbolTable()
         self.errors = []
+        # Descarta duplicados exactos y detiene el análisis tras 'max_errors' (None = sin límite)
+        self.diagnostics = DiagnosticSink(self.errors, max_errors)
         # Rastrear la función actual para validar 'return'
         self.current_function_return_type = None
-
-    def analyze(self, node):
-        self.visit(node)
+        # DAG de expresiones compartidas (opcional) y memo de sus tipos
+        self.dag = dag
+        self.type_memo = {}
+        # Caché de cuerpos de función entre compilaciones (FunctionAnalysisCache).
+        # No se usa con el DAG: su memo reutiliza tipos entre funciones.
+        self.unit_cache = unit_cache if dag is None else None
+        # Analizar los cuerpos de función en un pool de procesos (ver analisis_paralelo)
+        self.parallel = parallel and dag is None
+        self.max_workers = max_workers
+        # Llamadas resueltas (función que llama, función llamada), en orden, y
+        # el grafo de llamadas que se construye con ellas al terminar
+        self.calls = []
+        self.current_caller = None
+        self.call_graph = None
+        # Declaraciones (nombre, ámbito, línea, columna, tipo) y referencias
+        # (clave de la declaración, línea, columna, tipo) para el índice de
+        # referencias cruzadas.
+        self.declarations = []
+        self.references = []
+        self.cross_references = None
+
+    def analyze(self, node, source=None):
+        """
+        Analiza el programa. Con unit_cache, 'source' (el código del que
+        proviene el AST) permite reutilizar los cuerpos de función guardados;
+        con parallel, los cuerpos se analizan antes en varios procesos.
+        """
+        if self.parallel and self.unit_cache is None and source is not None:
+            # Los resultados del pool se entregan a través de una caché de unidades
+            from analisis_incremental import FunctionAnalysisCache
+            self.unit_cache = FunctionAnalysisCache()
+
+        incremental = self.unit_cache is not None and source is not None
+        if incremental:
+            self.unit_cache.begin(node, source)
+            if self.parallel:
+                from analisis_paralelo import analyze_units_parallel
+                analyze_units_parallel(node, self.unit_cache, self.max_workers)
+        try:
+            self.visit(node)
+        except ErrorBudgetExceeded:
+            # Demasiados errores: el resto del programa queda sin anotar
+            pass
+        finally:
+            if incremental:
+                self.unit_cache.finish()
+        self.call_graph = CallGraph(declared_functions(node), self.calls)
+        self.cross_references = CrossReferenceIndex(self.declarations, self.references)
         return self.errors, self.symbol_table.to_dict()
 
+    def report(self, code, line, column, *args):
+        """Registra un error semántico (código de diagnosticos.py y argumentos del mensaje)."""
+        self.diagnostics.report(code, line, column, *args)
+
+    def analyze_scope(self, node, scope_base, visit_body):
+        """
+        Analiza el cuerpo de una función o de main dentro de su propio
+        ámbito. Con unit_cache, el resultado se reutiliza si ni su texto ni
+        los símbolos globales que usa han cambiado.
+        """
+        if self.unit_cache is not None:
+            self.unit_cache.analyze(self, node, scope_base, visit_body)
+            return
+        self.symbol_table.enter_scope(scope_base)
+        visit_body()
+        self.symbol_table.exit_scope()
+
     def get_current_scope_name(self):
-        return self.symbol_table.scopes[-1]['__name__']
+        return self.symbol_table.current_scope_name()
+
+    def declare(self, name, symbol_type, line, column):
+        """Anota una declaración recién definida en el ámbito actual."""
+        self.declarations.append((name, self.get_current_scope_name(), line, column, symbol_type))
+
+    def reference(self, name, info, node, kind):
+        """Anota que 'node' usa la declaración 'info' a la que resolvió 'name'."""
+        # Si no está en la cima de la pila del nombre, el símbolo viene de
+        # la tabla global (análisis en paralelo)
+        stack = self.symbol_table.bindings.get(name)
+        if stack and stack[-1][1] is info:
+            scope = self.symbol_table.scope_names[stack[-1][0]]
+        else:
+            scope = self.symbol_table.scope_names[SymbolTable.GLOBAL_SCOPE]
+        key = (name, scope, info['line'], info['column'])
+        # La inicialización de una declaración no cuenta como referencia
+        if (node.line, node.column) != key[2:]:
+            self.references.append((key, node.line, node.column, kind))
 
     def visit(self, node):
         if not node:
             return None
-        method_name = f'visit_{node.type.name.lower()}'
-        visitor = getattr(self, method_name, self.generic_visit)
-        return visitor(node)
+        visitor = self._dispatch[node.type._value_]
+        if self.dag is not None and self.dag.should_memoize(node):
+            return self.visit_shared(node, visitor)
+        return visitor(self, node)
+
+    def visit_shared(self, node, visitor):
+        """
+        Visita una subexpresión compartida del DAG memoizando su tipo. La
+        clave incluye a qué símbolo resuelve cada variable, porque la misma
+        expresión puede aparecer en ámbitos distintos. Si ya se analizó una
+        aparición con los mismos símbolos, esta se anota copiando aquella.
+        """
+        canonical = self.dag.canonical_node(node)
+        key = (id(canonical),) + tuple(id(self.symbol_table.lookup(name))
+                                       for name in self.dag.free_names[id(canonical)])
+        cached = self.type_memo.get(key)
+        if cached is not None:
+            result, analyzed = cached
+            self.copy_annotations(analyzed, node)
+            return result
+
+        errors_before = len(self.errors)
+        result = visitor(self, node)
+        # Solo se memoizan resultados válidos: los errores se vuelven a reportar
+        if result not in (None, ERROR) and len(self.errors) == errors_before:
+            self.type_memo[key] = (result, node)
+        return result
+
+    def copy_annotations(self, source, target):
+        """
+        Anota la aparición 'target' de una subexpresión como se anotó
+        'source' (misma estructura y mismos símbolos), sin volver a
+        comprobar sus tipos. El ámbito y las referencias son los de 'target'.
+        """
+        scope = self.get_current_scope_name()
+        pending = [(source, target)]
+        while pending:
+            source, target = pending.pop()
+            target.data_type = source.data_type
+            target.state = source.state
+            if target.type == ASTNodeType.IDENTIFIER:
+                self.reference(target.value, self.symbol_table.lookup(target.value), target, READ)
+                if source.scope is not None:
+                    target.scope = scope
+            pending.extend(reversed(list(zip(source.children, target.children))))
 
     def generic_visit(self, node):
         node_type = None
@@ -98,16 +286,17 @@ class SemanticAnalyzer:
 
     def visit_main(self, node):
         # Main es como una función que retorna 'int'
-        self.current_function_return_type = 'int'
-        
-        self.symbol_table.enter_scope('main')
-        node.scope = self.get_current_scope_name()
+        self.current_function_return_type = INT
+        self.current_caller = MAIN
         
-        for statement in node.children:
-            self.visit(statement)
-        self.symbol_table.exit_scope()
+        def visit_body():
+            node.scope = self.get_current_scope_name()
+            for statement in node.children:
+                self.visit(statement)
+        self.analyze_scope(node, 'main', visit_body)
         
         self.current_function_return_type = None # Salir de la "función" main
+        self.current_caller = None
         
     def visit_function_declaration(self, node):
         func_name = node.value
@@ -130,7 +319,9 @@ class SemanticAnalyzer:
         # Definir la función en el ámbito actual (global)
         error = self.symbol_table.define(func_name, f"function", node.line, node.column, extra_info=func_info)
         if error:
-            self.errors.append(error)
+            self.diagnostics.add(error)
+        else:
+            self.declare(func_name, 'function', node.line, node.column)
 
         node.scope = self.get_current_scope_name()
         node.data_type = return_type # El tipo del nodo es su tipo de retorno
@@ -138,21 +329,22 @@ class SemanticAnalyzer:
 
         # Gestionar el 'return'
         self.current_function_return_type = return_type
+        self.current_caller = func_name
         
-        # Entrar en el ámbito de la función
-        self.symbol_table.enter_scope(func_name)
-        
-        # Visitar (y definir) los parámetros dentro del nuevo ámbito
-        self.visit(param_list_node)
-        
-        # Visitar el cuerpo
-        if len(node.children) > 2:
-            body_node = node.children[2]
-            self.visit(body_node)
+        # En el ámbito de la función
+        def visit_body():
+            # Visitar (y definir) los parámetros dentro del nuevo ámbito
+            self.visit(param_list_node)
+            
+            # Visitar el cuerpo
+            if len(node.children) > 2:
+                body_node = node.children[2]
+                self.visit(body_node)
 
-        self.symbol_table.exit_scope()
+        self.analyze_scope(node, func_name, visit_body)
         
         self.current_function_return_type = None # Salir de la función
+        self.current_caller = None
         
     def visit_parameter_list(self, node):
         """Recorre cada nodo de parámetro en la lista."""
@@ -167,11 +359,12 @@ class SemanticAnalyzer:
         
         error = self.symbol_table.define(param_name, param_type, node.line, node.column)
         if error:
-            self.errors.append(error)
+            self.diagnostics.add(error)
         else:
             node.scope = self.get_current_scope_name()
             node.data_type = param_type
             node.state = 'declarado'
+            self.declare(param_name, param_type, node.line, node.column)
 
     def visit_declaration(self, node):
         var_type = node.value
@@ -194,11 +387,12 @@ class SemanticAnalyzer:
             error = self.symbol_table.define(var_name, var_type, var_node.line, var_node.column, extra_info={'value': initial_value})
                 
             if error:
-                self.errors.append(error)
+                self.diagnostics.add(error)
             else:
                 var_node.scope = current_scope
                 var_node.data_type = var_type
                 var_node.state = 'declarado'
+                self.declare(var_name, var_type, var_node.line, var_node.column)
                 
             if child.type == ASTNodeType.ASSIGNMENT:
                 child.scope = current_scope
@@ -210,8 +404,9 @@ class SemanticAnalyzer:
         var_info = self.symbol_table.lookup(var_name)
 
         if not var_info:
-            self.errors.append(f"Error Semántico en línea {var_node.line}, columna {var_node.column}: La variable '{var_name}' no ha sido declarada.")
+            self.report(UNDECLARED_VARIABLE, var_node.line, var_node.column, var_name)
             return
+        self.reference(var_name, var_info, var_node, WRITE)
 
         node.scope = self.get_current_scope_name()
         var_node.scope = self.get_current_scope_name()
@@ -221,25 +416,21 @@ class SemanticAnalyzer:
         expr_type = self.visit(node.children[1])
         expected_type = var_info['type']
 
-        if expr_type and expr_type != "error_type":
-            # Reglas de compatibilidad (int se puede asignar a float)
-            if expected_type == 'float' and expr_type not in ['float', 'int']:
-                self.errors.append(f"Error Semántico en línea {node.line}, columna {node.column}: No se puede asignar un tipo '{expr_type}' a una variable de tipo 'float'.")
-            elif expected_type == 'int' and expr_type not in ['int']:
-                self.errors.append(f"Error Semántico en línea {node.line}, columna {node.column}: No se puede asignar un tipo '{expr_type}' a una variable de tipo 'int'.")
-            elif expected_type == 'string' and expr_type not in ['string']:
-                 self.errors.append(f"Error Semántico en línea {node.line}, columna {node.column}: No se puede asignar un tipo '{expr_type}' a una variable de tipo 'string'.")
+        # Reglas de compatibilidad (int se puede asignar a float)
+        if expr_type and expr_type != ERROR and not is_assignable(expected_type, expr_type):
+            self.report(INCOMPATIBLE_ASSIGNMENT, node.line, node.column, expr_type, expected_type)
 
     def visit_identifier(self, node):
         var_name = node.value
         var_info = self.symbol_table.lookup(var_name)
         if not var_info:
-            self.errors.append(f"Error Semántico en línea {node.line}, columna {node.column}: La variable '{var_name}' no ha sido declarada.")
-            return "error_type"
+            self.report(UNDECLARED_VARIABLE, node.line, node.column, var_name)
+            return ERROR
+        self.reference(var_name, var_info, node, READ)
         
         # No anotar funciones como 'utilizadas' aquí
         if var_info['type'] == 'function':
-            return "function_type"
+            return FUNCTION
         
         node.scope = self.get_current_scope_name()
         node.data_type = var_info['type']
@@ -248,15 +439,15 @@ class SemanticAnalyzer:
         return var_info['type']
 
     def visit_number(self, node):
-        node.data_type = 'float' if '.' in node.value else 'int'
+        node.data_type = FLOAT if '.' in node.value else INT
         return node.data_type
 
     def visit_string(self, node):
-        node.data_type = 'string'
+        node.data_type = STRING
         return node.data_type
     
     def visit_boolean(self, node):
-        node.data_type = 'boolean'
+        node.data_type = BOOLEAN
         return node.data_type
 
     def visit_binary_op(self, node):
@@ -264,60 +455,42 @@ class SemanticAnalyzer:
         right_type = self.visit(node.children[1])
         op = node.value
 
-        if left_type == "error_type" or right_type == "error_type":
-            return "error_type"
+        if left_type == ERROR or right_type == ERROR:
+            return ERROR
 
-        result_type = "error_type"
-        
-        if op in ['+', '-', '*', '/', '%']:
-            if left_type in ['int', 'float'] and right_type in ['int', 'float']:
-                result_type = 'float' if 'float' in [left_type, right_type] else 'int'
-            elif op == '+' and left_type == 'string' and right_type == 'string':
-                result_type = 'string'
-            elif op == '+' and (left_type == 'string' and right_type in ['int', 'float']):
-                result_type = 'string' # Permitir concatenación string + num
-            elif op == '+' and (right_type == 'string' and left_type in ['int', 'float']):
-                result_type = 'string' # Permitir concatenación num + string
-            else:
-                self.errors.append(f"Error Semántico en línea {node.line}, columna {node.column}: Operador '{op}' no compatible entre tipos '{left_type}' y '{right_type}'.")
-        
-        elif op in ['<', '<=', '>', '>=', '==', '!=']:
-            if left_type in ['int', 'float'] and right_type in ['int', 'float']:
-                result_type = 'boolean'
-            elif op in ['==', '!='] and left_type == 'string' and right_type == 'string':
-                result_type = 'boolean'
-            else:
-                self.errors.append(f"Error Semántico en línea {node.line}, columna {node.column}: No se pueden comparar los tipos '{left_type}' y '{right_type}'.")
-        
-        elif op in ['&&', '||']:
-            if left_type in ['int', 'float', 'boolean'] and right_type in ['int', 'float', 'boolean']:
-                result_type = 'boolean'
-            else:
-                self.errors.append(f"Error Semántico en línea {node.line}, columna {node.column}: Operador lógico '{op}' requiere operandos booleanos o numéricos.")
+        result_type = BINARY_RESULT.get((op, left_type, right_type))
+        if result_type is None:
+            result_type = ERROR
+            kind = OPERATOR_KIND.get(op)
+            if kind == ARITHMETIC:
+                self.report(INCOMPATIBLE_ARITHMETIC, node.line, node.column, op, left_type, right_type)
+            elif kind == COMPARISON:
+                self.report(INCOMPATIBLE_COMPARISON, node.line, node.column, left_type, right_type)
+            elif kind == LOGICAL:
+                self.report(INVALID_LOGICAL_OPERANDS, node.line, node.column, op)
 
         node.data_type = result_type
         return result_type
 
     def visit_unary_op(self, node):
         expr_type = self.visit(node.children[0])
-        if expr_type == "error_type":
-            return "error_type"
+        if expr_type == ERROR:
+            return ERROR
         
-        if node.value == '!' and expr_type in ['int', 'float', 'boolean']:
-            node.data_type = 'boolean'
-        elif node.value == '-' and expr_type in ['int', 'float']:
-            node.data_type = expr_type
+        result_type = UNARY_RESULT.get((node.value, expr_type))
+        if result_type is not None:
+            node.data_type = result_type
         else:
-            self.errors.append(f"Error Semántico en línea {node.line}, columna {node.column}: Operador unario '{node.value}' inválido para el tipo '{expr_type}'.")
-            node.data_type = "error_type"
+            self.report(INVALID_UNARY_OPERAND, node.line, node.column, node.value, expr_type)
+            node.data_type = ERROR
         
         return node.data_type
 
     def check_condition(self, node, construct_name):
         """Función auxiliar para verificar condiciones en if/while/until/for."""
         condition_type = self.visit(node)
-        if condition_type not in ['int', 'float', 'boolean', 'error_type']:
-            self.errors.append(f"Error Semántico en línea {node.line}, columna {node.column}: La condición de un '{construct_name}' debe ser evaluable a booleano, pero se encontró '{condition_type}'.")
+        if condition_type not in CONDITION_TYPES:
+            self.report(INVALID_CONDITION, node.line, node.column, construct_name, condition_type)
 
     def visit_if_statement(self, node):
         self.check_condition(node.children[0], "if")
@@ -349,7 +522,9 @@ class SemanticAnalyzer:
         var_node = node.children[0]
         var_info = self.symbol_table.lookup(var_node.value)
         if not var_info:
-            self.errors.append(f"Error Semántico en línea {var_node.line}, columna {var_node.column}: La variable '{var_node.value}' no ha sido declarada para 'cin'.")
+            self.report(UNDECLARED_INPUT_VARIABLE, var_node.line, var_node.column, var_node.value)
+        else:
+            self.reference(var_node.value, var_info, var_node, WRITE)
 
     def visit_output_statement(self, node):
         # La expresión en cout puede ser de cualquier tipo, solo necesitamos verificar que sea válida.
@@ -358,8 +533,8 @@ class SemanticAnalyzer:
     def visit_switch_statement(self, node):
         condition_type = self.visit(node.children[0])
     
-        if condition_type != 'int':
-            self.errors.append(f"Error Semántico en línea {node.line}, columna {node.column}: La expresión en un 'switch' debe ser de tipo 'int', no '{condition_type}'.")
+        if condition_type != INT:
+            self.report(INVALID_SWITCH_TYPE, node.line, node.column, condition_type)
             
         self.symbol_table.enter_scope('switch_block')
         
@@ -373,12 +548,12 @@ class SemanticAnalyzer:
                 # El valor del 'case' es el 'value' del nodo CONSTANTE (número)
                 case_val = case_node.value
                 if case_val in case_labels:
-                    self.errors.append(f"Error Semántico en línea {case_node.line}, columna {case_node.column}: Etiqueta 'case' duplicada con valor '{case_val}'.")
+                    self.report(DUPLICATE_CASE, case_node.line, case_node.column, case_val)
                 case_labels.add(case_val)
             
             if case_node.type == ASTNodeType.DEFAULT_BLOCK:
                 if has_default:
-                    self.errors.append(f"Error Semántico en línea {case_node.line}, columna {case_node.column}: Múltiples bloques 'default' en 'switch'.")
+                    self.report(DUPLICATE_DEFAULT, case_node.line, case_node.column)
                 has_default = True
 
             self.visit(case_node) # Visitar el 'case' o 'default'
@@ -410,49 +585,49 @@ class SemanticAnalyzer:
 
     def visit_return_statement(self, node):
         if self.current_function_return_type is None:
-            self.errors.append(f"Error Semántico en línea {node.line}, columna {node.column}: Sentencia 'return' fuera de una función.")
+            self.report(RETURN_OUTSIDE_FUNCTION, node.line, node.column)
             return
 
         expected_type = self.current_function_return_type
         
         if node.value == "void_return":
              if expected_type != 'void': # Asumiendo que tendrías un tipo 'void'
-                 self.errors.append(f"Error Semántico en línea {node.line}, columna {node.column}: 'return' vacío en función que debe retornar '{expected_type}'.")
+                 self.report(EMPTY_RETURN, node.line, node.column, expected_type)
              return
 
         # Hay una expresión
         expr_type = self.visit(node.children[0])
         
-        if expr_type == "error_type":
+        if expr_type == ERROR:
             return # Ya se reportó un error en la expresión
 
         # Comprobar compatibilidad
-        if expected_type == 'float' and expr_type not in ['float', 'int']:
-            self.errors.append(f"Error Semántico en línea {node.line}, columna {node.column}: No se puede retornar tipo '{expr_type}' de una función que retorna 'float'.")
-        elif expected_type == 'int' and expr_type not in ['int']:
-            self.errors.append(f"Error Semántico en línea {node.line}, columna {node.column}: No se puede retornar tipo '{expr_type}' de una función que retorna 'int'.")
-        elif expected_type == 'string' and expr_type not in ['string']:
-             self.errors.append(f"Error Semántico en línea {node.line}, columna {node.column}: No se puede retornar tipo '{expr_type}' de una función que retorna 'string'.")
+        if not is_assignable(expected_type, expr_type):
+            self.report(INCOMPATIBLE_RETURN, node.line, node.column, expr_type, expected_type)
 
     def visit_function_call(self, node):
         func_name = node.value
         func_info = self.symbol_table.lookup(func_name)
 
         if not func_info:
-            self.errors.append(f"Error Semántico en línea {node.line}, columna {node.column}: Intento de llamar a función no declarada '{func_name}'.")
-            return "error_type"
+            self.report(UNDECLARED_FUNCTION, node.line, node.column, func_name)
+            return ERROR
         
         if func_info['type'] != 'function':
-            self.errors.append(f"Error Semántico en línea {node.line}, columna {node.column}: '{func_name}' no es una función, es un(a) '{func_info['type']}'.")
-            return "error_type"
+            self.report(NOT_A_FUNCTION, node.line, node.column, func_name, func_info['type'])
+            return ERROR
+
+        self.reference(func_name, func_info, node, CALL)
+        if self.current_caller is not None:
+            self.calls.append((self.current_caller, func_name))
 
         # Comprobar número de argumentos (aridad)
         expected_args_count = len(func_info['param_types'])
         provided_args_count = len(node.children)
 
         if expected_args_count != provided_args_count:
-            self.errors.append(f"Error Semántico en línea {node.line}, columna {node.column}: La función '{func_name}' esperaba {expected_args_count} argumentos, pero recibió {provided_args_count}.")
-            return "error_type"
+            self.report(WRONG_ARGUMENT_COUNT, node.line, node.column, func_name, expected_args_count, provided_args_count)
+            return ERROR
         
         # Comprobar tipos de argumentos
         for i, arg_node in enumerate(node.children):
@@ -460,12 +635,8 @@ class SemanticAnalyzer:
             expected_arg_type = func_info['param_types'][i]
             
             # Chequeo simple de compatibilidad
-            if expected_arg_type == 'float' and arg_type not in ['float', 'int']:
-                 self.errors.append(f"Error Semántico en línea {arg_node.line}, columna {arg_node.column}: Argumento {i+1} de '{func_name}' es '{arg_type}', se esperaba 'float' o 'int'.")
-            elif expected_arg_type == 'int' and arg_type != 'int':
-                 self.errors.append(f"Error Semántico en línea {arg_node.line}, columna {arg_node.column}: Argumento {i+1} de '{func_name}' es '{arg_type}', se esperaba 'int'.")
-            elif expected_arg_type == 'string' and arg_type != 'string':
-                 self.errors.append(f"Error Semántico en línea {arg_node.line}, columna {arg_node.column}: Argumento {i+1} de '{func_name}' es '{arg_type}', se esperaba 'string'.")
+            if arg_type != ERROR and not is_assignable(expected_arg_type, arg_type):
+                 self.report(INCOMPATIBLE_ARGUMENT, arg_node.line, arg_node.column, i + 1, func_name, arg_type, ACCEPTED_DESCRIPTION[expected_arg_type])
 
         # El tipo de la expresión 'function_call' es el tipo de retorno de la función
         node.data_type = func_info['return_type']
@@ -480,36 +651,4 @@ def semantic_tree_to_html(node):
     Convierte el AST (después del análisis semántico) a HTML colapsable,
     incluyendo la información de tipos, ámbitos, etc.
     """
-    if not node:
-        return ""
-
-    html = '<div class="ast-node">'
-    html += '<div class="ast-label">'
-    
-    html += f'<span class="node-type">{node.type.name}</span>'
-    if node.value:
-        html += f' <span class="node-value">[{node.value}]</span>'
-
-    # --- Añadir Información Semántica ---
-    sem_info = []
-    if node.data_type:
-        sem_info.append(f'Tipo: {node.data_type}')
-    if node.scope:
-        sem_info.append(f'Ámbito: {node.scope}')
-    if node.state:
-        sem_info.append(f'Estado: {node.state}')
-        
-    if sem_info:
-        html += f' <span class="sem-info">({", ".join(sem_info)})</span>'
-    # --- Fin de Añadir Info Semántica ---
-
-    html += '</div>'  # Cierra ast-label
-
-    if node.children:
-        html += '<div class="ast-children">'
-        for child in node.children:
-            html += semantic_tree_to_html(child)
-        html += '</div>' # Cierra ast-children
-
-    html += '</div>' # Cierra ast-node
-    return html
\ No newline at end of file
+    return render_ast(node, SemanticHTMLEmitter())[0]
@@ -1,9 +1,22 @@
 import re
+import os
+from concurrent.futures import ProcessPoolExecutor
 from enum import Enum, auto
 from analizador_lexico import Token, TokenType
-from graphviz import Digraph
+from renderizador_ast import render_ast, TextEmitter, HTMLEmitter, DictEmitter
+from diagnosticos import (Diagnostic, DiagnosticSink, ErrorBudgetExceeded, DEFAULT_MAX_ERRORS,
+    CONDITION_WITHOUT_PARENTHESES, EXPECTED_ARGUMENT_SEPARATOR, EXPECTED_CASE, EXPECTED_EXPRESSION,
+    EXPECTED_INCREMENT_OPERATOR, EXPECTED_MAIN, EXPECTED_THEN, EXPECTED_TOKEN_TYPE,
+    EXPECTED_TOKEN_VALUE, EXPECTED_TOP_LEVEL_DECLARATION, EXPECTED_UNTIL, INVALID_PARAMETER,
+    INVALID_STATEMENT, MISSING_BREAK, MISSING_CLOSING_BRACE, MISSING_CLOSING_PARENTHESIS,
+    MISSING_END, MISSING_SEMICOLON_AFTER, MISSING_SEMICOLON_AT_END, NON_CONSTANT_CASE,
+    UNEXPECTED_EOF, UNEXPECTED_EXPRESSION_TOKEN, UNEXPECTED_FAILURE, UNEXPECTED_STATEMENT_TOKEN,
+    UNPROCESSED_TOKENS)
 import json
 
+# Tipos que pueden iniciar una declaración global (variable o función)
+DECLARATION_TYPES = ("int", "float", "string")
+
 
 class ASTNodeType(Enum):
     PROGRAM = auto()
@@ -47,37 +60,30 @@ class ASTNode:
         self.data_type = None
         self.scope = None
         self.state = None
+
+        # Identificador estable entre compilaciones (lo asigna el servidor)
+        self.node_id = None
     
     def to_dict(self):
-        return {
-            'type': self.type.name,
-            'value': self.value,
-            'line': self.line,
-            'column': self.column,
-            'children': [child.to_dict() if child else None for child in self.children],
-            
-            # Atributos adicionales para análisis semántico
-            'data_type': self.data_type,
-            'scope': self.scope,
-            'state': self.state,
-        }
-
-class SyntaxError:
-    def __init__(self, message, line, column):
-        self.message = message
-        self.line = line
-        self.column = column
-    
-    def __str__(self):
-        return f"Error sintáctico en línea {self.line}, columna {self.column}: {self.message}"
+        return render_ast(self, DictEmitter())[0]
+
+class SyntaxError(Diagnostic):
+    """Diagnóstico sintáctico (código SIN...); el mensaje se formatea al mostrarlo."""
 
 class SyntacticAnalyzer:
-    def __init__(self, tokens):
+    def __init__(self, tokens, preparsed=None, max_errors=DEFAULT_MAX_ERRORS):
         self.tokens = [t for t in tokens if t.type not in {TokenType.COMMENT, TokenType.WHITESPACE}]
         self.current = 0
         self.errors = []
+        # Duplicados exactos y presupuesto de errores (None = sin límite)
+        self.diagnostics = DiagnosticSink(self.errors, max_errors, SyntaxError)
+        # Índice del token del último error: los errores en cascada (sin
+        # haber avanzado más allá del token que salta la recuperación) se omiten
+        self.last_error_at = None
         # Para rastrear si estamos dentro de un do-until
         self.in_do_until = False
+        # Funciones ya parseadas (en paralelo): índice de inicio -> (nodo, índice final)
+        self.preparsed = preparsed or {}
         
     def parse(self):
         """Punto de entrada del parser"""
@@ -94,15 +100,18 @@ class SyntacticAnalyzer:
                 unprocessed = []
                 for i in range(self.current, min(self.current + 5, len(self.tokens))):
                     unprocessed.append(f"{self.tokens[i].type.name}: '{self.tokens[i].value}'")
-                self.error(f"Quedan {remaining_tokens} token(s) sin procesar. Primeros tokens: {', '.join(unprocessed)}")
+                self.error(UNPROCESSED_TOKENS, remaining_tokens, ', '.join(unprocessed))
                 
+        except ErrorBudgetExceeded:
+            # Demasiados errores: se conserva el AST parcial (si lo hay)
+            pass
         except Exception as e:
             # En caso de error catastrófico, mantener el AST parcial
             if self.current < len(self.tokens):
                 token = self.tokens[self.current]
-                self.errors.append(SyntaxError(f"Error inesperado: {str(e)}", token.line, token.column))
+                self.errors.append(SyntaxError(UNEXPECTED_FAILURE, token.line, token.column, (str(e),)))
             else:
-                self.errors.append(SyntaxError(f"Error inesperado: {str(e)}", -1, -1))
+                self.errors.append(SyntaxError(UNEXPECTED_FAILURE, -1, -1, (str(e),)))
         
         # Siempre retornar el AST (completo o parcial) y los errores
         return ast, self.errors
@@ -124,17 +133,17 @@ class SyntacticAnalyzer:
         """Consume el token actual si coincide con lo esperado"""
         token = self.current_token()
         if not token:
-            self.error("Fin inesperado del archivo")
+            self.error(UNEXPECTED_EOF)
             return None
             
         if expected_type and token.type != expected_type:
-            self.error(f"Se esperaba {expected_type.name}, se encontró {token.type.name} '{token.value}'")
+            self.error(EXPECTED_TOKEN_TYPE, expected_type.name, token.type.name, token.value)
             # Avanzar de todos modos para intentar recuperarse
             self.current += 1
             return None
             
         if expected_value and token.value != expected_value:
-            self.error(f"Se esperaba '{expected_value}', se encontró '{token.value}'")
+            self.error(EXPECTED_TOKEN_VALUE, expected_value, token.value)
             # Avanzar de todos modos para intentar recuperarse
             self.current += 1
             return None
@@ -142,19 +151,24 @@ class SyntacticAnalyzer:
         self.current += 1
         return token
     
-    def error(self, message):
-        """Registra un error sintáctico"""
+    def error(self, code, *args):
+        """Registra un error sintáctico (código de diagnosticos.py y argumentos del mensaje)"""
+        if self.last_error_at is not None and self.current <= self.last_error_at + 1:
+            # Error en cascada del anterior
+            return
+        self.last_error_at = self.current
+
         if self.current < len(self.tokens):
             token = self.tokens[self.current]
-            error = SyntaxError(message, token.line, token.column)
+            line, column = token.line, token.column
         else:
             # Si estamos al final del archivo
             if self.tokens:
                 last_token = self.tokens[-1]
-                error = SyntaxError(message, last_token.line, last_token.column + len(last_token.value))
+                line, column = last_token.line, last_token.column + len(last_token.value)
             else:
-                error = SyntaxError(message, 1, 1)
-        self.errors.append(error)
+                line, column = 1, 1
+        self.diagnostics.report(code, line, column, *args)
     
     def match(self, token_type=None, value=None):
         """Verifica si el token actual coincide sin consumirlo"""
@@ -189,7 +203,7 @@ class SyntacticAnalyzer:
                 node.children.append(declaration)
             else:
                 # Si no podemos parsear una declaración global, avanzamos para evitar un bucle infinito
-                self.error("Se esperaba una declaración de variable global, una función o 'main'")
+                self.error(EXPECTED_TOP_LEVEL_DECLARATION)
                 self.consume() 
 
         # Procesar el bloque main
@@ -202,8 +216,14 @@ class SyntacticAnalyzer:
     # Regla para distinguir entre declaración de variable o de función
     def global_declaration(self):
         """Distingue si es una declaración de variable global o de función"""
-        if not self.match(TokenType.KEYWORD) or self.current_token().value not in ["int", "float", "string"]:
+        if not self.match(TokenType.KEYWORD) or self.current_token().value not in DECLARATION_TYPES:
             return None
+
+        # Si la función ya se parseó en paralelo, reutilizar su nodo
+        if self.current in self.preparsed:
+            node, end = self.preparsed[self.current]
+            self.current = end
+            return node
         
         # Miramos hacia adelante: si después del tipo e identificador hay un '(', es una función
         if self.peek(2) and self.peek(2).type == TokenType.SYMBOL and self.peek(2).value == '(':
@@ -279,7 +299,7 @@ class SyntacticAnalyzer:
         id_token = self.consume(TokenType.IDENTIFIER)
         
         if not type_token or not id_token:
-            self.error("Definición de parámetro inválida. Se esperaba 'tipo nombre'.")
+            self.error(INVALID_PARAMETER)
             return None
         
         # El nodo PARAMETER tiene el nombre como 'value' y el tipo como un hijo
@@ -292,7 +312,7 @@ class SyntacticAnalyzer:
         """main_block -> main { statement* }"""
         main_token = self.consume(TokenType.KEYWORD, "main")
         if not main_token:
-            self.error("Se esperaba la función 'main'")
+            self.error(EXPECTED_MAIN)
             return None
             
         main_node = ASTNode(ASTNodeType.MAIN, "main", [], main_token.line, main_token.column)
@@ -306,7 +326,7 @@ class SyntacticAnalyzer:
                 main_node.children.append(stmt)
         
         if not self.consume(TokenType.SYMBOL, "}"):
-            self.error("Falta '}' para cerrar el bloque main")
+            self.error(MISSING_CLOSING_BRACE, "main")
         
         return main_node
     
@@ -350,6 +370,11 @@ class SyntacticAnalyzer:
             if token.value == "return":
                 return self.return_statement()
             # --- FIN DE AÑADIDO ---
+            # Palabra clave fuera de lugar ('else', 'end'...): se salta para
+            # que el bucle del bloque que llama siga avanzando
+            self.error(UNEXPECTED_STATEMENT_TOKEN, token.value)
+            self.current += 1
+            return None
                 
         # Asignación, llamada a función, o incremento/decremento
         elif token.type == TokenType.IDENTIFIER:
@@ -364,16 +389,16 @@ class SyntacticAnalyzer:
                 # Es una llamada a función usada como sentencia
                 call_node = self.primary_expression() # primary_expression parseará la llamada
                 if not self.consume(TokenType.SYMBOL, ";"):
-                    self.error("Falta ';' después de la llamada a función")
+                    self.error(MISSING_SEMICOLON_AFTER, "de la llamada a función")
                 return call_node
             # --- FIN DE AÑADIDO ---
             else:
-                self.error(f"Sentencia inválida comenzando con '{token.value}'")
+                self.error(INVALID_STATEMENT, token.value)
                 self.sync_to_semicolon()
                 return None
                 
         else:
-            self.error(f"Token inesperado al inicio de sentencia: {token.value}")
+            self.error(UNEXPECTED_STATEMENT_TOKEN, token.value)
             self.current += 1
             return None
     
@@ -392,7 +417,7 @@ class SyntacticAnalyzer:
         node = ASTNode(ASTNodeType.RETURN_STATEMENT, "return", [expr], ret_token.line, ret_token.column)
         
         if not self.consume(TokenType.SYMBOL, ";"):
-            self.error("Falta ';' al final de la sentencia return")
+            self.error(MISSING_SEMICOLON_AT_END, "sentencia return")
         
         return node
     # --- FIN DE AÑADIDO ---
@@ -433,7 +458,7 @@ class SyntacticAnalyzer:
             parse_var_declarator(node)
         
         if not self.consume(TokenType.SYMBOL, ";"):
-            self.error("Falta ';' al final de la declaración")
+            self.error(MISSING_SEMICOLON_AT_END, "declaración")
         
         return node
     
@@ -457,7 +482,7 @@ class SyntacticAnalyzer:
             node.children.append(expr)
             
         if not self.consume(TokenType.SYMBOL, ";"):
-            self.error("Falta ';' al final de la asignación")
+            self.error(MISSING_SEMICOLON_AT_END, "asignación")
         
         return node
     
@@ -469,7 +494,7 @@ class SyntacticAnalyzer:
             
         op_token = self.consume(TokenType.ARITHMETIC_OP)
         if not op_token or op_token.value not in ["++", "--"]:
-            self.error("Se esperaba '++' o '--'")
+            self.error(EXPECTED_INCREMENT_OPERATOR)
             return None
             
         # Crea un nodo IDENTIFIER para la variable
@@ -490,7 +515,7 @@ class SyntacticAnalyzer:
         assignment_node = ASTNode(ASTNodeType.ASSIGNMENT, "=", [id_node, binary_op_node], id_token.line, id_token.column)
         
         if not self.consume(TokenType.SYMBOL, ";"):
-            self.error("Falta ';' después del incremento/decremento")
+            self.error(MISSING_SEMICOLON_AFTER, "del incremento/decremento")
             
         return assignment_node
     
@@ -508,10 +533,10 @@ class SyntacticAnalyzer:
             self.consume()  # Consumir (
             condition = self.expression()
             if not self.consume(TokenType.SYMBOL, ")"):
-                self.error("Falta ')' para cerrar la condición")
+                self.error(MISSING_CLOSING_PARENTHESIS, "condición")
         else:
             # Sin paréntesis - generar advertencia pero continuar
-            self.error("La condición del if debería estar entre paréntesis")
+            self.error(CONDITION_WITHOUT_PARENTHESES, "if")
             condition = self.expression()
         
         if condition:
@@ -520,7 +545,7 @@ class SyntacticAnalyzer:
         # then
         then_token = self.current_token()
         if not self.match(TokenType.IDENTIFIER, "then"):
-            self.error("Se esperaba 'then' después de la condición del if")
+            self.error(EXPECTED_THEN)
         else:
             self.consume()
         
@@ -547,7 +572,7 @@ class SyntacticAnalyzer:
         
         # end
         if not self.consume(TokenType.KEYWORD, "end"):
-            self.error("Falta 'end' para cerrar el bloque if")
+            self.error(MISSING_END, "if")
         
         return node
     
@@ -565,10 +590,10 @@ class SyntacticAnalyzer:
             self.consume()  # Consumir (
             condition = self.expression()
             if not self.consume(TokenType.SYMBOL, ")"):
-                self.error("Falta ')' para cerrar la condición")
+                self.error(MISSING_CLOSING_PARENTHESIS, "condición")
         else:
             # Sin paréntesis - generar advertencia pero continuar
-            self.error("La condición del while debería estar entre paréntesis")
+            self.error(CONDITION_WITHOUT_PARENTHESES, "while")
             condition = self.expression()
         
         if condition:
@@ -585,7 +610,7 @@ class SyntacticAnalyzer:
         
         # end
         if not self.consume(TokenType.KEYWORD, "end"):
-            self.error("Falta 'end' para cerrar el bloque while")
+            self.error(MISSING_END, "while")
         
         return node
     
@@ -612,7 +637,7 @@ class SyntacticAnalyzer:
         # until
         until_token = self.current_token()
         if not self.match(TokenType.IDENTIFIER, "until"):
-            self.error("Se esperaba 'until' para cerrar el bloque do")
+            self.error(EXPECTED_UNTIL)
             # Salir del modo do-until
             self.in_do_until = False
             return node
@@ -628,10 +653,10 @@ class SyntacticAnalyzer:
             self.consume()  # Consumir (
             condition = self.expression()
             if not self.consume(TokenType.SYMBOL, ")"):
-                self.error("Falta ')' para cerrar la condición")
+                self.error(MISSING_CLOSING_PARENTHESIS, "condición")
         else:
             # Sin paréntesis - generar advertencia pero continuar
-            self.error("La condición del until debería estar entre paréntesis")
+            self.error(CONDITION_WITHOUT_PARENTHESES, "until")
             condition = self.expression()
         
         if condition:
@@ -661,7 +686,7 @@ class SyntacticAnalyzer:
             node.children.append(id_node)
         
         if not self.consume(TokenType.SYMBOL, ";"):
-            self.error("Falta ';' al final de la sentencia cin")
+            self.error(MISSING_SEMICOLON_AT_END, "sentencia cin")
         
         return node
     
@@ -682,7 +707,7 @@ class SyntacticAnalyzer:
             node.children.append(expr)
         
         if not self.consume(TokenType.SYMBOL, ";"):
-            self.error("Falta ';' al final de la sentencia cout")
+            self.error(MISSING_SEMICOLON_AT_END, "sentencia cout")
         
         return node
     
@@ -705,11 +730,11 @@ class SyntacticAnalyzer:
                 node.children.append(default_node)
                 break 
             else:
-                self.error("Se esperaba 'case', 'default' o 'end'")
+                self.error(EXPECTED_CASE)
                 break
 
         if not self.consume(TokenType.KEYWORD, "end"):
-            self.error("Falta 'end' para cerrar el bloque switch")
+            self.error(MISSING_END, "switch")
 
         return node
     
@@ -720,7 +745,7 @@ class SyntacticAnalyzer:
         # El 'value' del case (ej. 1, 2)
         case_value_node = self.primary_expression() 
         if case_value_node.type != ASTNodeType.NUMBER: # Asumimos solo números
-            self.error("El valor del 'case' debe ser un número constante")
+            self.error(NON_CONSTANT_CASE)
         
         node = ASTNode(ASTNodeType.CASE_BLOCK, case_value_node.value, [], case_token.line, case_token.column)
         
@@ -733,9 +758,9 @@ class SyntacticAnalyzer:
         node.children.append(body)
 
         if not self.consume(TokenType.KEYWORD, "break"):
-            self.error("Cada 'case' debe terminar con 'break;'")
+            self.error(MISSING_BREAK, "Cada 'case'")
         if not self.consume(TokenType.SYMBOL, ";"):
-            self.error("Falta ';' después de 'break'")
+            self.error(MISSING_SEMICOLON_AFTER, "de 'break'")
             
         return node
 
@@ -753,9 +778,9 @@ class SyntacticAnalyzer:
         node.children.append(body)
         
         if not self.consume(TokenType.KEYWORD, "break"):
-            self.error("El bloque 'default' debe terminar con 'break;'")
+            self.error(MISSING_BREAK, "El bloque 'default'")
         if not self.consume(TokenType.SYMBOL, ";"):
-            self.error("Falta ';' después de 'break'")
+            self.error(MISSING_SEMICOLON_AFTER, "de 'break'")
 
         return node
 
@@ -799,7 +824,7 @@ class SyntacticAnalyzer:
         node.children.append(body)
 
         if not self.consume(TokenType.KEYWORD, "end"):
-            self.error("Falta 'end' para cerrar el bloque for")
+            self.error(MISSING_END, "for")
             
         return node
     
@@ -890,7 +915,7 @@ class SyntacticAnalyzer:
         token = self.current_token()
         
         if not token:
-            self.error("Se esperaba una expresión")
+            self.error(EXPECTED_EXPRESSION)
             return None
             
         # Identificador (o llamada a función)
@@ -926,11 +951,11 @@ class SyntacticAnalyzer:
             lparen = self.consume()
             expr = self.expression()
             if not self.consume(TokenType.SYMBOL, ")"):
-                self.error("Falta ')' para cerrar la expresión")
+                self.error(MISSING_CLOSING_PARENTHESIS, "expresión")
             return expr
         
         else:
-            self.error(f"Token inesperado en expresión: '{token.value}'")
+            self.error(UNEXPECTED_EXPRESSION_TOKEN, token.value)
             self.current += 1
             return None
 
@@ -956,7 +981,7 @@ class SyntacticAnalyzer:
                 elif self.match(TokenType.SYMBOL, ")"):
                     break
                 else:
-                    self.error("Se esperaba ',' o ')' en la lista de argumentos")
+                    self.error(EXPECTED_ARGUMENT_SEPARATOR)
                     break
         
         self.consume(TokenType.SYMBOL, ")")
@@ -969,65 +994,33 @@ class SyntacticAnalyzer:
 
 def format_ast_tree(node, indent=0):
     """Formatea el AST para impresión legible - INCLUYE COLUMNAS"""
-    if not node:
-        return ""
-    
-    result = "  " * indent + f"{node.type.name}"
-    if node.value:
-        result += f" [{node.value}]"
-    if node.line and node.column:
-        result += f" (línea {node.line}, col {node.column})"
-    elif node.line:
-        result += f" (línea {node.line})"
-    result += "\n"
-    
-    for child in node.children:
-        if child:  # Saltar nodos None
-            result += format_ast_tree(child, indent + 1)
-    
-    return result
+    return render_ast(node, TextEmitter(indent))[0]
 
 def ast_to_html(node):
     """Convierte el AST a HTML colapsable"""
-    if not node:
-        return ""
-
-    html = '<div class="ast-node">'  # nodo completo
+    return render_ast(node, HTMLEmitter())[0]
 
-    # Etiqueta clickeable
-    html += '<div class="ast-label">'
-    html += f'<span class="node-type">{node.type.name}</span>'
-    
-    if node.value:
-        html += f' <span class="node-value">[{node.value}]</span>'
+def export_ast_graphviz(ast, filename="ast", output_format="png", max_depth=None, max_nodes=None):
+    """
+    Exporta el AST como imagen con Graphviz. Con max_depth y max_nodes el
+    grafo queda acotado: los subárboles que no caben se colapsan en un único
+    nodo que indica cuántos hijos se omitieron.
+    """
+    # Importación diferida: graphviz solo se necesita al exportar
+    from graphviz import Digraph
 
-    if node.line is not None and node.column is not None:
-        html += f' <span class="node-position">(línea {node.line}, col {node.column})</span>'
-    elif node.line:
-        html += f' <span class="node-position">(línea {node.line})</span>'
-
-    html += '</div>'  # cierra ast-label
-
-    # Hijos
-    if node.children:
-        html += '<div class="ast-children">'
-        for child in node.children:
-            html += ast_to_html(child)
-        html += '</div>'  # cierra ast-children
-
-    html += '</div>'  # cierra ast-node
-    return html
-
-def export_ast_graphviz(ast, filename="ast", output_format="png"):
     dot = Digraph(comment="AST", format=output_format)
-    counter = [0]
+    counter = 0
 
-    def add_nodes_edges(node, parent_id=None):
+    # Recorrido iterativo: (nodo, id del padre, profundidad)
+    stack = [(ast, None, 0)]
+    while stack:
+        node, parent_id, depth = stack.pop()
         if node is None:
-            return
+            continue
 
-        node_id = f"node{counter[0]}"
-        counter[0] += 1
+        node_id = f"node{counter}"
+        counter += 1
 
         label = node.type.name
         if node.value:
@@ -1040,19 +1033,166 @@ def export_ast_graphviz(ast, filename="ast", output_format="png"):
         if parent_id:
             dot.edge(parent_id, node_id)
 
-        for child in node.children:
-            add_nodes_edges(child, node_id)
+        children = [child for child in node.children if child is not None]
+        if not children:
+            continue
+
+        too_deep = max_depth is not None and depth >= max_depth
+        too_big = max_nodes is not None and counter + len(stack) >= max_nodes
+        if too_deep or too_big:
+            collapsed_id = f"node{counter}"
+            counter += 1
+            dot.node(collapsed_id, f"... ({len(children)} hijos)", shape="box", style="dashed")
+            dot.edge(node_id, collapsed_id)
+            continue
+
+        for child in reversed(children):
+            stack.append((child, node_id, depth + 1))
 
-    add_nodes_edges(ast)
     dot.render(filename=filename, view=False, cleanup=True)
     return f"{filename}.{output_format}"
 
 
+# --- Parseo paralelo de funciones globales ---
+
+# Por debajo de este número de funciones no compensa arrancar procesos
+PARALLEL_MIN_FUNCTIONS = 64
+
+def find_function_ranges(tokens):
+    """
+    Localiza los rangos [inicio, fin) de las funciones globales usando la
+    misma anticipación que global_declaration ('tipo identificador (') y
+    el balance de llaves. Se detiene al llegar a 'main'.
+    """
+    ranges = []
+    depth = 0
+    i = 0
+    total = len(tokens)
+    at_boundary = True  # Inicio de archivo, tras ';' o tras '}' en nivel 0
+
+    while i < total:
+        token = tokens[i]
+
+        if depth == 0:
+            if token.type == TokenType.KEYWORD and token.value == "main":
+                break
+
+            if (at_boundary and token.type == TokenType.KEYWORD and token.value in DECLARATION_TYPES
+                    and i + 2 < total and tokens[i + 2].type == TokenType.SYMBOL and tokens[i + 2].value == "("):
+                end = _find_function_end(tokens, i)
+                if end is None:
+                    break  # Función sin cerrar: el parser secuencial reportará el error
+                ranges.append((i, end))
+                i = end
+                at_boundary = True
+                continue
+
+        if token.type == TokenType.SYMBOL:
+            if token.value == "{":
+                depth += 1
+            elif token.value == "}":
+                depth = max(depth - 1, 0)
+        at_boundary = depth == 0 and token.type == TokenType.SYMBOL and token.value in (";", "}")
+        i += 1
+
+    return ranges
+
+def _find_function_end(tokens, start):
+    """Devuelve el índice siguiente a la '}' que cierra la función en 'start'."""
+    depth = 0
+    for i in range(start, len(tokens)):
+        token = tokens[i]
+        if token.type != TokenType.SYMBOL:
+            continue
+        if token.value == "{":
+            depth += 1
+        elif token.value == "}":
+            depth -= 1
+            if depth == 0:
+                return i + 1
+            if depth < 0:
+                return None
+        elif token.value == ";" and depth == 0:
+            # Un ';' antes del cuerpo indica que no es una función bien formada
+            return None
+    return None
+
+# Tokens compartidos con los procesos del pool (ver _init_parse_worker)
+_worker_tokens = None
+
+def _init_parse_worker(tokens):
+    """
+    Inicializa un proceso del pool con la lista completa de tokens. Con
+    'fork' se hereda sin copiar; con 'spawn' se envía una vez por proceso.
+    """
+    global _worker_tokens
+    _worker_tokens = tokens
+
+def _parse_function_chunk(ranges):
+    """
+    Trabajo de un proceso: parsea una lista de funciones independientes.
+    Solo devuelve las que se parsearon completas y sin errores; el resto se
+    deja al parser secuencial para conservar los errores exactos.
+    Los nodos vuelven serializados en un único bloque binario, mucho más
+    barato de transferir que el grafo de objetos con pickle.
+    """
+    from cache_ast import serialize_ast  # Import local: cache_ast importa este módulo
+
+    parsed_ranges = []
+    container = ASTNode(ASTNodeType.PROGRAM)
+    for start, end in ranges:
+        analyzer = SyntacticAnalyzer(_worker_tokens[start:end])
+        node = analyzer.function_declaration()
+        if node and not analyzer.errors and analyzer.current == end - start:
+            parsed_ranges.append((start, end))
+            container.children.append(node)
+    return parsed_ranges, serialize_ast(container)
+
+def parse_functions_parallel(tokens, max_workers=None):
+    """
+    Parsea en un pool de procesos las funciones globales de 'tokens' (ya
+    filtrados) y devuelve el diccionario 'preparsed' para SyntacticAnalyzer.
+    """
+    from cache_ast import deserialize_ast
+
+    workers = max_workers or os.cpu_count() or 1
+    if workers < 2:
+        return {}
+
+    ranges = find_function_ranges(tokens)
+    if len(ranges) < PARALLEL_MIN_FUNCTIONS:
+        return {}
+
+    # Varios lotes por proceso para repartir bien funciones de distinto tamaño
+    chunk_count = workers * 4
+    chunks = [[] for _ in range(chunk_count)]
+    for n, token_range in enumerate(ranges):
+        chunks[n * chunk_count // len(ranges)].append(token_range)
+
+    preparsed = {}
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_parse_worker, initargs=(tokens,)) as executor:
+        # map() entrega los lotes en orden: se deserializa uno mientras los
+        # procesos siguen parseando los siguientes
+        for parsed_ranges, data in executor.map(_parse_function_chunk, [c for c in chunks if c]):
+            container = deserialize_ast(data)
+            for (start, end), node in zip(parsed_ranges, container.children):
+                preparsed[start] = (node, end)
+    return preparsed
 
 # Función principal para análisis sintáctico
-def analyze_syntax(tokens):
-    """Analiza sintácticamente una lista de tokens"""
-    analyzer = SyntacticAnalyzer(tokens)
+def analyze_syntax(tokens, parallel=False, max_workers=None, max_errors=DEFAULT_MAX_ERRORS):
+    """
+    Analiza sintácticamente una lista de tokens. Con parallel=True las
+    funciones globales se parsean primero en varios procesos y el PROGRAM
+    se ensambla en orden con el parser secuencial. El análisis se detiene
+    tras 'max_errors' errores (None = sin límite).
+    """
+    preparsed = None
+    if parallel:
+        filtered = [t for t in tokens if t.type not in {TokenType.COMMENT, TokenType.WHITESPACE}]
+        preparsed = parse_functions_parallel(filtered, max_workers)
+
+    analyzer = SyntacticAnalyzer(tokens, preparsed, max_errors)
     ast, errors = analyzer.parse()
     
     return ast, errors
\ No newline at end of file
@@ -0,0 +1,182 @@
+# autocompletado.py
+"""
+Autocompletado del editor: nombres visibles en una posición que empiezan
+por lo que se está escribiendo.
+
+Los nombres (palabras reservadas y declaraciones del índice de referencias
+cruzadas) se guardan en un trie de prefijos, así que buscar las
+candidatas cuesta lo que mide el prefijo más lo que se devuelve, sin
+recorrer la tabla de símbolos. Cada declaración lleva el tramo del código
+en que es visible: desde su posición hasta el final de su ámbito (la
+función, main o el bloque que la contiene), y de varias declaraciones
+visibles con el mismo nombre gana la más interna.
+
+El índice de un documento se conserva entre compilaciones y update() solo
+toca en el trie las declaraciones que aparecieron, cambiaron o
+desaparecieron.
+"""
+from analizador_lexico import LexicalAnalyzer
+from analizador_sintactico import ASTNodeType
+
+# Palabras que el léxico trata como identificadores y el parser reconoce por su texto
+CONTEXTUAL_KEYWORDS = ('then', 'until', 'true', 'false')
+KEYWORDS = tuple(sorted(LexicalAnalyzer().keywords.union(CONTEXTUAL_KEYWORDS)))
+
+# Caracteres de un identificador (el prefijo se busca hacia atrás desde el cursor)
+IDENTIFIER_CHARS = frozenset('abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789_')
+
+# Nodos cuya posición puede ser la de una declaración
+DECLARATION_NODES = (ASTNodeType.IDENTIFIER, ASTNodeType.PARAMETER, ASTNodeType.FUNCTION_DECLARATION)
+
+DEFAULT_LIMIT = 50
+
+
+def opens_scope(parent, index, child):
+    """Indica si el hijo 'index' de 'parent' abre un ámbito (como en el análisis semántico)."""
+    if child.type in (ASTNodeType.FUNCTION_DECLARATION, ASTNodeType.MAIN,
+                      ASTNodeType.FOR_STATEMENT, ASTNodeType.SWITCH_STATEMENT):
+        return True
+    if parent.type == ASTNodeType.IF_STATEMENT:
+        return index >= 1
+    if parent.type == ASTNodeType.WHILE_STATEMENT:
+        return index == 1
+    if parent.type == ASTNodeType.DO_UNTIL_STATEMENT:
+        return index == 0
+    return False
+
+
+def declaration_scopes(program, positions):
+    """
+    (línea, columna) de cada nodo que puede declarar un nombre -> (nodo,
+    desplazamiento en que termina el ámbito en que lo declara). Un ámbito
+    termina donde empieza la sentencia siguiente a la que lo abre, así
+    que incluye el hueco hasta su 'end' o su llave de cierre.
+    """
+    found = {}
+    # (nodo, fin de su tramo, fin del ámbito más interno que lo contiene)
+    stack = [(program, positions.length + 1, positions.length + 1)]
+    while stack:
+        node, region_end, scope_end = stack.pop()
+        following = region_end
+        for index in range(len(node.children) - 1, -1, -1):
+            child = node.children[index]
+            if child is None:
+                continue
+            if child.type in DECLARATION_NODES and child.line is not None and child.column is not None:
+                found.setdefault((child.line, child.column), (child, scope_end))
+            child_scope_end = following if opens_scope(node, index, child) else scope_end
+            stack.append((child, following, child_scope_end))
+            span = positions.spans.get(id(child))
+            if span is not None:
+                following = span[0]
+    return found
+
+
+class _TrieNode:
+    __slots__ = ('children', 'entries')
+
+    def __init__(self):
+        self.children = {}
+        # Clave -> entrada de cada símbolo con exactamente este nombre
+        self.entries = {}
+
+
+class PrefixTrie:
+    """Trie de nombres; cada nombre guarda sus entradas por clave."""
+    def __init__(self):
+        self.root = _TrieNode()
+
+    def insert(self, name, key, entry):
+        node = self.root
+        for char in name:
+            node = node.children.setdefault(char, _TrieNode())
+        node.entries[key] = entry
+
+    def remove(self, name, key):
+        # Camino hasta el nombre para podar las ramas que quedan vacías
+        path = [self.root]
+        for char in name:
+            node = path[-1].children.get(char)
+            if node is None:
+                return
+            path.append(node)
+        path[-1].entries.pop(key, None)
+        for depth in range(len(name), 0, -1):
+            node = path[depth]
+            if node.entries or node.children:
+                break
+            del path[depth - 1].children[name[depth - 1]]
+
+    def items(self, prefix):
+        """(nombre, entradas) de los nombres que empiezan por 'prefix', en orden alfabético."""
+        node = self.root
+        for char in prefix:
+            node = node.children.get(char)
+            if node is None:
+                return
+        pending = [(prefix, node)]
+        while pending:
+            name, node = pending.pop()
+            if node.entries:
+                yield name, node.entries
+            pending.extend((name + char, node.children[char]) for char in sorted(node.children, reverse=True))
+
+
+class CompletionIndex:
+    """Nombres completables de un documento."""
+    def __init__(self):
+        self.trie = PrefixTrie()
+        for keyword in KEYWORDS:
+            self.trie.insert(keyword, ('keyword', keyword), ('keyword', None, None, None))
+        # clave de la declaración -> (clase, tipo, inicio, fin del ámbito)
+        self.entries = {}
+
+    def update(self, program, references, positions):
+        """Sincroniza el trie con las declaraciones de un programa ya analizado."""
+        entries = {}
+        if program is not None and references is not None:
+            found = declaration_scopes(program, positions)
+            for key, symbol_type in references.declarations.items():
+                name, _, line, column = key
+                start = positions.offset(line, column)
+                if start is None or (line, column) not in found:
+                    continue
+                node, scope_end = found[(line, column)]
+                if symbol_type == 'function':
+                    kind, symbol_type = 'function', node.data_type
+                elif node.type == ASTNodeType.PARAMETER:
+                    kind = 'parameter'
+                else:
+                    kind = 'variable'
+                entries[key] = (kind, symbol_type, start, scope_end)
+
+        for key in self.entries.keys() - entries.keys():
+            self.trie.remove(key[0], key)
+        for key, entry in entries.items():
+            if self.entries.get(key) != entry:
+                self.trie.insert(key[0], key, entry)
+        self.entries = entries
+
+    def complete(self, source, offset, limit=DEFAULT_LIMIT):
+        """
+        Prefijo que termina en 'offset' y, en orden alfabético, hasta
+        'limit' nombres visibles ahí que empiezan por él.
+        """
+        begin = offset
+        while begin > 0 and source[begin - 1] in IDENTIFIER_CHARS:
+            begin -= 1
+        prefix = source[begin:offset]
+
+        items = []
+        for name, entries in self.trie.items(prefix):
+            visible = None
+            for kind, symbol_type, start, scope_end in entries.values():
+                if kind == 'keyword':
+                    visible = (kind, symbol_type, -1)
+                elif start < begin < scope_end and (visible is None or start > visible[2]):
+                    visible = (kind, symbol_type, start)
+            if visible is not None:
+                items.append({'label': name, 'kind': visible[0], 'type': visible[1]})
+                if len(items) >= limit:
+                    break
+        return prefix, items
@@ -0,0 +1,197 @@
+# benchmark_tabla_hash.py
+"""
+Compara estructuras para guardar los símbolos: la tabla hash con
+encadenamiento con la función de hash original (suma de códigos), FNV-1a
+y la de Python (SipHash), la variante con direccionamiento abierto y dict.
+
+Los símbolos salen de la tabla de símbolos real: la de los programas de
+test/ y la de programas sintéticos grandes que se generan y analizan aquí.
+Para cada conjunto se mide cuántas inserciones, búsquedas con éxito y
+búsquedas fallidas por segundo hace cada estructura (el mejor de varios
+intentos), la memoria que ocupa (tracemalloc) y cómo reparte las claves.
+
+    python benchmark_tabla_hash.py [--synthetic=200,2000] [--repeat=3] [--json]
+"""
+import os
+import sys
+import json
+import time
+import tracemalloc
+
+from compilador import analizar_frontend, _int_option, BASE_DIR
+from tabla_hash import HashTable, OpenAddressingHashTable, key_hash, sum_hash, builtin_hash
+
+TEST_DIR = os.path.join(os.path.dirname(BASE_DIR), 'test')
+
+DEFAULT_SYNTHETIC_SIZES = (200, 2000)
+DEFAULT_REPEAT = 3
+
+# Nombres frecuentes en código real: se repiten en muchos ámbitos
+COMMON_NAMES = ('i', 'j', 'k', 'n', 'tmp', 'count', 'total', 'index', 'value', 'result', 'sum', 'flag')
+
+
+class DictStore:
+    """dict con la interfaz de HashTable que se mide (referencia)."""
+    def __init__(self):
+        self.symbols = {}
+
+    def insert(self, symbol_data, scope=None):
+        self.symbols[(symbol_data['name'], scope)] = symbol_data
+
+    def lookup(self, name, scope=None):
+        return self.symbols.get((name, scope))
+
+    def statistics(self):
+        return {}
+
+
+STRUCTURES = (
+    ('chaining + sum (original)', lambda: HashTable(hash_function=sum_hash)),
+    ('chaining + FNV-1a', lambda: HashTable(hash_function=key_hash)),
+    ('chaining + SipHash', lambda: HashTable(hash_function=builtin_hash)),
+    ('open addressing + FNV-1a', lambda: OpenAddressingHashTable(hash_function=key_hash)),
+    ('open addressing + SipHash', lambda: OpenAddressingHashTable(hash_function=builtin_hash)),
+    ('dict', DictStore),
+)
+
+
+def symbols_from_code(code):
+    """(nombre, ámbito, datos) de cada símbolo de la tabla de símbolos de un programa."""
+    semantico = analizar_frontend(code)['semantico']
+    if semantico is None:
+        return []
+    symbols = []
+    for scope_index, scope in enumerate(semantico['tabla_de_simbolos']):
+        for name, details in scope.items():
+            if name != '__name__':
+                symbols.append((name, scope_index, {'name': name, 'scope': scope.get('__name__'),
+                                                    'type': details.get('type')}))
+    return symbols
+
+
+def synthetic_program(functions):
+    """Programa con 'functions' funciones de parámetros y variables locales."""
+    lines = ['int global_counter = 0;']
+    for number in range(functions):
+        lines.append(f'int function_{number}(int {COMMON_NAMES[number % 4]}, float weight_{number}) {{')
+        for offset in range(4):
+            name = COMMON_NAMES[4 + (number + offset) % (len(COMMON_NAMES) - 4)]
+            lines.append(f'    int {name} = {offset};')
+        lines.append(f'    int local_{number}_a = global_counter + {number};')
+        lines.append(f'    if (local_{number}_a > 2) then int inner_{number} = 1; end')
+        lines.append(f'    return local_{number}_a;')
+        lines.append('}')
+    lines.append('main {')
+    lines.append('    int x = function_0(1, 2.0);')
+    lines.append('    cout << x;')
+    lines.append('}')
+    return '\n'.join(lines) + '\n'
+
+
+def symbol_sets(synthetic_sizes):
+    sets = []
+    corpus = []
+    for file_name in sorted(os.listdir(TEST_DIR)):
+        if file_name.endswith('.txt'):
+            with open(os.path.join(TEST_DIR, file_name), 'r', encoding='utf-8') as f:
+                # Ámbitos separados por programa
+                offset = len({scope for _, scope, _ in corpus})
+                corpus.extend((name, scope + offset, data) for name, scope, data in symbols_from_code(f.read()))
+    sets.append(('test/', corpus))
+    for functions in synthetic_sizes:
+        sets.append((f'sintético ({functions} funciones)', symbols_from_code(synthetic_program(functions))))
+    return sets
+
+
+def _best_time(operation, repeat):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        operation()
+        elapsed = time.perf_counter() - start
+        if best is None or elapsed < best:
+            best = elapsed
+    return best
+
+
+def measure(factory, symbols, repeat):
+    """Operaciones por segundo, memoria y reparto de claves de una estructura."""
+    missing = [(name + '_', scope) for name, scope, _ in symbols]
+
+    def build():
+        store = factory()
+        for name, scope, data in symbols:
+            store.insert(data, scope=scope)
+        return store
+
+    def hits():
+        for name, scope, _ in symbols:
+            store.lookup(name, scope)
+
+    def misses():
+        for name, scope in missing:
+            store.lookup(name, scope)
+
+    insert_time = _best_time(build, repeat)
+
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    store = build()
+    memory = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+
+    count = max(len(symbols), 1)
+    statistics = store.statistics()
+    return {
+        'inserts_per_second': count / insert_time,
+        'hits_per_second': count / _best_time(hits, repeat),
+        'misses_per_second': count / _best_time(misses, repeat),
+        'memory_bytes': memory,
+        'max_probe_length': statistics.get('max_probe_length'),
+        'average_probe_length': statistics.get('average_probe_length'),
+    }
+
+
+def run(synthetic_sizes=DEFAULT_SYNTHETIC_SIZES, repeat=DEFAULT_REPEAT):
+    results = []
+    for set_name, symbols in symbol_sets(synthetic_sizes):
+        rows = [dict(structure=name, **measure(factory, symbols, repeat)) for name, factory in STRUCTURES]
+        results.append({'symbols': set_name, 'count': len(symbols), 'results': rows})
+    return results
+
+
+def _format_report(results):
+    lines = []
+    header = f"{'estructura':<28}{'ins/s':>12}{'hit/s':>12}{'miss/s':>12}{'memoria':>12}{'sondeo máx':>12}{'medio':>8}"
+    for result in results:
+        lines.append(f"== {result['symbols']}: {result['count']} símbolos")
+        lines.append(header)
+        for row in result['results']:
+            max_probe = '-' if row['max_probe_length'] is None else row['max_probe_length']
+            average = '-' if row['average_probe_length'] is None else f"{row['average_probe_length']:.2f}"
+            lines.append(
+                f"{row['structure']:<28}{row['inserts_per_second']:>12,.0f}{row['hits_per_second']:>12,.0f}"
+                f"{row['misses_per_second']:>12,.0f}{row['memory_bytes'] / 1024:>10,.0f}KB{max_probe:>12}{average:>8}"
+            )
+        lines.append('')
+    return '\n'.join(lines)
+
+
+def main():
+    opciones = sys.argv[1:]
+    synthetic_sizes = DEFAULT_SYNTHETIC_SIZES
+    for opcion in opciones:
+        if opcion.startswith('--synthetic='):
+            synthetic_sizes = tuple(int(size) for size in opcion[len('--synthetic='):].split(',') if size)
+    repeat = max(_int_option(opciones, '--repeat=', DEFAULT_REPEAT), 1)
+
+    results = run(synthetic_sizes, repeat)
+    if '--json' in opciones:
+        print(json.dumps(results, indent=2))
+    else:
+        print(_format_report(results))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,321 @@
+# cache_ast.py
+import glob
+import hashlib
+import json
+import marshal
+import os
+from array import array
+
+from analizador_lexico import Token, TokenType
+from analizador_sintactico import ASTNode, ASTNodeType, SyntaxError
+from diagnosticos import Diagnostic
+from grafo_llamadas import CallGraph
+from referencias import CrossReferenceIndex
+
+# Cabecera y versión del formato binario. Cambiar FORMAT_VERSION invalida
+# todas las entradas guardadas en disco.
+MAGIC = b'KAST'
+FORMAT_VERSION = 5
+
+# Marcas especiales en la columna de tipos de nodo
+_NONE_CHILD = 0
+# Referencia a un nodo ya serializado (nodo compartido, como el de x++);
+# la columna de valores guarda su índice en preorden
+_SHARED_NODE = 255
+
+# Valor centinela para enteros/cadenas ausentes (None)
+_MISSING = -1
+
+_NODE_TYPES = {node_type.value: node_type for node_type in ASTNodeType}
+_TOKEN_TYPES = {token_type.value: token_type for token_type in TokenType}
+
+
+class _StringTable:
+    """Tabla de cadenas internadas: cada cadena se guarda una sola vez."""
+    def __init__(self):
+        self.strings = []
+        self.index = {}
+
+    def add(self, value):
+        if value is None:
+            return _MISSING
+        if not isinstance(value, str):
+            raise TypeError(f"Solo se pueden serializar cadenas, se recibió {type(value).__name__}")
+        position = self.index.get(value)
+        if position is None:
+            position = len(self.strings)
+            self.index[value] = position
+            self.strings.append(value)
+        return position
+
+
+def _int_or_missing(value):
+    return _MISSING if value is None else value
+
+
+def serialize_ast(root):
+    """
+    Serializa un AST (incluidas las anotaciones semánticas) a un formato
+    binario compacto por columnas: cada atributo del nodo se guarda en un
+    arreglo contiguo en preorden y las cadenas en una tabla común. Los nodos
+    que aparecen varias veces (como el identificador de x++) se guardan una
+    vez y luego se referencian.
+    """
+    strings = _StringTable()
+    kinds = array('B')
+    child_counts = array('I')
+    values = array('i')
+    lines = array('i')
+    columns = array('i')
+    data_types = array('i')
+    scopes = array('i')
+    states = array('i')
+
+    # id(nodo) -> índice en preorden, para detectar nodos compartidos
+    seen = {}
+
+    # Recorrido iterativo en preorden para no depender del límite de recursión
+    stack = [root]
+    while stack:
+        node = stack.pop()
+        if node is None or id(node) in seen:
+            kinds.append(_NONE_CHILD if node is None else _SHARED_NODE)
+            child_counts.append(0)
+            values.append(_MISSING if node is None else seen[id(node)])
+            lines.append(_MISSING)
+            columns.append(_MISSING)
+            data_types.append(_MISSING)
+            scopes.append(_MISSING)
+            states.append(_MISSING)
+            continue
+
+        seen[id(node)] = len(kinds)
+        kinds.append(node.type.value)
+        child_counts.append(len(node.children))
+        values.append(strings.add(node.value))
+        lines.append(_int_or_missing(node.line))
+        columns.append(_int_or_missing(node.column))
+        data_types.append(strings.add(node.data_type))
+        scopes.append(strings.add(node.scope))
+        states.append(strings.add(node.state))
+
+        stack.extend(reversed(node.children))
+
+    payload = (
+        FORMAT_VERSION,
+        tuple(strings.strings),
+        kinds.tobytes(),
+        child_counts.tobytes(),
+        values.tobytes(),
+        lines.tobytes(),
+        columns.tobytes(),
+        data_types.tobytes(),
+        scopes.tobytes(),
+        states.tobytes(),
+    )
+    return MAGIC + marshal.dumps(payload)
+
+
+def _load_array(typecode, raw):
+    result = array(typecode)
+    result.frombytes(raw)
+    return result
+
+
+def deserialize_ast(data):
+    """Reconstruye el AST producido por serialize_ast."""
+    if data[:len(MAGIC)] != MAGIC:
+        raise ValueError("Los datos no contienen un AST serializado")
+
+    payload = marshal.loads(data[len(MAGIC):])
+    if payload[0] != FORMAT_VERSION:
+        raise ValueError(f"Versión de formato de AST no soportada: {payload[0]}")
+
+    strings = payload[1]
+    kinds = payload[2]  # bytes: cada elemento ya es un entero
+    child_counts = _load_array('I', payload[3])
+    values = _load_array('i', payload[4])
+    lines = _load_array('i', payload[5])
+    columns = _load_array('i', payload[6])
+    data_types = _load_array('i', payload[7])
+    scopes = _load_array('i', payload[8])
+    states = _load_array('i', payload[9])
+
+    if not kinds:
+        return None
+
+    root = None
+    # Nodos en preorden (para resolver las referencias a nodos compartidos)
+    nodes = []
+    # Pila de (lista de hijos del padre, hijos pendientes)
+    pending = []
+    for i, kind in enumerate(kinds):
+        if kind == _NONE_CHILD:
+            node = None
+        elif kind == _SHARED_NODE:
+            node = nodes[values[i]]
+        else:
+            value_index = values[i]
+            line = lines[i]
+            column = columns[i]
+            node = ASTNode(
+                _NODE_TYPES[kind],
+                strings[value_index] if value_index != _MISSING else None,
+                None,
+                line if line != _MISSING else None,
+                column if column != _MISSING else None,
+            )
+            index = data_types[i]
+            if index != _MISSING:
+                node.data_type = strings[index]
+            index = scopes[i]
+            if index != _MISSING:
+                node.scope = strings[index]
+            index = states[i]
+            if index != _MISSING:
+                node.state = strings[index]
+        nodes.append(node)
+
+        if pending:
+            siblings, remaining = pending[-1]
+            siblings.append(node)
+            if remaining == 1:
+                pending.pop()
+            else:
+                pending[-1] = (siblings, remaining - 1)
+        else:
+            root = node
+
+        if kind not in (_NONE_CHILD, _SHARED_NODE) and child_counts[i]:
+            pending.append((node.children, child_counts[i]))
+
+    return root
+
+
+def _tokens_to_rows(tokens):
+    return [(token.type.value, token.value, token.line, token.column) for token in tokens]
+
+
+def _rows_to_tokens(rows):
+    return [Token(_TOKEN_TYPES[kind], value, line, column) for kind, value, line, column in rows]
+
+
+def compiler_fingerprint(base_dir, version):
+    """
+    Huella del compilador: versión declarada más el contenido de los módulos
+    Python. Así, cualquier cambio en el compilador invalida la caché.
+    """
+    digest = hashlib.sha256(version.encode('utf-8'))
+    for path in sorted(glob.glob(os.path.join(base_dir, '*.py'))):
+        with open(path, 'rb') as f:
+            digest.update(f.read())
+    return digest.hexdigest()[:16]
+
+
+class ASTCache:
+    """
+    Caché en disco de los resultados del frontend (tokens, AST anotado,
+    errores y tabla de símbolos), indexada por el hash del código fuente y
+    la huella del compilador.
+    """
+    def __init__(self, directory, compiler_version, max_entries=64):
+        self.directory = directory
+        self.compiler_version = compiler_version
+        self.max_entries = max_entries
+
+    def key(self, codigo, variant=""):
+        """'variant' distingue entradas del mismo código con opciones distintas."""
+        digest = hashlib.sha256(self.compiler_version.encode('utf-8'))
+        digest.update(b'\0')
+        digest.update(variant.encode('utf-8'))
+        digest.update(b'\0')
+        digest.update(codigo.encode('utf-8'))
+        return digest.hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.directory, f"{key}.kast")
+
+    def load(self, codigo, variant=""):
+        """Devuelve la entrada guardada para 'codigo' o None si no existe o es inválida."""
+        path = self._path(self.key(codigo, variant))
+        try:
+            with open(path, 'rb') as f:
+                data = f.read()
+            # Marcar la entrada como usada recientemente (para _prune)
+            os.utime(path)
+        except OSError:
+            return None
+
+        try:
+            payload = marshal.loads(data)
+            if payload[0] != FORMAT_VERSION:
+                return None
+            (_, token_rows, lex_error_rows, ast_data, syntax_rows, semantic_rows, symbols_json,
+             call_graph_row, references_row) = payload
+            semantico = None
+            if semantic_rows is not None:
+                semantico = {
+                    'errores_semanticos': [Diagnostic.from_row(row) for row in semantic_rows],
+                    'tabla_de_simbolos': json.loads(symbols_json),
+                    'grafo_llamadas': CallGraph.from_row(call_graph_row),
+                    'referencias': CrossReferenceIndex.from_row(references_row),
+                }
+            return {
+                'tokens': _rows_to_tokens(token_rows),
+                'errores_lexicos': _rows_to_tokens(lex_error_rows),
+                'ast': deserialize_ast(ast_data) if ast_data else None,
+                'errores_sintacticos': [SyntaxError.from_row(row) for row in syntax_rows],
+                'semantico': semantico,
+            }
+        except Exception:
+            # Entrada corrupta o de otro formato (cualquier fallo al decodificarla):
+            # se borra y se regenerará
+            self._discard(path)
+            return None
+
+    def _discard(self, path):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+    def store(self, codigo, entry, variant=""):
+        """Guarda una entrada de forma atómica (archivo temporal + rename)."""
+        os.makedirs(self.directory, exist_ok=True)
+        # Los errores se guardan como filas (código, línea, columna, argumentos)
+        semantico = entry['semantico']
+        semantic_rows = None
+        symbols_json = 'null'
+        call_graph_row = None
+        references_row = None
+        if semantico is not None:
+            semantic_rows = [error.to_row() for error in semantico['errores_semanticos']]
+            symbols_json = json.dumps(semantico['tabla_de_simbolos'])
+            call_graph_row = semantico['grafo_llamadas'].to_row()
+            references_row = semantico['referencias'].to_row()
+        payload = (
+            FORMAT_VERSION,
+            _tokens_to_rows(entry['tokens']),
+            _tokens_to_rows(entry['errores_lexicos']),
+            serialize_ast(entry['ast']) if entry['ast'] else b'',
+            [error.to_row() for error in entry['errores_sintacticos']],
+            semantic_rows,
+            symbols_json,
+            call_graph_row,
+            references_row,
+        )
+        path = self._path(self.key(codigo, variant))
+        temp_path = f"{path}.{os.getpid()}.tmp"
+        with open(temp_path, 'wb') as f:
+            f.write(marshal.dumps(payload))
+        os.replace(temp_path, path)
+        self._prune()
+
+    def _prune(self):
+        """Elimina las entradas más antiguas si se supera max_entries."""
+        entries = glob.glob(os.path.join(self.directory, '*.kast'))
+        if len(entries) <= self.max_entries:
+            return
+        entries.sort(key=os.path.getmtime)
+        for path in entries[:len(entries) - self.max_entries]:
+            self._discard(path)
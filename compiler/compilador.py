@@ -5,17 +5,41 @@ import traceback
 import os
 import subprocess
 import stat
+import io
 
 from analizador_lexico import LexicalAnalyzer, TokenType
-from analizador_sintactico import analyze_syntax, format_ast_tree, ast_to_html
-from analizador_sintactico import export_ast_graphviz
-from analizador_semantico import SemanticAnalyzer, semantic_tree_to_html
-from tabla_hash import populate_hash_table_from_symbol_table, hash_table_to_html
+from analizador_sintactico import analyze_syntax
+from analizador_semantico import SemanticAnalyzer
+from renderizador_ast import render_views
+from tabla_hash import populate_hash_table_from_symbol_table, hash_table_to_html, hash_table_page
 from generador_llvm import CodeGenerator
+from optimizador import optimize_ast
+from cache_ast import ASTCache, compiler_fingerprint
+from dag_expresiones import ExpressionDAG
+from json_ast import StreamedAST, write_result
+from exportador_grafo import ASTGraphExporter, DEFAULT_MAX_DEPTH, DEFAULT_MAX_NODES
+from diagnosticos import (Diagnostic, DEFAULT_MAX_ERRORS, UNRECOGNIZED_CHARACTER, CODEGEN_FAILURE,
+                          limit_diagnostics)
 
 # Directorio donde se encuentra este archivo
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 
+# Versión del compilador (debe coincidir con package.json)
+COMPILER_VERSION = "1.2.0"
+
+# Directorio de la caché de análisis en disco
+CACHE_DIR = os.path.join(BASE_DIR, ".cache_ast")
+
+# Directorio de las imágenes del AST generadas con Graphviz
+GRAPH_DIR = os.path.join(BASE_DIR, "ast_visual")
+
+def _int_option(opciones, prefijo, por_defecto):
+    """Lee una opción '--nombre=N' de la línea de comandos."""
+    for opcion in opciones:
+        if opcion.startswith(prefijo):
+            return int(opcion[len(prefijo):])
+    return por_defecto
+
 def main():
     try:
         if len(sys.argv) < 2:
@@ -23,18 +47,42 @@ def main():
             return 1
         
         input_file = sys.argv[1]
+        opciones = sys.argv[2:]
         
-        run_mode = False
-        
-        # Si hay un segundo argumento y es '--run', activamos el modo ejecución
-        if len(sys.argv) > 2 and sys.argv[2] == '--run':
-            run_mode = True
+        # '--run' activa el modo ejecución
+        run_mode = '--run' in opciones
+
+        # '--parallel' parsea y analiza las funciones globales en varios procesos
+        parallel = '--parallel' in opciones
+
+        # '--share-expressions' reutiliza el análisis de las subexpresiones repetidas (DAG)
+        share_expressions = '--share-expressions' in opciones
+
+        # '--max-errors=N' detiene cada fase tras N errores (0 = sin límite)
+        max_errors = _int_option(opciones, '--max-errors=', DEFAULT_MAX_ERRORS) or None
+
+        # '--no-cache' desactiva la caché de análisis en disco
+        cache = None
+        if '--no-cache' not in opciones:
+            cache = ASTCache(CACHE_DIR, compiler_fingerprint(BASE_DIR, COMPILER_VERSION))
+
+        # '--graph' exporta el AST con Graphviz (solo bajo demanda).
+        # '--graph-depth=N' y '--graph-nodes=N' acotan el tamaño del grafo
+        graph_exporter = None
+        if '--graph' in opciones:
+            graph_exporter = ASTGraphExporter(
+                GRAPH_DIR,
+                max_depth=_int_option(opciones, '--graph-depth=', DEFAULT_MAX_DEPTH),
+                max_nodes=_int_option(opciones, '--graph-nodes=', DEFAULT_MAX_NODES),
+            )
 
         with open(input_file, 'r') as f:
             codigo = f.read()
 
-        resultado = compilar(codigo, run_mode)
-        print(resultado)
+        # La salida se escribe por fragmentos, sin construir el JSON completo
+        compilar(codigo, run_mode, cache=cache, parallel=parallel, share_expressions=share_expressions,
+                 graph_exporter=graph_exporter, output=sys.stdout, max_errors=max_errors)
+        sys.stdout.write("\n")
         return 0
 
     except Exception as e:
@@ -115,45 +163,162 @@ def run_llvm_compiler(ll_filename, output_exe_name):
         print(f"Error: No se encontró un comando (¿LLVM no está en el PATH?): {e}", file=sys.stderr)
         return {"success": False, "error": f"Comando no encontrado: {e.filename}. Asegúrate de que LLVM esté instalado y en tu PATH."}
 
-def compilar(codigo, run_mode=False):
-    # Análisis léxico
+def analizar_frontend(codigo, parallel=False, share_expressions=False, unit_cache=None,
+                      max_errors=DEFAULT_MAX_ERRORS):
+    """
+    Ejecuta el frontend completo (léxico, sintáctico y semántico) y devuelve
+    sus resultados en un diccionario apto para guardarse en la caché.
+    unit_cache (FunctionAnalysisCache) reutiliza el análisis de los cuerpos
+    de función que no cambiaron desde la compilación anterior. Las fases
+    sintáctica y semántica se detienen tras 'max_errors' errores; los
+    errores son objetos Diagnostic, que se formatean al generar la salida.
+    """
     analizador = LexicalAnalyzer()
     tokens, errores_lexicos = analizador.analyze(codigo)
+
+    ast = None
+    errores_sintacticos = []
+    if not errores_lexicos:
+        ast, errores_sintacticos = analyze_syntax(tokens, parallel=parallel, max_errors=max_errors)
+
+    # El análisis semántico solo se ejecuta sobre programas sin errores previos
+    semantico = None
+    if not errores_lexicos and not errores_sintacticos:
+        # Agrupar subexpresiones idénticas para reutilizar su análisis
+        dag = None
+        if share_expressions:
+            dag = ExpressionDAG()
+            dag.share(ast)
+        sem_analyzer = SemanticAnalyzer(dag=dag, unit_cache=unit_cache, parallel=parallel,
+                                        max_errors=max_errors)
+        errores_semanticos, tabla_de_simbolos = sem_analyzer.analyze(ast, codigo)
+        semantico = {
+            'errores_semanticos': errores_semanticos,
+            'tabla_de_simbolos': tabla_de_simbolos,
+            'grafo_llamadas': sem_analyzer.call_graph,
+            'referencias': sem_analyzer.cross_references,
+        }
+
+    return {
+        'tokens': tokens,
+        'errores_lexicos': errores_lexicos,
+        'ast': ast,
+        'errores_sintacticos': errores_sintacticos,
+        'semantico': semantico,
+    }
+
+def obtener_frontend(codigo, cache=None, parallel=False, share_expressions=False, unit_cache=None,
+                     max_errors=DEFAULT_MAX_ERRORS):
+    """Resultados del frontend, reutilizando la caché en disco si el código ya fue analizado."""
+    variante = "dag" if share_expressions else ""
+    if max_errors != DEFAULT_MAX_ERRORS:
+        # Con otro presupuesto la lista de errores puede ser distinta
+        variante += f"max{max_errors}"
+    frontend = cache.load(codigo, variante) if cache else None
+    if frontend is None:
+        frontend = analizar_frontend(codigo, parallel=parallel, share_expressions=share_expressions,
+                                     unit_cache=unit_cache, max_errors=max_errors)
+        if cache:
+            cache.store(codigo, frontend, variante)
+    return frontend
+
+def compilar(codigo, run_mode=False, cache=None, parallel=False, share_expressions=False,
+             graph_exporter=None, output=None, max_errors=DEFAULT_MAX_ERRORS):
+    """
+    Compila 'codigo' y devuelve la salida en JSON. Si se indica 'output', el
+    JSON se escribe ahí por fragmentos (el AST se codifica en streaming) y
+    la función devuelve None.
+    """
+    frontend = obtener_frontend(codigo, cache=cache, parallel=parallel, share_expressions=share_expressions,
+                                max_errors=max_errors)
+    resultado = generar_resultado(codigo, frontend, run_mode, graph_exporter=graph_exporter,
+                                  ast_en_streaming=True, max_errors=max_errors)
+    if output is not None:
+        write_result(resultado, output)
+        return None
+    buffer = io.StringIO()
+    write_result(resultado, buffer)
+    return buffer.getvalue()
+
+def generar_resultado(codigo, frontend, run_mode=False, graph_exporter=None, vistas_ast=True,
+                      with_ids=False, profundidad_ast=None, escribir_archivos=True,
+                      ast_en_streaming=False, max_errors=DEFAULT_MAX_ERRORS, pagina_tabla_hash=None):
+    """
+    Construye la salida del compilador (diccionario) a partir del frontend.
+    vistas_ast=False omite las vistas completas del AST (el servidor envía
+    diferencias), profundidad_ast limita los niveles de las vistas HTML y
+    dict, y escribir_archivos=False no genera los archivos de depuración.
+    Con ast_en_streaming, 'ast' es un StreamedAST (ver json_ast.write_result)
+    en lugar de diccionarios anidados. max_errors acota los errores léxicos
+    mostrados (el analizador léxico los recoge todos para el coloreado).
+    pagina_tabla_hash=N renderiza solo los N primeros buckets de la tabla
+    hash y describe la página en 'hash_table_pagina' (el servidor envía
+    las demás bajo demanda).
+    """
+    analizador = LexicalAnalyzer()
+
+    tokens = frontend['tokens']
+    errores_lexicos = frontend['errores_lexicos']
     
+    diagnosticos_lexicos = limit_diagnostics(
+        [Diagnostic(UNRECOGNIZED_CHARACTER, e.line, e.column, (e.value,)) for e in errores_lexicos], max_errors)
+
     # Filtrar los tokens para la escritura en archivo
     tokens_filtrados = [token for token in tokens if token.type != TokenType.COMMENT]
 
-    # Guardar tokens en archivo
-    with open(os.path.join(BASE_DIR, "tokens.txt"), "w", encoding="utf-8") as f:
-        for token in tokens_filtrados:
-            f.write(str(token) + "\n")
+    if escribir_archivos:
+        # Guardar tokens en archivo
+        with open(os.path.join(BASE_DIR, "tokens.txt"), "w", encoding="utf-8") as f:
+            for token in tokens_filtrados:
+                f.write(str(token) + "\n")
 
-    # Guardar errores léxicos en archivo
-    with open(os.path.join(BASE_DIR, "errores_lexicos.txt"), "w", encoding="utf-8") as f:
-        for error in errores_lexicos:
-            f.write(f"Error léxico en línea {error.line}, columna {error.column}: '{error.value}'\n")
+        # Guardar errores léxicos en archivo
+        with open(os.path.join(BASE_DIR, "errores_lexicos.txt"), "w", encoding="utf-8") as f:
+            for error in diagnosticos_lexicos:
+                f.write(str(error) + "\n")
     
     # Análisis sintáctico (solo si no hay errores léxicos)
-    ast = None
-    errores_sintacticos = []
+    ast = frontend['ast']
+    errores_sintacticos = frontend['errores_sintacticos']
+
+    # Imagen del AST: solo si se pidió, en segundo plano mientras se
+    # genera el resto de la salida
+    graphviz_future = None
+    if graph_exporter and ast and not errores_lexicos:
+        graphviz_future = graph_exporter.export_async(ast)
+
     ast_text = ""
     ast_html = ""
     semantic_tree_html = ""
+    ast_dict = None
+
+    # Todas las vistas del AST (texto, HTML, HTML semántico y diccionario)
+    # se generan en un único recorrido
+    vistas = []
+    if ast:
+        if vistas_ast:
+            vistas = ['text', 'html']
+            if ast_en_streaming:
+                ast_dict = StreamedAST(ast)
+            else:
+                vistas.append('dict')
+            if frontend['semantico'] is not None:
+                vistas.append('semantic_html')
+        elif escribir_archivos:
+            vistas = ['text']
+    if vistas:
+        renderizado = render_views(ast, vistas, with_ids=with_ids, max_depth=profundidad_ast)
+        ast_text = renderizado['text']
+        ast_html = renderizado.get('html', "")
+        if 'dict' in renderizado:
+            ast_dict = renderizado['dict']
+        semantic_tree_html = renderizado.get('semantic_html', "")
     
-    if not errores_lexicos:
-        ast, errores_sintacticos = analyze_syntax(tokens)
-        
+    if not errores_lexicos and escribir_archivos:
         # Guardar AST en archivo
         if ast:
-            ast_text = format_ast_tree(ast)
             with open(os.path.join(BASE_DIR, "ast.txt"), "w", encoding="utf-8") as f:
                 f.write(ast_text)
-            
-            # Generar HTML del AST
-            ast_html = ast_to_html(ast)
-
-            # Exportar imagen del AST
-            graphviz_path = export_ast_graphviz(ast, filename=os.path.join(BASE_DIR, "ast_visual"))
         
         # Guardar errores sintácticos en archivo
         with open(os.path.join(BASE_DIR, "errores_sintacticos.txt"), "w", encoding="utf-8") as f:
@@ -163,32 +328,40 @@ def compilar(codigo, run_mode=False):
     # Análisis semántico 
     errores_semanticos = []
     tabla_de_simbolos = {}  # Inicializamos la tabla
+    grafo_llamadas = None
     hash_table_html = "" # Inicializamos el HTML de la tabla hash
+    hash_table_pagina = None
     
-    if not errores_lexicos and not errores_sintacticos:
-        sem_analyzer = SemanticAnalyzer()
-        errores_semanticos, tabla_de_simbolos = sem_analyzer.analyze(ast)
+    if frontend['semantico'] is not None:
+        errores_semanticos = frontend['semantico']['errores_semanticos']
+        tabla_de_simbolos = frontend['semantico']['tabla_de_simbolos']
+        # Funciones, llamadas, recursión y alcanzabilidad desde main (para la vista del IDE)
+        grafo_llamadas = frontend['semantico']['grafo_llamadas'].to_dict()
 
-        semantic_tree_html = semantic_tree_to_html(ast)
-        
         # Crear y poblar la tabla hash desde la tabla de símbolos
         populated_hash_table = populate_hash_table_from_symbol_table(tabla_de_simbolos, hash_table_size=16)
-        # Generar HTML de la tabla hash
-        hash_table_html = hash_table_to_html(populated_hash_table)
+        # Generar HTML de la tabla hash (o de su primera página)
+        if pagina_tabla_hash is None:
+            hash_table_html = hash_table_to_html(populated_hash_table)
+        else:
+            hash_table_pagina = hash_table_page(populated_hash_table, 0, pagina_tabla_hash)
+            hash_table_html = hash_table_pagina.pop('html')
         
-        # Guardar errores semánticos en archivo
-        with open(os.path.join(BASE_DIR, "errores_semanticos.txt"), "w", encoding="utf-8") as f:
-            for error in errores_semanticos:
-                f.write(error + "\n")
-
-        # Guardar tabla de símbolos en archivo
-        with open(os.path.join(BASE_DIR, "tabla_de_simbolos.json"), "w", encoding="utf-8") as f:
-            json.dump(tabla_de_simbolos, f, indent=4)
+        if escribir_archivos:
+            # Guardar errores semánticos en archivo
+            with open(os.path.join(BASE_DIR, "errores_semanticos.txt"), "w", encoding="utf-8") as f:
+                for error in errores_semanticos:
+                    f.write(str(error) + "\n")
+
+            # Guardar tabla de símbolos en archivo
+            with open(os.path.join(BASE_DIR, "tabla_de_simbolos.json"), "w", encoding="utf-8") as f:
+                json.dump(tabla_de_simbolos, f, indent=4)
     
     # Guardar HTML coloreado
     html_coloreado = analizador.generate_html(codigo)
-    with open(os.path.join(BASE_DIR, "salida.html"), "w", encoding="utf-8") as f:
-        f.write(html_coloreado)
+    if escribir_archivos:
+        with open(os.path.join(BASE_DIR, "salida.html"), "w", encoding="utf-8") as f:
+            f.write(html_coloreado)
 
     # Incluir tanto tokens válidos como errores para el coloreado
     todos_los_tokens = tokens + errores_lexicos
@@ -203,9 +376,11 @@ def compilar(codigo, run_mode=False):
         print("--- MODO RUN ACTIVADO: Iniciando compilación LLVM ---", file=sys.stderr)
         
         try:
-            # 1. Generar el LLVM IR
+            # 1. Plegar y propagar constantes y generar el LLVM IR (el AST
+            #    optimizado es una copia: 'ast' sigue siendo el de las vistas)
+            ast_optimizado, _ = optimize_ast(ast)
             code_gen = CodeGenerator()
-            llvm_ir = code_gen.generate(ast)
+            llvm_ir = code_gen.generate(ast_optimizado)
             
             # 2. Guardar el archivo .ll
             ll_filename = os.path.join(BASE_DIR, "programa.ll")
@@ -221,9 +396,20 @@ def compilar(codigo, run_mode=False):
 
         except Exception as e:
             # Capturar errores del *generador de código*
-            errores_semanticos.append(f"Error de Generación de Código: {e}\n{traceback.format_exc()}")
+            # (lista nueva: la del frontend puede estar en la caché del servidor)
+            errores_semanticos = errores_semanticos + [
+                Diagnostic(CODEGEN_FAILURE, None, None, (e, traceback.format_exc()))
+            ]
 
-    return json.dumps({
+    # Esperar a la imagen del AST (si se pidió)
+    ast_visual = None
+    if graphviz_future:
+        try:
+            ast_visual = graphviz_future.result()
+        except Exception as e:
+            print(f"Error al exportar el AST con Graphviz: {e}", file=sys.stderr)
+
+    return {
         'tokens': [
             {
                 'type': token.type.name,
@@ -232,22 +418,22 @@ def compilar(codigo, run_mode=False):
                 'column': token.column
             } for token in todos_los_tokens
         ],
-        'errores_lexicos': [
-            f"Error léxico en línea {e.line}, columna {e.column}: Carácter no reconocido '{e.value}'"
-            for e in errores_lexicos
-        ],
-        'ast': ast.to_dict() if ast else None,
+        'errores_lexicos': [str(e) for e in diagnosticos_lexicos],
+        'ast': ast_dict,
         'ast_text': ast_text,
         'ast_html': ast_html,
         'semantic_tree_html': semantic_tree_html,
         'hash_table_html': hash_table_html,
+        'hash_table_pagina': hash_table_pagina,
         'errores_sintacticos': [str(e) for e in errores_sintacticos],
         'errores_semanticos': [str(e) for e in errores_semanticos],
         'tabla_de_simbolos': tabla_de_simbolos, #Incluir la tabla en la salida
+        'grafo_llamadas': grafo_llamadas,
         'llvm_ir': llvm_ir,  # <-- Nuevo
         'compilacion_llvm': compilacion_llvm_log, # <-- Nuevo
-        'html_coloreado': html_coloreado
-    })
+        'html_coloreado': html_coloreado,
+        'ast_visual': ast_visual
+    }
 
 if __name__ == "__main__":
     sys.exit(main())
\ No newline at end of file
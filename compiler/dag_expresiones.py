@@ -0,0 +1,130 @@
+# dag_expresiones.py
+from analizador_sintactico import ASTNodeType
+
+# Nodos de expresión sin efectos secundarios que pueden compartirse.
+# FUNCTION_CALL queda fuera: una llamada puede tener efectos (cout, cin...).
+SHAREABLE_TYPES = {
+    ASTNodeType.BINARY_OP,
+    ASTNodeType.UNARY_OP,
+    ASTNodeType.IDENTIFIER,
+    ASTNodeType.NUMBER,
+    ASTNodeType.STRING,
+    ASTNodeType.BOOLEAN,
+}
+
+# Tamaño mínimo (en nodos) para memoizar el tipo de una subexpresión:
+# en expresiones pequeñas es más barato volver a visitarlas
+MEMO_MIN_SIZE = 7
+
+# Posiciones de los hijos que son expresiones, según el tipo del padre.
+# None significa "todos los hijos".
+EXPRESSION_SLOTS = {
+    ASTNodeType.BINARY_OP: (0, 1),
+    ASTNodeType.UNARY_OP: (0,),
+    ASTNodeType.FUNCTION_CALL: None,
+    ASTNodeType.ASSIGNMENT: (1,),
+    ASTNodeType.RETURN_STATEMENT: (0,),
+    ASTNodeType.OUTPUT_STATEMENT: (0,),
+    ASTNodeType.IF_STATEMENT: (0,),
+    ASTNodeType.WHILE_STATEMENT: (0,),
+    ASTNodeType.DO_UNTIL_STATEMENT: (1,),
+    ASTNodeType.FOR_STATEMENT: (1,),
+    ASTNodeType.SWITCH_STATEMENT: (0,),
+}
+
+
+class ExpressionDAG:
+    """
+    Capa de hash-consing: agrupa las subexpresiones estructuralmente
+    idénticas y sin efectos en clases con un único nodo canónico, su primera
+    aparición en el código. El AST no se modifica: cada aparición conserva
+    su posición, su node_id y sus propias anotaciones (tipo, ámbito,
+    estado), que dependen de dónde aparece. La clase solo sirve para
+    reutilizar el análisis de una aparición en las demás con los mismos
+    símbolos (ver SemanticAnalyzer.visit_shared).
+    """
+    def __init__(self):
+        # Clave estructural -> nodo canónico
+        self.table = {}
+        # id(aparición) -> nodo canónico de su clase
+        self.canonical = {}
+        # id(nodo canónico) -> nombres de variables que aparecen en la subexpresión
+        self.free_names = {}
+        # id(nodo canónico) -> número de nodos de la subexpresión
+        self.sizes = {}
+        self.shared_count = 0
+
+    def canonical_node(self, node):
+        """Nodo canónico de la clase de 'node', o None si no se comparte."""
+        return self.canonical.get(id(node))
+
+    def is_shared(self, node):
+        return id(node) in self.canonical
+
+    def should_memoize(self, node):
+        """Indica si conviene memoizar el tipo de esta subexpresión compartida."""
+        canonical = self.canonical.get(id(node))
+        return canonical is not None and self.sizes[id(canonical)] >= MEMO_MIN_SIZE
+
+    def share(self, root):
+        """Agrupa las subexpresiones de todo el AST en orden del código. Devuelve la raíz."""
+        stack = [root]
+        while stack:
+            node = stack.pop()
+            if node is None:
+                continue
+            self._share_slots(node)
+            # Las sentencias anidadas (bloques, cuerpos...) se recorren igual,
+            # de izquierda a derecha
+            for child in reversed(node.children):
+                if child is not None and child.type not in SHAREABLE_TYPES:
+                    stack.append(child)
+        return root
+
+    def _share_slots(self, node):
+        if node.type not in EXPRESSION_SLOTS:
+            return
+        slots = EXPRESSION_SLOTS[node.type]
+        if slots is None:
+            slots = range(len(node.children))
+        for index in slots:
+            if index < len(node.children) and node.children[index] is not None:
+                self.intern(node.children[index])
+
+    def intern(self, node):
+        """Añade 'node' a su clase y devuelve el nodo canónico (None si no se comparte)."""
+        canonical = self.canonical.get(id(node))
+        if canonical is not None:
+            return canonical
+
+        # Una llamada no se comparte, pero sus argumentos sí
+        self._share_slots(node)
+        if node.type not in SHAREABLE_TYPES:
+            return None
+
+        children = [self.canonical.get(id(child)) if child is not None else None for child in node.children]
+        if any(child is None for child in children):
+            # Contiene algo no compartible (p. ej. una llamada): se deja tal cual
+            return None
+
+        key = (node.type, node.value, tuple(id(child) for child in children))
+        canonical = self.table.get(key)
+        if canonical is not None:
+            self.shared_count += 1
+        else:
+            canonical = node
+            if node.type == ASTNodeType.IDENTIFIER:
+                names = (node.value,)
+            else:
+                names = tuple(sorted({name for child in children for name in self.free_names[id(child)]}))
+            self.table[key] = node
+            self.free_names[id(node)] = names
+            self.sizes[id(node)] = 1 + sum(self.sizes[id(child)] for child in children)
+        self.canonical[id(node)] = canonical
+        return canonical
+
+    def stats(self):
+        return {
+            'canonical_nodes': len(self.table),
+            'shared_occurrences': self.shared_count,
+        }
@@ -0,0 +1,233 @@
+# diagnosticos.py
+"""
+Diagnósticos estructurados del compilador.
+
+Cada error es un Diagnostic con un código, su posición (línea, columna) y
+los argumentos del mensaje. El texto en español se construye solo cuando se
+pide (str(diagnóstico) al escribir la salida), de modo que los errores que
+se descartan por duplicados o por superar el presupuesto nunca se formatean.
+
+Cada fase tiene un presupuesto de errores (max_errors): al superarlo se
+registra TOO_MANY_ERRORS y la fase se detiene lanzando ErrorBudgetExceeded,
+así el tiempo de análisis de una entrada patológica queda acotado.
+"""
+
+# Presupuesto de errores por fase si no se indica otro
+DEFAULT_MAX_ERRORS = 100
+
+# --- Códigos ---
+
+# Léxicos
+UNRECOGNIZED_CHARACTER = 'LEX001'
+
+# Sintácticos
+UNPROCESSED_TOKENS = 'SIN001'
+UNEXPECTED_FAILURE = 'SIN002'
+UNEXPECTED_EOF = 'SIN003'
+EXPECTED_TOKEN_TYPE = 'SIN004'
+EXPECTED_TOKEN_VALUE = 'SIN005'
+EXPECTED_TOP_LEVEL_DECLARATION = 'SIN006'
+INVALID_PARAMETER = 'SIN007'
+EXPECTED_MAIN = 'SIN008'
+MISSING_CLOSING_BRACE = 'SIN009'
+MISSING_SEMICOLON_AFTER = 'SIN010'
+MISSING_SEMICOLON_AT_END = 'SIN011'
+INVALID_STATEMENT = 'SIN012'
+UNEXPECTED_STATEMENT_TOKEN = 'SIN013'
+EXPECTED_INCREMENT_OPERATOR = 'SIN014'
+MISSING_CLOSING_PARENTHESIS = 'SIN015'
+CONDITION_WITHOUT_PARENTHESES = 'SIN016'
+EXPECTED_THEN = 'SIN017'
+MISSING_END = 'SIN018'
+EXPECTED_UNTIL = 'SIN019'
+EXPECTED_CASE = 'SIN020'
+NON_CONSTANT_CASE = 'SIN021'
+MISSING_BREAK = 'SIN022'
+EXPECTED_EXPRESSION = 'SIN023'
+UNEXPECTED_EXPRESSION_TOKEN = 'SIN024'
+EXPECTED_ARGUMENT_SEPARATOR = 'SIN025'
+
+# Semánticos
+SYMBOL_REDEFINED = 'SEM001'
+UNDECLARED_VARIABLE = 'SEM002'
+INCOMPATIBLE_ASSIGNMENT = 'SEM003'
+INCOMPATIBLE_ARITHMETIC = 'SEM004'
+INCOMPATIBLE_COMPARISON = 'SEM005'
+INVALID_LOGICAL_OPERANDS = 'SEM006'
+INVALID_UNARY_OPERAND = 'SEM007'
+INVALID_CONDITION = 'SEM008'
+UNDECLARED_INPUT_VARIABLE = 'SEM009'
+INVALID_SWITCH_TYPE = 'SEM010'
+DUPLICATE_CASE = 'SEM011'
+DUPLICATE_DEFAULT = 'SEM012'
+RETURN_OUTSIDE_FUNCTION = 'SEM013'
+EMPTY_RETURN = 'SEM014'
+INCOMPATIBLE_RETURN = 'SEM015'
+UNDECLARED_FUNCTION = 'SEM016'
+NOT_A_FUNCTION = 'SEM017'
+WRONG_ARGUMENT_COUNT = 'SEM018'
+INCOMPATIBLE_ARGUMENT = 'SEM019'
+
+# Generación de código
+CODEGEN_FAILURE = 'GEN001'
+
+# Común a todas las fases
+TOO_MANY_ERRORS = 'ERR001'
+
+MESSAGES = {
+    UNRECOGNIZED_CHARACTER: "Carácter no reconocido '{0}'",
+
+    UNPROCESSED_TOKENS: "Quedan {0} token(s) sin procesar. Primeros tokens: {1}",
+    UNEXPECTED_FAILURE: "Error inesperado: {0}",
+    UNEXPECTED_EOF: "Fin inesperado del archivo",
+    EXPECTED_TOKEN_TYPE: "Se esperaba {0}, se encontró {1} '{2}'",
+    EXPECTED_TOKEN_VALUE: "Se esperaba '{0}', se encontró '{1}'",
+    EXPECTED_TOP_LEVEL_DECLARATION: "Se esperaba una declaración de variable global, una función o 'main'",
+    INVALID_PARAMETER: "Definición de parámetro inválida. Se esperaba 'tipo nombre'.",
+    EXPECTED_MAIN: "Se esperaba la función 'main'",
+    MISSING_CLOSING_BRACE: "Falta '}}' para cerrar el bloque {0}",
+    MISSING_SEMICOLON_AFTER: "Falta ';' después {0}",
+    MISSING_SEMICOLON_AT_END: "Falta ';' al final de la {0}",
+    INVALID_STATEMENT: "Sentencia inválida comenzando con '{0}'",
+    UNEXPECTED_STATEMENT_TOKEN: "Token inesperado al inicio de sentencia: {0}",
+    EXPECTED_INCREMENT_OPERATOR: "Se esperaba '++' o '--'",
+    MISSING_CLOSING_PARENTHESIS: "Falta ')' para cerrar la {0}",
+    CONDITION_WITHOUT_PARENTHESES: "La condición del {0} debería estar entre paréntesis",
+    EXPECTED_THEN: "Se esperaba 'then' después de la condición del if",
+    MISSING_END: "Falta 'end' para cerrar el bloque {0}",
+    EXPECTED_UNTIL: "Se esperaba 'until' para cerrar el bloque do",
+    EXPECTED_CASE: "Se esperaba 'case', 'default' o 'end'",
+    NON_CONSTANT_CASE: "El valor del 'case' debe ser un número constante",
+    MISSING_BREAK: "{0} debe terminar con 'break;'",
+    EXPECTED_EXPRESSION: "Se esperaba una expresión",
+    UNEXPECTED_EXPRESSION_TOKEN: "Token inesperado en expresión: '{0}'",
+    EXPECTED_ARGUMENT_SEPARATOR: "Se esperaba ',' o ')' en la lista de argumentos",
+
+    SYMBOL_REDEFINED: "El símbolo '{0}' ya ha sido declarado en el ámbito '{1}'.",
+    UNDECLARED_VARIABLE: "La variable '{0}' no ha sido declarada.",
+    INCOMPATIBLE_ASSIGNMENT: "No se puede asignar un tipo '{0}' a una variable de tipo '{1}'.",
+    INCOMPATIBLE_ARITHMETIC: "Operador '{0}' no compatible entre tipos '{1}' y '{2}'.",
+    INCOMPATIBLE_COMPARISON: "No se pueden comparar los tipos '{0}' y '{1}'.",
+    INVALID_LOGICAL_OPERANDS: "Operador lógico '{0}' requiere operandos booleanos o numéricos.",
+    INVALID_UNARY_OPERAND: "Operador unario '{0}' inválido para el tipo '{1}'.",
+    INVALID_CONDITION: "La condición de un '{0}' debe ser evaluable a booleano, pero se encontró '{1}'.",
+    UNDECLARED_INPUT_VARIABLE: "La variable '{0}' no ha sido declarada para 'cin'.",
+    INVALID_SWITCH_TYPE: "La expresión en un 'switch' debe ser de tipo 'int', no '{0}'.",
+    DUPLICATE_CASE: "Etiqueta 'case' duplicada con valor '{0}'.",
+    DUPLICATE_DEFAULT: "Múltiples bloques 'default' en 'switch'.",
+    RETURN_OUTSIDE_FUNCTION: "Sentencia 'return' fuera de una función.",
+    EMPTY_RETURN: "'return' vacío en función que debe retornar '{0}'.",
+    INCOMPATIBLE_RETURN: "No se puede retornar tipo '{0}' de una función que retorna '{1}'.",
+    UNDECLARED_FUNCTION: "Intento de llamar a función no declarada '{0}'.",
+    NOT_A_FUNCTION: "'{0}' no es una función, es un(a) '{1}'.",
+    WRONG_ARGUMENT_COUNT: "La función '{0}' esperaba {1} argumentos, pero recibió {2}.",
+    INCOMPATIBLE_ARGUMENT: "Argumento {0} de '{1}' es '{2}', se esperaba {3}.",
+
+    CODEGEN_FAILURE: "Error de Generación de Código: {0}\n{1}",
+
+    TOO_MANY_ERRORS: "Demasiados errores: se detuvo el análisis tras {0}.",
+}
+
+# Prefijo de cada fase (las tres primeras letras del código)
+PREFIXES = {
+    'LEX': "Error léxico en línea {0}, columna {1}: ",
+    'SIN': "Error sintáctico en línea {0}, columna {1}: ",
+    'SEM': "Error Semántico en línea {0}, columna {1}: ",
+}
+
+
+class ErrorBudgetExceeded(Exception):
+    """Se lanza cuando una fase supera su presupuesto de errores."""
+
+
+class Diagnostic:
+    """Error de una fase: código, posición y argumentos del mensaje."""
+    def __init__(self, code, line, column, args=()):
+        self.code = code
+        self.line = line
+        self.column = column
+        self.args = tuple(args)
+
+    @property
+    def span(self):
+        return (self.line, self.column)
+
+    @property
+    def message(self):
+        return MESSAGES[self.code].format(*self.args)
+
+    def key(self):
+        """Identidad del diagnóstico, para descartar duplicados."""
+        return (self.code, self.line, self.column, self.args)
+
+    def __str__(self):
+        prefix = PREFIXES.get(self.code[:3])
+        if prefix is None or self.line is None:
+            return self.message
+        return prefix.format(self.line, self.column) + self.message
+
+    def __repr__(self):
+        return f"Diagnostic({self.code!r}, {self.line!r}, {self.column!r}, {self.args!r})"
+
+    def __eq__(self, other):
+        return isinstance(other, Diagnostic) and self.key() == other.key()
+
+    def __hash__(self):
+        return hash(self.key())
+
+    # --- Serialización (caché en disco) ---
+
+    def to_row(self):
+        return [self.code, self.line, self.column, list(self.args)]
+
+    @classmethod
+    def from_row(cls, row):
+        code, line, column, args = row
+        return cls(code, line, column, args)
+
+
+class DiagnosticSink:
+    """
+    Registro de los diagnósticos de una fase sobre una lista existente:
+    descarta los duplicados exactos y aplica el presupuesto de errores
+    (None = sin límite).
+    """
+    def __init__(self, errors, max_errors=DEFAULT_MAX_ERRORS, diagnostic_class=Diagnostic):
+        self.errors = errors
+        self.max_errors = max_errors
+        self.diagnostic_class = diagnostic_class
+        self.seen = set()
+
+    def add(self, diagnostic):
+        key = diagnostic.key()
+        if key in self.seen:
+            return
+        if self.max_errors is not None and len(self.seen) >= self.max_errors:
+            self.errors.append(self.diagnostic_class(TOO_MANY_ERRORS, diagnostic.line, diagnostic.column,
+                                                     (f"{len(self.seen)} errores",)))
+            raise ErrorBudgetExceeded()
+        self.seen.add(key)
+        self.errors.append(diagnostic)
+
+    def report(self, code, line, column, *args):
+        self.add(self.diagnostic_class(code, line, column, args))
+
+    def has_room(self, count):
+        """Indica si caben 'count' errores más sin superar el presupuesto."""
+        return self.max_errors is None or len(self.seen) + count <= self.max_errors
+
+
+def limit_diagnostics(diagnostics, max_errors=DEFAULT_MAX_ERRORS):
+    """
+    Aplica el presupuesto a una lista ya completa (p. ej. los errores
+    léxicos, que se recogen enteros porque el coloreado necesita todos los
+    tokens). Devuelve una lista nueva.
+    """
+    limited = []
+    sink = DiagnosticSink(limited, max_errors)
+    try:
+        for diagnostic in diagnostics:
+            sink.add(diagnostic)
+    except ErrorBudgetExceeded:
+        pass
+    return limited
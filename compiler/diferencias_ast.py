@@ -0,0 +1,184 @@
+# diferencias_ast.py
+from difflib import SequenceMatcher
+
+from renderizador_ast import render_ast, DictEmitter, HTMLEmitter, SemanticHTMLEmitter
+
+# Atributos de un nodo que pueden cambiar sin alterar la forma del árbol.
+# Un cambio en ellos produce una operación 'update' en lugar de reemplazar
+# el subárbol (p. ej. al insertar una línea, las posiciones posteriores).
+UPDATABLE_ATTRIBUTES = ('line', 'column', 'data_type', 'scope', 'state')
+
+# Emisores usados solo para generar la etiqueta de un nodo actualizado
+_LABEL_HTML = HTMLEmitter()
+_LABEL_SEMANTIC_HTML = SemanticHTMLEmitter()
+
+
+def shape_hashes(root):
+    """
+    Calcula (en postorden, de forma iterativa) un hash de la forma de cada
+    subárbol: tipo, valor y forma de los hijos. No incluye posiciones ni
+    anotaciones semánticas. Devuelve {id(nodo): hash}.
+    """
+    hashes = {}
+    stack = [(root, False)]
+    while stack:
+        node, expanded = stack.pop()
+        if node is None:
+            continue
+        if not expanded:
+            stack.append((node, True))
+            stack.extend((child, False) for child in node.children)
+            continue
+        hashes[id(node)] = hash((
+            node.type,
+            node.value,
+            tuple(None if child is None else hashes[id(child)] for child in node.children),
+        ))
+    return hashes
+
+
+class NodeIdAllocator:
+    """Reparte identificadores de nodo crecientes para un documento."""
+    def __init__(self):
+        self.next_id = 1
+
+    def assign(self, root):
+        """Asigna ids nuevos a todo un subárbol (en preorden)."""
+        stack = [root]
+        while stack:
+            node = stack.pop()
+            if node is None:
+                continue
+            node.node_id = self.next_id
+            self.next_id += 1
+            stack.extend(reversed(node.children))
+
+
+class ASTDiff:
+    """
+    Diferencia estructural entre el AST anterior de un documento (con
+    node_id asignados) y el nuevo. Los nodos equivalentes heredan el id del
+    anterior y el resultado es una lista de operaciones que, aplicadas en
+    orden, transforman la vista anterior en la nueva:
+
+      {'op': 'update',  'id', <atributos cambiados>, 'html', 'semantic_html'}
+      {'op': 'replace', 'parent', 'index', 'id', 'node', 'html', 'semantic_html'}
+      {'op': 'insert',  'parent', 'index', 'node', 'html', 'semantic_html'}
+      {'op': 'remove',  'parent', 'index', 'id'}
+
+    'parent' es el id del padre (None para la raíz) e 'index' la posición en
+    su lista de hijos en el momento de aplicar la operación. En 'update', las
+    claves html/semantic_html son la nueva etiqueta del nodo; en 'replace' e
+    'insert', el subárbol (hasta max_depth niveles, el resto se pide con
+    'expand').
+    """
+    def __init__(self, allocator, semantic=True, max_depth=None):
+        self.allocator = allocator
+        self.semantic = semantic
+        self.max_depth = max_depth
+        self.ops = []
+
+    def compute(self, old_root, old_hashes, new_root, new_hashes):
+        self.old_hashes = old_hashes
+        self.new_hashes = new_hashes
+        self._diff(old_root, new_root, None, 0)
+        return self.ops
+
+    def _diff(self, old, new, parent_id, index):
+        # Se usa una pila explícita: los AST pueden ser muy profundos
+        stack = [(old, new, parent_id, index)]
+        while stack:
+            old, new, parent_id, index = stack.pop()
+            if old is None and new is None:
+                continue
+            if old is None or new is None or old.type is not new.type or old.value != new.value:
+                self._replace(old, new, parent_id, index)
+                continue
+
+            new.node_id = old.node_id
+            self._update(old, new)
+
+            old_children = old.children
+            new_children = new.children
+            if len(old_children) == len(new_children):
+                # Misma aridad: se comparan posición a posición
+                pairs = [(old_child, new_child, new.node_id, i)
+                         for i, (old_child, new_child) in enumerate(zip(old_children, new_children))]
+            else:
+                pairs = self._match_children(new.node_id, old_children, new_children)
+            stack.extend(reversed(pairs))
+
+    def _match_children(self, parent_id, old_children, new_children):
+        """
+        Alinea dos listas de hijos de distinta longitud (p. ej. sentencias de
+        un bloque) por la forma de cada hijo. Emite las inserciones y
+        eliminaciones y devuelve los pares que deben compararse en detalle.
+        """
+        old_keys = [None if child is None else self.old_hashes[id(child)] for child in old_children]
+        new_keys = [None if child is None else self.new_hashes[id(child)] for child in new_children]
+        matcher = SequenceMatcher(None, old_keys, new_keys, autojunk=False)
+
+        pairs = []
+        for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+            if tag == 'equal':
+                pairs.extend((old_children[i1 + k], new_children[j1 + k], parent_id, j1 + k)
+                             for k in range(i2 - i1))
+                continue
+
+            # 'replace', 'delete' o 'insert': los primeros se emparejan y el
+            # resto se elimina o se inserta
+            paired = min(i2 - i1, j2 - j1)
+            pairs.extend((old_children[i1 + k], new_children[j1 + k], parent_id, j1 + k)
+                         for k in range(paired))
+            for k in range(paired, i2 - i1):
+                removed = old_children[i1 + k]
+                self.ops.append({
+                    'op': 'remove',
+                    'parent': parent_id,
+                    'index': j1 + paired,
+                    'id': None if removed is None else removed.node_id,
+                })
+            for k in range(paired, j2 - j1):
+                self.ops.append(self._subtree_op('insert', new_children[j1 + k], parent_id, j1 + k))
+        return pairs
+
+    def _replace(self, old, new, parent_id, index):
+        op = self._subtree_op('replace', new, parent_id, index)
+        op['id'] = None if old is None else old.node_id
+        self.ops.append(op)
+
+    def _subtree_op(self, kind, node, parent_id, index):
+        op = {'op': kind, 'parent': parent_id, 'index': index, 'node': None, 'html': "", 'semantic_html': ""}
+        if node is not None:
+            self.allocator.assign(node)
+            depth = self.max_depth
+            emitters = [DictEmitter(with_ids=True, max_depth=depth), HTMLEmitter(with_ids=True, max_depth=depth)]
+            if self.semantic:
+                emitters.append(SemanticHTMLEmitter(with_ids=True, max_depth=depth))
+            results = render_ast(node, *emitters, max_depth=depth)
+            op['node'] = results[0]
+            op['html'] = results[1]
+            if self.semantic:
+                op['semantic_html'] = results[2]
+        return op
+
+    def _update(self, old, new):
+        changes = {}
+        for attribute in UPDATABLE_ATTRIBUTES:
+            value = getattr(new, attribute)
+            if getattr(old, attribute) != value:
+                changes[attribute] = value
+        if not changes:
+            return
+        op = {'op': 'update', 'id': new.node_id}
+        op.update(changes)
+        op['html'] = _LABEL_HTML.label(new)
+        if self.semantic:
+            op['semantic_html'] = _LABEL_SEMANTIC_HTML.label(new)
+        self.ops.append(op)
+
+
+def diff_ast(old_root, old_hashes, new_root, new_hashes, allocator, semantic=True, max_depth=None):
+    """Atajo: calcula las operaciones que llevan de old_root a new_root."""
+    differ = ASTDiff(allocator, semantic=semantic, max_depth=max_depth)
+    return differ.compute(old_root, old_hashes, new_root, new_hashes)
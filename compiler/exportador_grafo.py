@@ -0,0 +1,82 @@
+# exportador_grafo.py
+import glob
+import hashlib
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from analizador_sintactico import export_ast_graphviz
+from cache_ast import serialize_ast
+
+# Límites por defecto para que los AST enormes se dibujen en tiempo acotado
+DEFAULT_MAX_DEPTH = 12
+DEFAULT_MAX_NODES = 2000
+
+
+class ASTGraphExporter:
+    """
+    Exportación del AST a Graphviz bajo demanda. Las imágenes se guardan en
+    disco indexadas por el hash del AST serializado y los límites usados, así
+    que volver a pedir el mismo árbol no vuelve a ejecutar 'dot'. La
+    exportación puede lanzarse en un hilo de fondo con export_async().
+    """
+    def __init__(self, directory, output_format="svg", max_depth=DEFAULT_MAX_DEPTH,
+                 max_nodes=DEFAULT_MAX_NODES, max_entries=32):
+        self.directory = directory
+        self.output_format = output_format
+        self.max_depth = max_depth
+        self.max_nodes = max_nodes
+        self.max_entries = max_entries
+        self._executor = None
+        # Último (AST, clave) calculado: serializar un AST grande no es gratis
+        self._last_key = (None, None)
+
+    def key(self, ast):
+        last_ast, last_key = self._last_key
+        if last_ast is ast:
+            return last_key
+        digest = hashlib.sha256(serialize_ast(ast))
+        digest.update(f"\0{self.output_format}\0{self.max_depth}\0{self.max_nodes}".encode('utf-8'))
+        key = digest.hexdigest()[:32]
+        self._last_key = (ast, key)
+        return key
+
+    def path_for(self, ast):
+        """Ruta (determinista) donde queda la imagen de este AST."""
+        return os.path.join(self.directory, f"{self.key(ast)}.{self.output_format}")
+
+    def export(self, ast):
+        """Exporta el AST (o reutiliza la imagen ya generada) y devuelve su ruta."""
+        key = self.key(ast)
+        path = os.path.join(self.directory, f"{key}.{self.output_format}")
+        if os.path.exists(path):
+            # Marcar como usada recientemente (para _prune)
+            os.utime(path)
+            return path
+
+        os.makedirs(self.directory, exist_ok=True)
+        # Se renderiza con un nombre temporal y se renombra al terminar, para
+        # que nunca se lea una imagen a medio escribir
+        temp_base = os.path.join(self.directory, f"{key}.{os.getpid()}.tmp")
+        temp_path = export_ast_graphviz(ast, filename=temp_base, output_format=self.output_format,
+                                        max_depth=self.max_depth, max_nodes=self.max_nodes)
+        os.replace(temp_path, path)
+        self._prune()
+        return path
+
+    def export_async(self, ast):
+        """Lanza la exportación en un hilo de fondo. Devuelve un Future con la ruta."""
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="graphviz")
+        return self._executor.submit(self.export, ast)
+
+    def _prune(self):
+        """Elimina las imágenes más antiguas si se supera max_entries."""
+        entries = glob.glob(os.path.join(self.directory, f"*.{self.output_format}"))
+        if len(entries) <= self.max_entries:
+            return
+        entries.sort(key=os.path.getmtime)
+        for path in entries[:len(entries) - self.max_entries]:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
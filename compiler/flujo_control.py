@@ -0,0 +1,430 @@
+# flujo_control.py
+"""
+Grafo de flujo de control (CFG) y análisis de flujo de datos sobre el AST.
+
+ControlFlowGraph construye el grafo de una función (o de main): un nodo por
+sentencia simple (cada variable de una declaración, asignación, cin, cout,
+llamada, return), uno por condición de if/while/do-until/for/switch y uno
+por parámetro, más los nodos de entrada y salida. El lenguaje no tiene
+break ni goto (el 'break' de los case lo consume el parser), así que el
+grafo sigue la estructura del árbol. Una condición literal (tras el plegado
+de constantes) solo tiene la arista que se puede tomar: lo que sigue a un
+'while (1)' queda sin predecesores.
+
+Las variables son las que devuelve 'resolution' (id del nodo identificador
+-> variable, con un atributo is_global), es decir, la resolución de ámbitos
+que hace quien construye el grafo. Si algún identificador no está en
+'resolution' el grafo lo indica con 'unresolved', y los resultados que
+dependen de variables (dead_stores, unused_declarations) quedan vacíos.
+Esos dos reciben además las variables que no se deben quitar nunca.
+
+solve() es un motor genérico de punto fijo con lista de trabajo: recibe un
+DataflowAnalysis (dirección, valor de frontera, valor inicial, meet y
+transferencia) y devuelve el valor antes y después de cada nodo. Se
+incluyen la alcanzabilidad, las definiciones que alcanzan y las variables
+vivas.
+"""
+from collections import deque
+
+from analizador_sintactico import ASTNodeType
+from tipos import INT
+
+# Tipos de nodo del grafo
+ENTRY = 'entry'
+EXIT = 'exit'
+PARAMETER = 'parameter'
+STATEMENT = 'statement'
+CONDITION = 'condition'
+# Punto de unión sin efecto (cabecera de un do-until)
+JOIN = 'join'
+
+
+def _literal_condition(node):
+    """Valor de verdad de una condición literal (int o booleana); None si no lo es."""
+    if node is None:
+        return None
+    if node.type == ASTNodeType.BOOLEAN:
+        return node.value == 'true'
+    if node.type == ASTNodeType.NUMBER and node.data_type == INT:
+        value = int(node.value)
+        if -2 ** 31 <= value < 2 ** 31:
+            return value != 0
+    return None
+
+
+class CFGNode:
+    """Nodo del grafo: una sentencia simple, una condición o un punto de unión."""
+    def __init__(self, index, kind, ast=None):
+        self.index = index
+        self.kind = kind
+        self.ast = ast
+        self.successors = []
+        self.predecessors = []
+        # Variable a la que da valor (None si no define ninguna)
+        self.defines = None
+        # Variable que declara (solo los hijos de una DECLARATION)
+        self.declares = None
+        # Variables que lee
+        self.uses = set()
+        # La expresión contiene llamadas (puede tener efectos)
+        self.has_calls = False
+
+    def __repr__(self):
+        return f"CFGNode({self.index}, {self.kind!r})"
+
+
+class ControlFlowGraph:
+    """Grafo de flujo de una FUNCTION_DECLARATION o de MAIN."""
+    def __init__(self, function, resolution):
+        self.function = function
+        self.resolution = resolution
+        self.nodes = []
+        self.unresolved = False
+        # id(sentencia del AST) -> primer nodo del grafo que la ejecuta
+        self.statement_nodes = {}
+
+        self.entry = self.add_node(ENTRY)
+        self.exit = self.add_node(EXIT)
+        ends = [self.entry]
+        if function.type == ASTNodeType.MAIN:
+            body = function.children
+        else:
+            for param in function.children[1].children:
+                node = self.add_node(PARAMETER, param)
+                node.defines = self.variable(param)
+                ends = self.link(ends, node)
+            body = function.children[2].children if len(function.children) > 2 else []
+        self.link(self.statements(body, ends), self.exit)
+
+    def add_node(self, kind, ast=None):
+        node = CFGNode(len(self.nodes), kind, ast)
+        self.nodes.append(node)
+        return node
+
+    def link(self, sources, target):
+        """Une cada nodo de 'sources' con 'target'; devuelve [target]."""
+        for source in sources:
+            if target not in source.successors:
+                source.successors.append(target)
+                target.predecessors.append(source)
+        return [target]
+
+    def variable(self, identifier):
+        variable = self.resolution.get(id(identifier))
+        if variable is None:
+            self.unresolved = True
+        return variable
+
+    def read(self, cfg_node, expression):
+        """Anota en 'cfg_node' las variables que lee 'expression' y si llama a funciones."""
+        pending = [expression]
+        while pending:
+            node = pending.pop()
+            if node is None:
+                continue
+            if node.type == ASTNodeType.IDENTIFIER:
+                variable = self.variable(node)
+                if variable is not None:
+                    cfg_node.uses.add(variable)
+                continue
+            if node.type == ASTNodeType.FUNCTION_CALL:
+                cfg_node.has_calls = True
+            pending.extend(node.children)
+
+    def simple(self, ast, preds, expression=None, target=None):
+        node = self.add_node(STATEMENT, ast)
+        if expression is not None:
+            self.read(node, expression)
+        if target is not None:
+            node.defines = self.variable(target)
+        return self.link(preds, node)
+
+    def condition(self, expression, preds):
+        node = self.add_node(CONDITION, expression)
+        self.read(node, expression)
+        self.link(preds, node)
+        return node, _literal_condition(expression)
+
+    def statements(self, statements, preds):
+        for statement in statements:
+            preds = self.statement(statement, preds)
+        return preds
+
+    def statement(self, node, preds):
+        """Añade los nodos de una sentencia; devuelve los que continúan a la siguiente."""
+        if node is None:
+            return preds
+        first = len(self.nodes)
+        ends = self.build(node, preds)
+        if len(self.nodes) > first:
+            self.statement_nodes[id(node)] = self.nodes[first]
+        return ends
+
+    def build(self, node, preds):
+        node_type = node.type
+
+        if node_type == ASTNodeType.DECLARATION:
+            for declarator in node.children:
+                if declarator.type == ASTNodeType.ASSIGNMENT:
+                    target = declarator.children[0]
+                    preds = self.simple(declarator, preds, declarator.children[1], target)
+                else:
+                    # Sin inicialización no se da valor: la variable conserva
+                    # lo que hubiera en su posición
+                    target = declarator
+                    preds = self.simple(declarator, preds)
+                preds[0].declares = self.variable(target)
+            return preds
+
+        if node_type == ASTNodeType.ASSIGNMENT:
+            return self.simple(node, preds, node.children[1], node.children[0])
+
+        if node_type == ASTNodeType.INPUT_STATEMENT:
+            return self.simple(node, preds, target=node.children[0])
+
+        if node_type == ASTNodeType.RETURN_STATEMENT:
+            expression = node.children[0] if node.children else None
+            self.link(self.simple(node, preds, expression), self.exit)
+            return []
+
+        if node_type == ASTNodeType.BLOCK:
+            return self.statements(node.children, preds)
+
+        if node_type == ASTNodeType.IF_STATEMENT:
+            test, value = self.condition(node.children[0], preds)
+            ends = self.statement(node.children[1], [test] if value is not False else [])
+            else_preds = [test] if value is not True else []
+            if len(node.children) > 2:
+                return ends + self.statement(node.children[2], else_preds)
+            return ends + else_preds
+
+        if node_type == ASTNodeType.WHILE_STATEMENT:
+            test, value = self.condition(node.children[0], preds)
+            body_ends = self.statement(node.children[1], [test] if value is not False else [])
+            self.link(body_ends, test)
+            return [test] if value is not True else []
+
+        if node_type == ASTNodeType.DO_UNTIL_STATEMENT:
+            head = self.add_node(JOIN, node)
+            self.link(preds, head)
+            body_ends = self.statement(node.children[0], [head])
+            test, value = self.condition(node.children[1], body_ends)
+            # 'until': se sale cuando la condición es cierta
+            if value is not True:
+                self.link([test], head)
+            return [test] if value is not False else []
+
+        if node_type == ASTNodeType.FOR_STATEMENT:
+            init_ends = self.statement(node.children[0], preds)
+            test, value = self.condition(node.children[1], init_ends)
+            body_ends = self.statement(node.children[3], [test] if value is not False else [])
+            self.link(self.statement(node.children[2], body_ends), test)
+            return [test] if value is not True else []
+
+        if node_type == ASTNodeType.SWITCH_STATEMENT:
+            test, _ = self.condition(node.children[0], preds)
+            ends = []
+            has_default = False
+            for case in node.children[1:]:
+                has_default = has_default or case.type == ASTNodeType.DEFAULT_BLOCK
+                ends += self.statement(case.children[0], [test])
+            return ends if has_default else ends + [test]
+
+        # cout, llamadas y cualquier otra sentencia sin control de flujo
+        return self.simple(node, preds, node)
+
+
+# --- Motor de flujo de datos ---
+
+class DataflowAnalysis:
+    """
+    Descripción de un análisis para solve(). Los valores tienen que poder
+    compararse con == (frozenset, bool...) y el meet debe ser monótono para
+    que la iteración termine.
+    """
+    # True: de la entrada hacia la salida; False: de la salida hacia la entrada
+    forward = True
+
+    def boundary(self, cfg):
+        """Valor en la entrada del grafo (en la salida si es hacia atrás)."""
+        raise NotImplementedError
+
+    def initial(self, cfg):
+        """Valor de partida del resto de nodos (el neutro del meet)."""
+        raise NotImplementedError
+
+    def meet(self, values):
+        raise NotImplementedError
+
+    def transfer(self, node, value):
+        raise NotImplementedError
+
+
+def solve(cfg, analysis):
+    """
+    Itera el análisis hasta el punto fijo con una lista de trabajo.
+    Devuelve (antes, después): el valor antes y después de cada nodo en el
+    orden de ejecución, indexados por CFGNode.index.
+    """
+    forward = analysis.forward
+    start = cfg.entry if forward else cfg.exit
+    boundary = analysis.boundary(cfg)
+    initial = analysis.initial(cfg)
+
+    # Valor que entra a la transferencia y el que sale de ella
+    incoming = [initial] * len(cfg.nodes)
+    outgoing = [initial] * len(cfg.nodes)
+
+    # Los nodos se crean en orden de programa: se recorren en ese orden (o
+    # al revés) para que la mayoría tenga ya calculadas sus fuentes
+    order = cfg.nodes if forward else cfg.nodes[::-1]
+    worklist = deque(order)
+    pending = [True] * len(cfg.nodes)
+
+    while worklist:
+        node = worklist.popleft()
+        pending[node.index] = False
+
+        sources = node.predecessors if forward else node.successors
+        if node is start:
+            value = boundary
+        elif sources:
+            value = analysis.meet([outgoing[source.index] for source in sources])
+        else:
+            value = initial
+        incoming[node.index] = value
+
+        result = analysis.transfer(node, value)
+        if result != outgoing[node.index]:
+            outgoing[node.index] = result
+            for target in (node.successors if forward else node.predecessors):
+                if not pending[target.index]:
+                    pending[target.index] = True
+                    worklist.append(target)
+
+    if forward:
+        return incoming, outgoing
+    return outgoing, incoming
+
+
+class Reachability(DataflowAnalysis):
+    """Nodos a los que se puede llegar desde la entrada."""
+    forward = True
+
+    def boundary(self, cfg):
+        return True
+
+    def initial(self, cfg):
+        return False
+
+    def meet(self, values):
+        return any(values)
+
+    def transfer(self, node, value):
+        return value
+
+
+class ReachingDefinitions(DataflowAnalysis):
+    """
+    Definiciones (índices de los nodos que dan valor a una variable) que
+    pueden llegar a cada punto sin que otra de la misma variable las anule.
+    Solo se cuentan las explícitas: parámetros, asignaciones,
+    inicializaciones y cin (una llamada puede cambiar una global sin
+    aparecer aquí).
+    """
+    forward = True
+
+    def __init__(self, cfg):
+        # variable -> índices de todos los nodos que la definen
+        self.definitions = {}
+        for node in cfg.nodes:
+            if node.defines is not None:
+                self.definitions.setdefault(node.defines, set()).add(node.index)
+
+    def boundary(self, cfg):
+        return frozenset()
+
+    def initial(self, cfg):
+        return frozenset()
+
+    def meet(self, values):
+        return frozenset().union(*values)
+
+    def transfer(self, node, value):
+        if node.defines is None:
+            return value
+        return (value - self.definitions[node.defines]) | {node.index}
+
+
+class Liveness(DataflowAnalysis):
+    """
+    Variables locales cuyo valor actual puede leerse más adelante. Las
+    globales no se siguen: otras funciones pueden leerlas.
+    """
+    forward = False
+
+    def boundary(self, cfg):
+        return frozenset()
+
+    def initial(self, cfg):
+        return frozenset()
+
+    def meet(self, values):
+        return frozenset().union(*values)
+
+    def transfer(self, node, value):
+        defined = node.defines
+        if defined is not None and not defined.is_global and defined in value:
+            value = value - {defined}
+        used = [variable for variable in node.uses if not variable.is_global]
+        if used:
+            value = value.union(used)
+        return value
+
+
+# --- Consultas para la eliminación de código muerto ---
+
+def unreachable_statements(cfg):
+    """ids de las sentencias del AST a las que no se llega desde la entrada."""
+    before, _ = solve(cfg, Reachability())
+    return {key for key, node in cfg.statement_nodes.items() if not before[node.index]}
+
+
+def dead_stores(cfg, preserved=frozenset()):
+    """
+    ids de las asignaciones (sentencias o inicializaciones) a variables
+    locales cuyo valor nadie lee después y cuya expresión no llama a
+    funciones: quitarlas no cambia lo que hace el programa. Las
+    asignaciones a las variables de 'preserved' no se devuelven nunca.
+    """
+    if cfg.unresolved:
+        return set()
+    _, after = solve(cfg, Liveness())
+    return {
+        id(node.ast) for node in cfg.nodes
+        if node.kind == STATEMENT and node.ast.type == ASTNodeType.ASSIGNMENT
+        and node.defines is not None and not node.defines.is_global
+        and node.defines not in preserved
+        and not node.has_calls and node.defines not in after[node.index]
+    }
+
+
+def unused_declarations(cfg, preserved=frozenset()):
+    """
+    ids de las variables declaradas (hijos de una DECLARATION) que no se
+    leen ni se asignan en ningún otro punto y cuya inicialización, si la
+    tienen, no llama a funciones. Las variables de 'preserved' no se
+    devuelven nunca.
+    """
+    if cfg.unresolved:
+        return set()
+    referenced = set()
+    for node in cfg.nodes:
+        referenced.update(node.uses)
+        if node.defines is not None and node.declares is None:
+            referenced.add(node.defines)
+    return {
+        id(node.ast) for node in cfg.nodes
+        if node.declares is not None and node.declares not in referenced
+        and node.declares not in preserved and not node.has_calls
+    }
@@ -1,17 +1,20 @@
 # generador_llvm.py
 from llvmlite import ir
 from analizador_sintactico import ASTNodeType
+from visitante import ASTVisitor
+from tipos import NUMERIC_PROMOTION, FLOAT, INT, BOOLEAN
 from llvmlite import binding as llvm
 import sys
 import traceback
 
-class CodeGenerator:
+class CodeGenerator(ASTVisitor):
     """
     Esta clase recorre el Árbol de Sintaxis Abstracta (AST) que nos dio
     el analizador sintáctico y lo traduce a Código Intermedio de LLVM (LLVM IR).
     """
     
-    def __init__(self):
+    def __init__(self, profile=False):
+        super().__init__(profile=profile)
         
         # --- Configuración Inicial de LLVM ---
         target_triple = llvm.get_default_triple()
@@ -102,14 +105,6 @@ class CodeGenerator:
             
             raise e
 
-    def visit(self, node):
-        if not node:
-            return None
-        
-        method_name = f'visit_{node.type.name.lower()}'
-        visitor = getattr(self, method_name, self.generic_visit)
-        return visitor(node)
-
     def generic_visit(self, node):
         """Visitante genérico: solo visita a todos los hijos del nodo."""
         for child in node.children:
@@ -127,21 +122,27 @@ class CodeGenerator:
         
         raise TypeError(f"No se puede convertir {value.type} a booleano")
 
+    def _language_type(self, llvm_type):
+        """Tipo del lenguaje que corresponde a un tipo escalar de LLVM (o None)."""
+        if isinstance(llvm_type, ir.FloatType):
+            return FLOAT
+        if isinstance(llvm_type, ir.IntType):
+            return BOOLEAN if llvm_type.width == 1 else INT
+        return None
+
     def _promote_types(self, left_val, right_val):
         """
         Promueve int a float si uno de los operandos es float.
         Retorna (left, right, is_float)
         """
-        is_float = False
-        
-        if isinstance(left_val.type, ir.FloatType) and isinstance(right_val.type, ir.IntType):
+        # La regla de promoción es la misma tabla que usa el análisis semántico
+        promoted = NUMERIC_PROMOTION.get((self._language_type(left_val.type), self._language_type(right_val.type)))
+        is_float = promoted is FLOAT
+
+        if is_float and not isinstance(right_val.type, ir.FloatType):
             right_val = self.builder.sitofp(right_val, ir.FloatType(), name="int_to_float")
-            is_float = True
-        elif isinstance(left_val.type, ir.IntType) and isinstance(right_val.type, ir.FloatType):
+        elif is_float and not isinstance(left_val.type, ir.FloatType):
             left_val = self.builder.sitofp(left_val, ir.FloatType(), name="int_to_float")
-            is_float = True
-        elif isinstance(left_val.type, ir.FloatType) and isinstance(right_val.type, ir.FloatType):
-            is_float = True
         
         return left_val, right_val, is_float
     
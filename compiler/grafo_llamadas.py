@@ -0,0 +1,191 @@
+# grafo_llamadas.py
+"""
+Grafo de llamadas del programa.
+
+Los nodos son las funciones declaradas y 'main'; hay una arista de A a B si
+el cuerpo de A contiene una llamada a B (con el número de llamadas). El
+análisis semántico anota las llamadas al resolverlas (SemanticAnalyzer.calls)
+y construye el grafo al terminar; el optimizador lo reconstruye sobre el
+árbol ya optimizado con collect_calls(), porque las llamadas evaluadas en
+tiempo de compilación ya no cuentan.
+
+Las componentes fuertemente conexas (Tarjan) agrupan las funciones
+mutuamente recursivas, y reachable() da las funciones a las que se llega
+desde 'main': el resto no hace falta generarlas.
+"""
+from analizador_sintactico import ASTNodeType
+
+# Nombre del nodo de 'main' (no puede chocar con una función: es palabra reservada)
+MAIN = 'main'
+
+
+def declared_functions(program):
+    """(nombre, línea, columna) de cada función y de main, en orden de aparición."""
+    if program is None:
+        return []
+    return [
+        (MAIN if child.type == ASTNodeType.MAIN else child.value, child.line, child.column)
+        for child in program.children
+        if child is not None and child.type in (ASTNodeType.FUNCTION_DECLARATION, ASTNodeType.MAIN)
+    ]
+
+
+def collect_calls(program):
+    """Llamadas (función que llama, función llamada) en los cuerpos de un programa."""
+    calls = []
+    if program is None:
+        return calls
+    for child in program.children:
+        if child is None:
+            continue
+        if child.type == ASTNodeType.FUNCTION_DECLARATION:
+            caller = child.value
+            pending = child.children[2:]
+        elif child.type == ASTNodeType.MAIN:
+            caller = MAIN
+            pending = list(child.children)
+        else:
+            continue
+        while pending:
+            node = pending.pop()
+            if node is None:
+                continue
+            if node.type == ASTNodeType.FUNCTION_CALL:
+                calls.append((caller, node.value))
+            pending.extend(node.children)
+    return calls
+
+
+class CallGraph:
+    """Funciones del programa y llamadas entre ellas."""
+    def __init__(self, functions=(), calls=()):
+        # nombre -> (línea, columna) de su primera declaración
+        self.functions = {}
+        for name, line, column in functions:
+            self.functions.setdefault(name, (line, column))
+        # función que llama -> {función llamada: número de llamadas}
+        self.edges = {name: {} for name in self.functions}
+        for caller, callee in calls:
+            callees = self.edges.setdefault(caller, {})
+            callees[callee] = callees.get(callee, 0) + 1
+
+    def callees(self, name):
+        return self.edges.get(name, {})
+
+    def reachable(self, root=MAIN):
+        """Funciones a las que se llega (directa o indirectamente) desde 'root'."""
+        if root not in self.functions:
+            return set()
+        seen = {root}
+        pending = [root]
+        while pending:
+            for callee in self.callees(pending.pop()):
+                if callee not in seen and callee in self.functions:
+                    seen.add(callee)
+                    pending.append(callee)
+        return seen
+
+    def strongly_connected_components(self):
+        """
+        Componentes fuertemente conexas (algoritmo de Tarjan, sin recursión
+        para no depender del límite de Python). Salen en orden topológico
+        inverso: cada componente antes que las que la llaman.
+        """
+        index_of = {}
+        low = {}
+        on_stack = set()
+        stack = []
+        components = []
+        counter = 0
+
+        for start in self.functions:
+            if start in index_of:
+                continue
+            index_of[start] = low[start] = counter
+            counter += 1
+            stack.append(start)
+            on_stack.add(start)
+            # Pila de trabajo: (función, iterador sobre sus llamadas)
+            work = [(start, iter(self.callees(start)))]
+            while work:
+                name, callees = work[-1]
+                advanced = False
+                for callee in callees:
+                    if callee not in self.functions:
+                        continue
+                    if callee not in index_of:
+                        index_of[callee] = low[callee] = counter
+                        counter += 1
+                        stack.append(callee)
+                        on_stack.add(callee)
+                        work.append((callee, iter(self.callees(callee))))
+                        advanced = True
+                        break
+                    if callee in on_stack:
+                        low[name] = min(low[name], index_of[callee])
+                if advanced:
+                    continue
+                work.pop()
+                if work:
+                    parent = work[-1][0]
+                    low[parent] = min(low[parent], low[name])
+                if low[name] == index_of[name]:
+                    component = []
+                    while True:
+                        member = stack.pop()
+                        on_stack.discard(member)
+                        component.append(member)
+                        if member == name:
+                            break
+                    components.append(component)
+        return components
+
+    def recursive_functions(self):
+        """Funciones que pueden llamarse a sí mismas (directa o mutuamente)."""
+        recursive = set()
+        for component in self.strongly_connected_components():
+            if len(component) > 1 or component[0] in self.callees(component[0]):
+                recursive.update(component)
+        return recursive
+
+    def to_dict(self):
+        """Representación para la salida JSON (la vista del grafo en el IDE)."""
+        components = self.strongly_connected_components()
+        component_of = {name: index for index, component in enumerate(components) for name in component}
+        reachable = self.reachable()
+        recursive = self.recursive_functions()
+        return {
+            'nodes': [
+                {
+                    'name': name,
+                    'line': line,
+                    'column': column,
+                    'reachable': name in reachable,
+                    'recursive': name in recursive,
+                    'component': component_of[name],
+                } for name, (line, column) in self.functions.items()
+            ],
+            'edges': [
+                {'from': caller, 'to': callee, 'calls': count}
+                for caller, callees in self.edges.items()
+                for callee, count in callees.items()
+                if callee in self.functions
+            ],
+            'components': components,
+        }
+
+    # --- Serialización (caché en disco) ---
+
+    def to_row(self):
+        functions = [[name, line, column] for name, (line, column) in self.functions.items()]
+        calls = [[caller, callee, count] for caller, callees in self.edges.items()
+                 for callee, count in callees.items()]
+        return [functions, calls]
+
+    @classmethod
+    def from_row(cls, row):
+        functions, calls = row
+        graph = cls(functions)
+        for caller, callee, count in calls:
+            graph.edges.setdefault(caller, {})[callee] = count
+        return graph
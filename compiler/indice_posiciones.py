@@ -0,0 +1,127 @@
+# indice_posiciones.py
+"""
+Índice de posiciones: de una posición del código al nodo del AST que la
+cubre, para las consultas del editor (hover, nodo bajo el cursor).
+
+Cada nodo guarda solo la posición de su token; el intervalo de un nodo es
+el que va de su primer token al final del último, contando los de sus
+descendientes. Los intervalos se expresan como desplazamientos en el texto
+(con la tabla de inicios de línea) y se ordenan por inicio: como los de un
+árbol están anidados, el nodo más interno que contiene una posición es el
+último que empieza antes que ella o uno de sus antecesores.
+"""
+import re
+from bisect import bisect_right
+
+
+def line_starts(source):
+    """Desplazamiento en el texto del inicio de cada línea (la 1 es el índice 0)."""
+    return [0] + [match.end() for match in re.finditer('\n', source)]
+
+
+class PositionIndex:
+    """Intervalos de los nodos de un AST, consultables por (línea, columna)."""
+    def __init__(self, root, source, tokens):
+        self.line_starts = line_starts(source)
+        self.length = len(source)
+
+        # (línea, columna) de cada token -> desplazamiento de su final
+        token_ends = {}
+        for token in tokens:
+            start = self.offset(token.line, token.column)
+            if start is not None:
+                token_ends.setdefault((token.line, token.column), start + len(token.value))
+
+        # Intervalo de cada nodo en post-orden (un nodo compartido, como el
+        # de 'x' en x++, se cuenta una vez)
+        spans = {}
+        nodes = {}
+        stack = [(root, False)]
+        while stack:
+            node, expanded = stack.pop()
+            if node is None or (not expanded and id(node) in spans):
+                continue
+            if not expanded:
+                spans[id(node)] = None
+                stack.append((node, True))
+                stack.extend((child, False) for child in node.children)
+                continue
+            start = end = None
+            if node.line is not None and node.column is not None:
+                start = self.offset(node.line, node.column)
+                if start is not None:
+                    end = token_ends.get((node.line, node.column), start + 1)
+            for child in node.children:
+                child_span = spans.get(id(child)) if child is not None else None
+                if child_span is None:
+                    continue
+                if start is None or child_span[0] < start:
+                    start = child_span[0]
+                if end is None or child_span[1] > end:
+                    end = child_span[1]
+            spans[id(node)] = None if start is None else (start, end)
+            nodes[id(node)] = node
+
+        # id(nodo) -> (inicio, fin), o None si el subárbol no tiene posiciones
+        self.spans = spans
+
+        # Ordenados por inicio y, a igual inicio, el más largo (el exterior) primero
+        ordered = sorted(
+            ((span[0], -span[1], key) for key, span in spans.items() if span is not None),
+        )
+        self.starts = [start for start, _, _ in ordered]
+        self.ends = [-negative_end for _, negative_end, _ in ordered]
+        self.nodes = [nodes[key] for _, _, key in ordered]
+        # Índice del intervalo que contiene a cada uno (-1 si ninguno)
+        self.parents = []
+        open_spans = []
+        for index, (start, end) in enumerate(zip(self.starts, self.ends)):
+            while open_spans and self.ends[open_spans[-1]] <= start:
+                open_spans.pop()
+            self.parents.append(open_spans[-1] if open_spans else -1)
+            open_spans.append(index)
+
+    def offset(self, line, column):
+        """Desplazamiento de (línea, columna) en el texto, o None si está fuera."""
+        if line < 1 or line > len(self.line_starts) or column < 1:
+            return None
+        offset = self.line_starts[line - 1] + column - 1
+        line_end = self.line_starts[line] if line < len(self.line_starts) else self.length + 1
+        return offset if offset < line_end else None
+
+    def position(self, offset):
+        """(línea, columna) de un desplazamiento en el texto."""
+        line = bisect_right(self.line_starts, offset)
+        return line, offset - self.line_starts[line - 1] + 1
+
+    def span_at(self, line, column):
+        """Índice del intervalo más interno que contiene (línea, columna), o None."""
+        offset = self.offset(line, column)
+        if offset is None:
+            return None
+        index = bisect_right(self.starts, offset) - 1
+        while index >= 0 and self.ends[index] <= offset:
+            index = self.parents[index]
+        return index if index >= 0 else None
+
+    def node_at(self, line, column):
+        """Nodo más interno del AST que cubre (línea, columna), o None."""
+        index = self.span_at(line, column)
+        return None if index is None else self.nodes[index]
+
+    def describe(self, index):
+        """El nodo del intervalo 'index' como diccionario (para las respuestas del servidor)."""
+        node = self.nodes[index]
+        start_line, start_column = self.position(self.starts[index])
+        end_line, end_column = self.position(self.ends[index])
+        return {
+            'id': node.node_id,
+            'type': node.type.name,
+            'value': node.value,
+            'data_type': node.data_type,
+            'scope': node.scope,
+            'line': node.line,
+            'column': node.column,
+            'start': {'line': start_line, 'column': start_column},
+            'end': {'line': end_line, 'column': end_column},
+        }
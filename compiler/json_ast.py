@@ -0,0 +1,148 @@
+# json_ast.py
+"""
+Codificador JSON en streaming para el AST.
+
+Recorre el árbol una sola vez y produce directamente los fragmentos de
+texto JSON, sin construir antes los diccionarios de ASTNode.to_dict(). Hay
+dos modos:
+
+- compatible=True: mismo texto, byte a byte, que json.dumps(nodo.to_dict()).
+- compatible=False: formato compacto que omite los campos con su valor por
+  defecto (None o lista de hijos vacía) y los espacios de los separadores.
+"""
+import json
+from json.encoder import encode_basestring_ascii
+
+# Tamaño aproximado (en caracteres) de cada fragmento producido
+CHUNK_SIZE = 64 * 1024
+
+
+def _encode_value(value):
+    if value is None:
+        return 'null'
+    if value.__class__ is str:
+        return encode_basestring_ascii(value)
+    return json.dumps(value)
+
+
+def _open_compatible(node):
+    return (
+        '{"type": ' + encode_basestring_ascii(node.type.name)
+        + ', "value": ' + _encode_value(node.value)
+        + ', "line": ' + _encode_value(node.line)
+        + ', "column": ' + _encode_value(node.column)
+        + ', "children": ['
+    )
+
+
+def _close_compatible(node):
+    return (
+        '], "data_type": ' + _encode_value(node.data_type)
+        + ', "scope": ' + _encode_value(node.scope)
+        + ', "state": ' + _encode_value(node.state)
+        + '}'
+    )
+
+
+def _open_compact(node):
+    text = '{"type":' + encode_basestring_ascii(node.type.name)
+    if node.value is not None:
+        text += ',"value":' + _encode_value(node.value)
+    if node.line is not None:
+        text += ',"line":' + _encode_value(node.line)
+    if node.column is not None:
+        text += ',"column":' + _encode_value(node.column)
+    if node.children:
+        text += ',"children":['
+    return text
+
+
+def _close_compact(node):
+    text = ']' if node.children else ''
+    if node.data_type is not None:
+        text += ',"data_type":' + _encode_value(node.data_type)
+    if node.scope is not None:
+        text += ',"scope":' + _encode_value(node.scope)
+    if node.state is not None:
+        text += ',"state":' + _encode_value(node.state)
+    return text + '}'
+
+
+def iter_ast_json(root, compatible=True, chunk_size=CHUNK_SIZE):
+    """Genera el JSON del AST en fragmentos de unos chunk_size caracteres."""
+    if compatible:
+        open_node, close_node, separator = _open_compatible, _close_compatible, ', '
+    else:
+        open_node, close_node, separator = _open_compact, _close_compact, ','
+
+    parts = []
+    size = 0
+    # La pila mezcla nodos pendientes y texto literal (cierres y separadores)
+    stack = [root]
+    while stack:
+        item = stack.pop()
+        if item.__class__ is str:
+            text = item
+        elif item is None:
+            text = 'null'
+        else:
+            text = open_node(item)
+            stack.append(close_node(item))
+            children = item.children
+            for i in range(len(children) - 1, -1, -1):
+                stack.append(children[i])
+                if i:
+                    stack.append(separator)
+
+        parts.append(text)
+        size += len(text)
+        if size >= chunk_size:
+            yield ''.join(parts)
+            parts = []
+            size = 0
+
+    if parts:
+        yield ''.join(parts)
+
+
+def write_ast_json(root, stream, compatible=True):
+    """Escribe el JSON del AST directamente en 'stream'."""
+    for chunk in iter_ast_json(root, compatible=compatible):
+        stream.write(chunk)
+
+
+def dumps_ast(root, compatible=True):
+    return ''.join(iter_ast_json(root, compatible=compatible))
+
+
+class StreamedAST:
+    """
+    Marca un AST que debe codificarse en streaming al escribir un resultado
+    con write_result (en lugar de convertirse antes a diccionarios).
+    """
+    def __init__(self, root, compatible=True):
+        self.root = root
+        self.compatible = compatible
+
+
+def write_result(result, stream):
+    """
+    Escribe un diccionario de resultados como json.dumps(result), pero los
+    valores StreamedAST se codifican en streaming. Las demás claves se
+    codifican con json.dumps, así que el texto es idéntico al de antes.
+    """
+    stream.write('{')
+    first = True
+    for key, value in result.items():
+        if not first:
+            stream.write(', ')
+        first = False
+        stream.write(json.dumps(key) + ': ')
+        if isinstance(value, StreamedAST):
+            if value.root is None:
+                stream.write('null')
+            else:
+                write_ast_json(value.root, stream, compatible=value.compatible)
+        else:
+            stream.write(json.dumps(value))
+    stream.write('}')
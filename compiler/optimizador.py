@@ -0,0 +1,961 @@
+# optimizador.py
+"""
+Optimización del AST antes de generar código: plegado y propagación de
+constantes y eliminación de código muerto.
+
+Fase 1: se resuelve cada identificador a su declaración (con los mismos
+ámbitos que el análisis semántico) y se marcan las variables que se
+modifican en algún punto: asignaciones fuera de su declaración (las que el
+análisis anotó como 'modificado'), incrementos y 'cin'. También se anota
+qué funciones son puras: sin cin, sin cout, sin escrituras de globales y
+llamando solo a funciones puras.
+
+Fase 2: se recorre el árbol plegando las expresiones constantes
+(aritmética, comparaciones y lógica) y sustituyendo por su valor las
+variables que nunca se modifican y se inicializaron con una constante. Los
+'if' y 'while' con condición constante se reducen a la rama que se ejecuta
+(o desaparecen), y las sentencias que siguen a un 'return' en el mismo
+bloque se descartan. Las llamadas a funciones puras con argumentos
+constantes se sustituyen por su resultado, calculado con un intérprete
+acotado (CompileTimeEvaluator).
+
+Fase 3: sobre el grafo de flujo de cada función (flujo_control) se quitan
+las sentencias inalcanzables (lo que sigue a un bucle infinito o a un 'if'
+cuyas ramas retornan), las asignaciones a variables locales que nadie lee
+después y las declaraciones que se quedan sin usar.
+
+Fase 4: con el grafo de llamadas del árbol resultante (grafo_llamadas) se
+quitan las funciones a las que no se llega desde main, que así no pasan
+por el generador ni por opt, llc y clang.
+
+Los valores se calculan como en el código generado: int es un entero de 32
+bits con desbordamiento circular y float es de precisión simple. Lo que no
+se puede calcular igual (división por cero, resultados no finitos,
+literales fuera de rango, cadenas) se deja para la ejecución.
+
+El árbol original no se modifica: los nodos que cambian se copian y los
+subárboles sin cambios se comparten, de modo que el AST que muestran las
+vistas (y que guardan la caché y el servidor) sigue intacto.
+"""
+import math
+import struct
+
+from analizador_sintactico import ASTNode, ASTNodeType
+from visitante import ASTVisitor
+from flujo_control import ControlFlowGraph, unreachable_statements, dead_stores, unused_declarations
+from grafo_llamadas import CallGraph, MAIN, declared_functions, collect_calls
+from tipos import INT, FLOAT, BOOLEAN, VOID, NUMERIC_PROMOTION, is_assignable
+
+INT_MIN = -2 ** 31
+INT_MAX = 2 ** 31 - 1
+
+# Nodos que abren un ámbito en el análisis semántico
+_SCOPED_STATEMENTS = (
+    ASTNodeType.WHILE_STATEMENT, ASTNodeType.DO_UNTIL_STATEMENT,
+    ASTNodeType.FOR_STATEMENT, ASTNodeType.SWITCH_STATEMENT,
+)
+
+
+def _wrap_int(value):
+    """Reduce un entero a 32 bits con signo (desbordamiento circular)."""
+    return (value - INT_MIN) % 2 ** 32 + INT_MIN
+
+
+def _to_float32(value):
+    """Redondea a precisión simple; None si no es representable."""
+    try:
+        value = struct.unpack('<f', struct.pack('<f', value))[0]
+    except OverflowError:
+        return None
+    return value if math.isfinite(value) else None
+
+
+def _truthy(constant):
+    """Valor de verdad de una constante, como la conversión a i1 del generador."""
+    return constant[1] != 0
+
+
+def constant_value(node):
+    """(tipo, valor) de un literal numérico o booleano; None si no lo es."""
+    if node is None:
+        return None
+    if node.type == ASTNodeType.NUMBER:
+        if node.data_type == FLOAT:
+            value = _to_float32(float(node.value))
+            return None if value is None else (FLOAT, value)
+        value = int(node.value)
+        if not INT_MIN <= value <= INT_MAX:
+            return None
+        return (INT, value)
+    if node.type == ASTNodeType.BOOLEAN:
+        return (BOOLEAN, node.value == 'true')
+    return None
+
+
+def _promote(value_type, value, target_type):
+    """Convierte una constante al tipo numérico 'target_type' (int -> float)."""
+    if value_type == target_type:
+        return value
+    if target_type == FLOAT:
+        return _to_float32(float(value))
+    return int(value)
+
+
+def fold_binary(op, left, right):
+    """
+    Resultado constante de 'left op right' (tuplas (tipo, valor)) o None si
+    no se puede calcular sin cambiar el comportamiento del programa.
+    """
+    left_type, left_value = left
+    right_type, right_value = right
+
+    if op in ('&&', '||'):
+        if op == '&&':
+            return (BOOLEAN, _truthy(left) and _truthy(right))
+        return (BOOLEAN, _truthy(left) or _truthy(right))
+
+    if left_type == BOOLEAN or right_type == BOOLEAN:
+        return None
+    promoted = NUMERIC_PROMOTION[(left_type, right_type)]
+    a = _promote(left_type, left_value, promoted)
+    b = _promote(right_type, right_value, promoted)
+    if a is None or b is None:
+        return None
+
+    if op == '<':
+        return (BOOLEAN, a < b)
+    if op == '<=':
+        return (BOOLEAN, a <= b)
+    if op == '>':
+        return (BOOLEAN, a > b)
+    if op == '>=':
+        return (BOOLEAN, a >= b)
+    if op == '==':
+        return (BOOLEAN, a == b)
+    if op == '!=':
+        return (BOOLEAN, a != b)
+
+    if promoted == FLOAT:
+        if op == '+':
+            result = a + b
+        elif op == '-':
+            result = a - b
+        elif op == '*':
+            result = a * b
+        elif op == '/' and b != 0:
+            result = a / b
+        else:
+            # '%' entre floats y la división por cero se dejan al generador
+            return None
+        result = _to_float32(result)
+        return None if result is None else (FLOAT, result)
+
+    if op == '+':
+        return (INT, _wrap_int(a + b))
+    if op == '-':
+        return (INT, _wrap_int(a - b))
+    if op == '*':
+        return (INT, _wrap_int(a * b))
+    if op in ('/', '%'):
+        # sdiv/srem: división truncada hacia cero; /0 e INT_MIN / -1 son indefinidos
+        if b == 0 or (a == INT_MIN and b == -1):
+            return None
+        quotient = abs(a) // abs(b)
+        if (a < 0) != (b < 0):
+            quotient = -quotient
+        return (INT, quotient) if op == '/' else (INT, a - b * quotient)
+    return None
+
+
+def fold_unary(op, operand):
+    """Resultado constante de un operador unario ('-' o '!') o None."""
+    operand_type, value = operand
+    if op == '!':
+        return (BOOLEAN, not _truthy(operand))
+    if op == '-':
+        if operand_type == FLOAT:
+            return (FLOAT, -value)
+        if operand_type == INT:
+            return (INT, _wrap_int(-value))
+    return None
+
+
+def _literal_node(constant, line, column):
+    """Nodo literal (NUMBER o BOOLEAN) anotado con su tipo."""
+    value_type, value = constant
+    if value_type == BOOLEAN:
+        node = ASTNode(ASTNodeType.BOOLEAN, 'true' if value else 'false', [], line, column)
+    elif value_type == FLOAT:
+        node = ASTNode(ASTNodeType.NUMBER, repr(value), [], line, column)
+    else:
+        node = ASTNode(ASTNodeType.NUMBER, str(value), [], line, column)
+    node.data_type = value_type
+    return node
+
+
+def _copy_node(node, children):
+    """Copia de un nodo (con sus anotaciones) con otros hijos."""
+    copy = ASTNode(node.type, node.value, children, node.line, node.column)
+    copy.data_type = node.data_type
+    copy.scope = node.scope
+    copy.state = node.state
+    copy.node_id = node.node_id
+    return copy
+
+
+class _Binding:
+    """Una variable declarada: su tipo, si se modifica y su valor constante."""
+    def __init__(self, var_type, is_global=False):
+        self.var_type = var_type
+        self.is_global = is_global
+        self.modified = False
+        # (tipo, valor) si nunca se modifica y su inicialización es constante
+        self.constant = None
+
+
+class _FunctionInfo:
+    """Lo que la evaluación en tiempo de compilación necesita de una función."""
+    def __init__(self, node):
+        self.node = node
+        self.return_type = node.children[0].value
+        self.parameters = []
+        # Funciones a las que llama
+        self.callees = set()
+        # cin, cout o escritura de una variable global
+        self.impure = False
+        # False si declara dos veces un nombre (ver mark_redeclared)
+        self.evaluable = True
+
+
+# Nodo identificador compartido (como el de x++) que resuelve a variables
+# distintas según dónde aparece: nunca se sustituye
+_AMBIGUOUS = _Binding(None)
+_AMBIGUOUS.modified = True
+
+
+class _BindingResolver(ASTVisitor):
+    """Fase 1: resuelve cada identificador a su _Binding y marca las modificadas."""
+    def __init__(self):
+        super().__init__()
+        self.scopes = [{}]
+        # id(nodo identificador o de declaración) -> _Binding
+        self.resolution = {}
+        # id(nodo ASSIGNMENT de una declaración) -> _Binding declarado
+        self.initializers = {}
+        # nombre -> _FunctionInfo (primera declaración)
+        self.functions = {}
+        self.current_function = None
+        # Declaraciones locales de la función (o main) en curso: nombre ->
+        # [(_Binding, si está en un bloque interior)], y las de cada una ya
+        # visitada: (_FunctionInfo o None, dict)
+        self.unit_declarations = None
+        self.units = []
+        # _Binding cuyos ámbitos no coinciden con los del generador (mark_redeclared)
+        self.redeclared = set()
+
+    def resolve(self, name):
+        for scope in reversed(self.scopes):
+            binding = scope.get(name)
+            if binding is not None:
+                return binding
+        return None
+
+    def declare(self, node, var_type):
+        binding = _Binding(var_type, is_global=len(self.scopes) == 1)
+        self.scopes[-1][node.value] = binding
+        self.record(node, binding)
+        if self.unit_declarations is not None:
+            # Si está dentro de un bloque de la función (no en su primer nivel)
+            nested = len(self.scopes) > 2
+            self.unit_declarations.setdefault(node.value, []).append((binding, nested))
+        return binding
+
+    def record(self, node, binding):
+        previous = self.resolution.get(id(node))
+        if previous is not None and previous is not binding:
+            binding = _AMBIGUOUS
+        self.resolution[id(node)] = binding
+
+    def in_scope(self, visit_body):
+        self.scopes.append({})
+        visit_body()
+        self.scopes.pop()
+
+    def in_unit(self, function, visit_body):
+        """Visita el cuerpo de una función (o de main) recogiendo sus declaraciones."""
+        self.current_function = function
+        self.unit_declarations = {}
+        self.in_scope(visit_body)
+        self.units.append((function, self.unit_declarations))
+        self.unit_declarations = None
+        self.current_function = None
+
+    def visit_function_declaration(self, node):
+        function = _FunctionInfo(node)
+        self.functions.setdefault(node.value, function)
+
+        def visit_body():
+            for param in node.children[1].children:
+                binding = self.declare(param, param.children[0].value)
+                # Un parámetro nunca tiene valor constante
+                binding.modified = True
+                function.parameters.append(binding)
+            if len(node.children) > 2:
+                self.visit(node.children[2])
+        self.in_unit(function, visit_body)
+
+    def visit_function_call(self, node):
+        if self.current_function is not None:
+            self.current_function.callees.add(node.value)
+        self.generic_visit(node)
+
+    def visit_output_statement(self, node):
+        if self.current_function is not None:
+            self.current_function.impure = True
+        self.generic_visit(node)
+
+    def visit_main(self, node):
+        self.in_unit(None, lambda: self.generic_visit(node))
+
+    def visit_if_statement(self, node):
+        self.visit(node.children[0])
+        for branch in node.children[1:]:
+            self.in_scope(lambda: self.visit(branch))
+
+    def visit_declaration(self, node):
+        for child in node.children:
+            if child.type == ASTNodeType.ASSIGNMENT:
+                # Como en el análisis semántico, el nombre se define antes de
+                # visitar la inicialización
+                self.initializers[id(child)] = self.declare(child.children[0], node.value)
+                self.visit(child.children[1])
+            else:
+                self.declare(child, node.value)
+
+    def visit_assignment(self, node):
+        target = node.children[0]
+        binding = self.resolve(target.value)
+        if binding is not None:
+            binding.modified = True
+            self.record(target, binding)
+            if binding.is_global and self.current_function is not None:
+                self.current_function.impure = True
+        self.visit(node.children[1])
+
+    def visit_input_statement(self, node):
+        binding = self.resolve(node.children[0].value)
+        if binding is not None:
+            binding.modified = True
+            self.record(node.children[0], binding)
+        if self.current_function is not None:
+            self.current_function.impure = True
+
+    def mark_impure_callers(self):
+        """Propaga la impureza a quien llama (directa o indirectamente) a una función impura."""
+        changed = True
+        while changed:
+            changed = False
+            for function in self.functions.values():
+                if function.impure:
+                    continue
+                for callee in function.callees:
+                    info = self.functions.get(callee)
+                    if info is None or info.impure:
+                        function.impure = True
+                        changed = True
+                        break
+
+    def mark_redeclared(self):
+        """
+        El generador guarda una sola variable por nombre en cada función (o
+        main): la última declaración que encuentra en el texto tapa a las
+        anteriores y a la global del mismo nombre hasta el final de la
+        función, no hasta el final de su bloque. Para los nombres declarados
+        más de una vez en una función, o en un bloque interior con una
+        global del mismo nombre, los ámbitos del análisis no coinciden con
+        los del código generado: todas sus variables se marcan como
+        modificadas (nunca se propagan) y la función no se evalúa en tiempo
+        de compilación.
+        """
+        globals_ = self.scopes[0]
+        for function, declarations in self.units:
+            for name, declared in declarations.items():
+                bindings = [binding for binding, _ in declared]
+                if name in globals_ and any(nested for _, nested in declared):
+                    bindings.append(globals_[name])
+                if len(bindings) < 2:
+                    continue
+                for binding in bindings:
+                    binding.modified = True
+                    self.redeclared.add(binding)
+                if function is not None:
+                    function.evaluable = False
+
+    def visit_identifier(self, node):
+        binding = self.resolve(node.value)
+        if binding is not None:
+            self.record(node, binding)
+
+    def generic_visit(self, node):
+        if node.type in _SCOPED_STATEMENTS:
+            self.scopes.append({})
+        for child in node.children:
+            self.visit(child)
+        if node.type in _SCOPED_STATEMENTS:
+            self.scopes.pop()
+
+
+class _CannotEvaluate(Exception):
+    """La llamada no se puede evaluar en tiempo de compilación."""
+
+
+class _Return(Exception):
+    """Sentencia 'return' durante la evaluación."""
+    def __init__(self, value):
+        self.value = value
+
+
+# Marca de una llamada 'void' evaluada con éxito
+_NO_VALUE = (VOID, None)
+
+
+def _convert(constant, target_type):
+    """Convierte un valor al tipo de una variable, parámetro o retorno (como _cast_to_type)."""
+    value_type, value = constant
+    if value_type == target_type:
+        return constant
+    if target_type == FLOAT and value_type == INT:
+        return (FLOAT, _to_float32(float(value)))
+    if target_type == INT and value_type == FLOAT:
+        # fptosi: trunca hacia cero; fuera de rango es indefinido
+        value = int(value)
+        if not INT_MIN <= value <= INT_MAX:
+            raise _CannotEvaluate()
+        return (INT, value)
+    raise _CannotEvaluate()
+
+
+class CompileTimeEvaluator(ASTVisitor):
+    """
+    Intérprete acotado de funciones puras (sin cin, cout ni escrituras de
+    globales, y que solo llaman a funciones puras). Solo lee globales con
+    valor constante. Cada evaluación tiene un máximo de pasos y de
+    profundidad de llamadas; al superarlos, o ante cualquier cosa que no
+    se pueda calcular igual que en ejecución, la llamada se deja como está.
+    Los resultados se memorizan por (función, argumentos).
+    """
+    MAX_STEPS = 100000
+    MAX_CALL_DEPTH = 32
+
+    def __init__(self, resolver):
+        super().__init__()
+        self.resolution = resolver.resolution
+        self.functions = resolver.functions
+        # (nombre, argumentos) -> (tipo, valor), _NO_VALUE o None si no se pudo
+        self.memo = {}
+        self.steps = 0
+        self.depth = 0
+        # Variables de la llamada en curso: _Binding -> (tipo, valor)
+        self.frame = {}
+
+    def evaluate_call(self, name, arguments):
+        """Resultado de llamar a 'name' con constantes, o None si no se puede."""
+        key = (name, tuple(arguments))
+        if key in self.memo:
+            return self.memo[key]
+        self.steps = 0
+        self.depth = 0
+        try:
+            result = self.call(name, arguments)
+        except (_CannotEvaluate, RecursionError):
+            result = None
+        self.memo[key] = result
+        return result
+
+    def call(self, name, arguments):
+        key = (name, tuple(arguments))
+        cached = self.memo.get(key)
+        if cached is not None:
+            return cached
+
+        function = self.functions.get(name)
+        if function is None or function.impure or not function.evaluable:
+            raise _CannotEvaluate()
+        if self.depth >= self.MAX_CALL_DEPTH or len(arguments) != len(function.parameters):
+            raise _CannotEvaluate()
+
+        saved_frame = self.frame
+        self.frame = {
+            binding: _convert(argument, binding.var_type)
+            for binding, argument in zip(function.parameters, arguments)
+        }
+        self.depth += 1
+        try:
+            if len(function.node.children) > 2:
+                self.visit(function.node.children[2])
+            # Sin 'return': el generador devuelve 0 (o nada si es void)
+            result = _NO_VALUE if function.return_type == VOID else _convert((INT, 0), function.return_type)
+        except _Return as returned:
+            if returned.value is None:
+                result = _NO_VALUE
+            else:
+                result = _convert(returned.value, function.return_type)
+        finally:
+            self.depth -= 1
+            self.frame = saved_frame
+
+        self.memo[key] = result
+        return result
+
+    def visit(self, node):
+        if node is None:
+            raise _CannotEvaluate()
+        self.steps += 1
+        if self.steps > self.MAX_STEPS:
+            raise _CannotEvaluate()
+        return self._dispatch[node.type._value_](self, node)
+
+    def generic_visit(self, node):
+        # Cadenas, cin, cout y cualquier nodo no previsto
+        raise _CannotEvaluate()
+
+    # --- Expresiones ---
+
+    def visit_number(self, node):
+        constant = constant_value(node)
+        if constant is None:
+            raise _CannotEvaluate()
+        return constant
+
+    visit_boolean = visit_number
+
+    def visit_identifier(self, node):
+        binding = self.resolution.get(id(node))
+        if binding is None:
+            raise _CannotEvaluate()
+        value = self.frame.get(binding)
+        if value is not None:
+            return value
+        if binding.is_global and not binding.modified and binding.constant is not None:
+            return binding.constant
+        # Variable sin inicializar o global que cambia en ejecución
+        raise _CannotEvaluate()
+
+    def visit_binary_op(self, node):
+        result = fold_binary(node.value, self.visit(node.children[0]), self.visit(node.children[1]))
+        if result is None:
+            raise _CannotEvaluate()
+        return result
+
+    def visit_unary_op(self, node):
+        result = fold_unary(node.value, self.visit(node.children[0]))
+        if result is None:
+            raise _CannotEvaluate()
+        return result
+
+    def visit_function_call(self, node):
+        arguments = [self.visit(argument) for argument in node.children]
+        result = self.call(node.value, arguments)
+        if result is _NO_VALUE:
+            raise _CannotEvaluate()
+        return result
+
+    # --- Sentencias ---
+
+    def visit_block(self, node):
+        for statement in node.children:
+            if statement.type == ASTNodeType.FUNCTION_CALL:
+                # Llamada como sentencia: puede ser 'void'
+                self.call(statement.value, [self.visit(argument) for argument in statement.children])
+            else:
+                self.visit(statement)
+
+    def visit_declaration(self, node):
+        for child in node.children:
+            if child.type == ASTNodeType.ASSIGNMENT:
+                self.visit_assignment(child)
+            # Sin inicialización conserva el valor anterior (como el alloca del generador)
+
+    def visit_assignment(self, node):
+        binding = self.resolution.get(id(node.children[0]))
+        if binding is None or binding.is_global:
+            raise _CannotEvaluate()
+        self.frame[binding] = _convert(self.visit(node.children[1]), binding.var_type)
+
+    def condition(self, node):
+        return _truthy(self.visit(node))
+
+    def visit_if_statement(self, node):
+        if self.condition(node.children[0]):
+            self.visit(node.children[1])
+        elif len(node.children) > 2:
+            self.visit(node.children[2])
+
+    def visit_while_statement(self, node):
+        while self.condition(node.children[0]):
+            self.visit(node.children[1])
+
+    def visit_do_until_statement(self, node):
+        self.visit(node.children[0])
+        while not self.condition(node.children[1]):
+            self.visit(node.children[0])
+
+    def visit_for_statement(self, node):
+        init, condition, increment, body = node.children
+        if init is not None:
+            self.visit(init)
+        while self.condition(condition):
+            if body is not None:
+                self.visit(body)
+            if increment is not None:
+                self.visit(increment)
+
+    def visit_switch_statement(self, node):
+        value_type, value = self.visit(node.children[0])
+        if value_type != INT:
+            raise _CannotEvaluate()
+        selected = None
+        for case_node in node.children[1:]:
+            if case_node.type == ASTNodeType.CASE_BLOCK and int(case_node.value) == value:
+                selected = case_node
+                break
+        if selected is None:
+            for case_node in node.children[1:]:
+                if case_node.type == ASTNodeType.DEFAULT_BLOCK:
+                    selected = case_node
+        if selected is not None:
+            self.visit(selected.children[0])
+
+    def visit_return_statement(self, node):
+        if node.value == "void_return":
+            raise _Return(None)
+        raise _Return(self.visit(node.children[0]))
+
+
+class ConstantFolder(ASTVisitor):
+    """
+    Fase 2: devuelve el árbol optimizado. visit() devuelve el nodo
+    resultante (el mismo si no cambió) o None si la sentencia desaparece.
+    """
+    def __init__(self, resolver):
+        super().__init__()
+        self.resolution = resolver.resolution
+        self.initializers = resolver.initializers
+        self.evaluator = CompileTimeEvaluator(resolver)
+        # Estadísticas
+        self.folded = 0
+        self.propagated = 0
+        self.pruned = 0
+        self.evaluated = 0
+
+    def fold_children(self, node):
+        children = [self.visit(child) if child is not None else None for child in node.children]
+        if all(new is old for new, old in zip(children, node.children)):
+            return node
+        return _copy_node(node, children)
+
+    def generic_visit(self, node):
+        return self.fold_children(node)
+
+    def fold_statements(self, node):
+        """Pliega una lista de sentencias descartando las que siguen a un 'return'."""
+        children = []
+        changed = False
+        for index, child in enumerate(node.children):
+            if child.type == ASTNodeType.FUNCTION_CALL:
+                new, result = self.fold_call(child)
+                if result is not None:
+                    # Llamada pura evaluada: como sentencia no tiene efecto
+                    self.pruned += 1
+                    changed = True
+                    continue
+            else:
+                new = self.visit(child)
+            changed = changed or new is not child
+            if new is None:
+                continue
+            children.append(new)
+            if self.terminates(new):
+                unreachable = len(node.children) - index - 1
+                if unreachable:
+                    self.pruned += unreachable
+                    changed = True
+                break
+        if not changed:
+            return node
+        return _copy_node(node, children)
+
+    def terminates(self, node):
+        """Indica si la sentencia termina siempre la función (return)."""
+        if node.type == ASTNodeType.RETURN_STATEMENT:
+            return True
+        if node.type == ASTNodeType.BLOCK:
+            return bool(node.children) and self.terminates(node.children[-1])
+        return False
+
+    visit_program = fold_statements
+    visit_main = fold_statements
+    visit_block = fold_statements
+
+    # --- Expresiones ---
+
+    def visit_identifier(self, node):
+        binding = self.resolution.get(id(node))
+        if binding is None or binding.modified or binding.constant is None:
+            return node
+        self.propagated += 1
+        return _literal_node(binding.constant, node.line, node.column)
+
+    def visit_binary_op(self, node):
+        folded = self.fold_children(node)
+        left = constant_value(folded.children[0])
+        right = constant_value(folded.children[1])
+        if left is None or right is None:
+            return folded
+        result = fold_binary(node.value, left, right)
+        if result is None:
+            return folded
+        self.folded += 1
+        return _literal_node(result, node.line, node.column)
+
+    def visit_unary_op(self, node):
+        folded = self.fold_children(node)
+        operand = constant_value(folded.children[0])
+        if operand is None:
+            return folded
+        result = fold_unary(node.value, operand)
+        if result is None:
+            return folded
+        self.folded += 1
+        return _literal_node(result, node.line, node.column)
+
+    def fold_call(self, node):
+        """
+        Pliega los argumentos de una llamada y, si todos son constantes,
+        intenta evaluarla. Devuelve (nodo, resultado o None).
+        """
+        folded = self.fold_children(node)
+        arguments = [constant_value(argument) for argument in folded.children]
+        if any(argument is None for argument in arguments):
+            return folded, None
+        result = self.evaluator.evaluate_call(node.value, arguments)
+        if result is not None:
+            self.evaluated += 1
+        return folded, result
+
+    def visit_function_call(self, node):
+        folded, result = self.fold_call(node)
+        if result is None or result is _NO_VALUE:
+            return folded
+        return _literal_node(result, node.line, node.column)
+
+    # --- Sentencias ---
+
+    def visit_assignment(self, node):
+        # El destino nunca se sustituye por su valor
+        target, expression = node.children
+        folded = self.visit(expression)
+
+        binding = self.initializers.get(id(node))
+        if binding is not None and not binding.modified:
+            constant = constant_value(folded)
+            if constant is not None and constant[0] != BOOLEAN and is_assignable(binding.var_type, constant[0]):
+                value = _promote(constant[0], constant[1], binding.var_type)
+                if value is not None:
+                    binding.constant = (binding.var_type, value)
+
+        if folded is expression:
+            return node
+        return _copy_node(node, [target, folded])
+
+    def visit_if_statement(self, node):
+        condition = self.visit(node.children[0])
+        constant = constant_value(condition)
+        if constant is None:
+            children = [condition] + [self.visit(branch) for branch in node.children[1:]]
+            if all(new is old for new, old in zip(children, node.children)):
+                return node
+            return _copy_node(node, children)
+
+        # Solo se conserva la rama que se ejecuta (como bloque)
+        self.pruned += 1
+        if _truthy(constant):
+            return self.visit(node.children[1])
+        if len(node.children) > 2:
+            return self.visit(node.children[2])
+        return None
+
+    def visit_while_statement(self, node):
+        condition = self.visit(node.children[0])
+        constant = constant_value(condition)
+        if constant is not None and not _truthy(constant):
+            self.pruned += 1
+            return None
+        body = self.visit(node.children[1])
+        if condition is node.children[0] and body is node.children[1]:
+            return node
+        return _copy_node(node, [condition, body])
+
+    def visit_input_statement(self, node):
+        return node
+
+
+# Nodos cuyos hijos son listas de sentencias
+_STATEMENT_LISTS = (ASTNodeType.BLOCK, ASTNodeType.CASE_BLOCK, ASTNodeType.DEFAULT_BLOCK)
+
+
+class DeadCodeEliminator(ASTVisitor):
+    """
+    Fase 3: con el grafo de flujo de cada función (flujo_control) quita las
+    sentencias inalcanzables, las asignaciones a variables locales que nadie
+    lee después y las declaraciones que se quedan sin usar. Cada función se
+    reanaliza hasta que no cambia: quitar una asignación puede dejar sin
+    lectores a otra anterior. La inicialización y el incremento de un 'for'
+    no se tocan.
+    """
+    def __init__(self, resolver):
+        super().__init__()
+        # Los identificadores ambiguos quedan sin resolver: en las
+        # funciones que los contienen solo se quita el código inalcanzable
+        self.resolution = {
+            key: binding for key, binding in resolver.resolution.items()
+            if binding is not _AMBIGUOUS
+        }
+        # Variables que el generador no separa por bloques (mark_redeclared):
+        # una declaración interior escribe en la misma variable que la exterior
+        self.preserved = resolver.redeclared
+        self.unreachable = set()
+        self.dead_stores = set()
+        self.unused = set()
+        # Estadísticas
+        self.removed_unreachable = 0
+        self.removed_stores = 0
+        self.removed_declarations = 0
+
+    def visit_program(self, node):
+        # Las declaraciones globales se quedan como están
+        children = [
+            self.visit(child) if child.type in (ASTNodeType.FUNCTION_DECLARATION, ASTNodeType.MAIN) else child
+            for child in node.children
+        ]
+        if all(new is old for new, old in zip(children, node.children)):
+            return node
+        return _copy_node(node, children)
+
+    def visit_function(self, node):
+        while True:
+            cfg = ControlFlowGraph(node, self.resolution)
+            self.unreachable = unreachable_statements(cfg)
+            self.dead_stores = dead_stores(cfg, self.preserved)
+            self.unused = unused_declarations(cfg, self.preserved)
+            new = self.visit_statements(node) if node.type == ASTNodeType.MAIN else self.generic_visit(node)
+            if new is node:
+                return node
+            node = new
+
+    visit_function_declaration = visit_function
+    visit_main = visit_function
+
+    def generic_visit(self, node):
+        children = [
+            self.visit(child) if child is not None and child.type in _STATEMENT_LISTS else child
+            for child in node.children
+        ]
+        if all(new is old for new, old in zip(children, node.children)):
+            return node
+        return _copy_node(node, children)
+
+    def visit_statements(self, node):
+        children = []
+        changed = False
+        for child in node.children:
+            new = self.statement(child)
+            changed = changed or new is not child
+            if new is not None:
+                children.append(new)
+        if not changed:
+            return node
+        return _copy_node(node, children)
+
+    visit_block = visit_statements
+
+    def statement(self, node):
+        """La sentencia sin su código muerto, o None si desaparece entera."""
+        key = id(node)
+        if key in self.unreachable:
+            self.removed_unreachable += 1
+            return None
+        if key in self.dead_stores:
+            self.removed_stores += 1
+            return None
+        if node.type == ASTNodeType.DECLARATION:
+            return self.declaration(node)
+        return self.visit(node)
+
+    def declaration(self, node):
+        children = []
+        for declarator in node.children:
+            key = id(declarator)
+            if key in self.unused:
+                self.removed_declarations += 1
+            elif key in self.dead_stores:
+                # Se declara sin inicializar
+                self.removed_stores += 1
+                children.append(declarator.children[0])
+            else:
+                children.append(declarator)
+        if not children:
+            return None
+        if len(children) == len(node.children) and all(new is old for new, old in zip(children, node.children)):
+            return node
+        return _copy_node(node, children)
+
+
+def remove_dead_functions(program):
+    """
+    Fase 4: quita las funciones a las que no se llega desde main según el
+    grafo de llamadas del árbol ya optimizado (las llamadas evaluadas en
+    tiempo de compilación o en código muerto ya no cuentan). Devuelve el
+    programa y el número de funciones quitadas.
+    """
+    graph = CallGraph(declared_functions(program), collect_calls(program))
+    if MAIN not in graph.functions:
+        return program, 0
+    live = graph.reachable()
+    children = [
+        child for child in program.children
+        if child.type != ASTNodeType.FUNCTION_DECLARATION or child.value in live
+    ]
+    removed = len(program.children) - len(children)
+    if not removed:
+        return program, 0
+    return _copy_node(program, children), removed
+
+
+def optimize_ast(ast):
+    """
+    Devuelve una versión optimizada de un AST ya analizado sin errores
+    (el original no se modifica) y las estadísticas de cada fase.
+    """
+    resolver = _BindingResolver()
+    resolver.visit(ast)
+    resolver.mark_impure_callers()
+    resolver.mark_redeclared()
+    folder = ConstantFolder(resolver)
+    tree = folder.visit(ast)
+    # Los identificadores que quedan en el árbol plegado son los del
+    # original, así que la resolución de la fase 1 sigue valiendo
+    eliminator = DeadCodeEliminator(resolver)
+    tree = eliminator.visit(tree)
+    tree, dead_functions = remove_dead_functions(tree)
+    stats = {
+        'folded': folder.folded,
+        'propagated': folder.propagated,
+        'pruned': folder.pruned,
+        'evaluated': folder.evaluated,
+        'unreachable': eliminator.removed_unreachable,
+        'dead_stores': eliminator.removed_stores,
+        'unused_declarations': eliminator.removed_declarations,
+        'dead_functions': dead_functions,
+    }
+    return tree, stats
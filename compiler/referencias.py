@@ -0,0 +1,84 @@
+# referencias.py
+"""
+Índice de referencias cruzadas: cada declaración (variable, parámetro o
+función) con todos los puntos del programa que la usan.
+
+El análisis semántico ya sabe a qué declaración resuelve cada nombre al
+visitarlo; lo anota en SemanticAnalyzer.declarations y .references y al
+terminar construye un CrossReferenceIndex. Una declaración se identifica
+por (nombre, ámbito, línea, columna) y una referencia por su posición y su
+tipo: READ (lectura), WRITE (asignación o cin) o CALL (llamada).
+
+El índice guarda también la declaración a la que corresponde cada posición
+(de una declaración o de una referencia), así que "ir a la definición" y
+"buscar referencias" desde un identificador son búsquedas en diccionarios.
+"""
+
+# Tipos de referencia
+READ = 'read'
+WRITE = 'write'
+CALL = 'call'
+
+
+class CrossReferenceIndex:
+    """Declaraciones del programa y sus referencias, consultables por posición."""
+    def __init__(self, declarations=(), references=()):
+        # clave (nombre, ámbito, línea, columna) -> tipo del símbolo
+        self.declarations = {}
+        # clave -> [(línea, columna, tipo de referencia)] en orden de aparición
+        self.references = {}
+        # (línea, columna) de una declaración o referencia -> clave
+        self.positions = {}
+        for name, scope, line, column, symbol_type in declarations:
+            self.add_declaration(name, scope, line, column, symbol_type)
+        for key, line, column, kind in references:
+            self.add_reference(tuple(key), line, column, kind)
+
+    def add_declaration(self, name, scope, line, column, symbol_type):
+        key = (name, scope, line, column)
+        self.declarations[key] = symbol_type
+        self.references.setdefault(key, [])
+        self.positions[(line, column)] = key
+
+    def add_reference(self, key, line, column, kind):
+        self.references.setdefault(key, []).append((line, column, kind))
+        self.positions.setdefault((line, column), key)
+
+    def declaration_at(self, line, column):
+        """Clave de la declaración del identificador que empieza en (línea, columna), o None."""
+        return self.positions.get((line, column))
+
+    def describe(self, key):
+        """La declaración 'key' como diccionario (para las respuestas del servidor)."""
+        name, scope, line, column = key
+        return {'name': name, 'scope': scope, 'line': line, 'column': column, 'type': self.declarations.get(key)}
+
+    def definition(self, line, column):
+        """Declaración del identificador en (línea, columna), o None."""
+        key = self.declaration_at(line, column)
+        return None if key is None else self.describe(key)
+
+    def find_references(self, line, column, include_declaration=True):
+        """Referencias (y la declaración) del símbolo del identificador en (línea, columna)."""
+        key = self.declaration_at(line, column)
+        if key is None:
+            return []
+        locations = []
+        if include_declaration and key in self.declarations:
+            locations.append({'line': key[2], 'column': key[3], 'kind': 'declaration'})
+        locations.extend({'line': line, 'column': column, 'kind': kind}
+                         for line, column, kind in self.references.get(key, ()))
+        return locations
+
+    # --- Serialización (caché en disco) ---
+
+    def to_row(self):
+        declarations = [list(key) + [symbol_type] for key, symbol_type in self.declarations.items()]
+        references = [[list(key), line, column, kind]
+                      for key, refs in self.references.items() for line, column, kind in refs]
+        return [declarations, references]
+
+    @classmethod
+    def from_row(cls, row):
+        declarations, references = row
+        return cls(declarations, references)
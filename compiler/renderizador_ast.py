@@ -0,0 +1,191 @@
+# renderizador_ast.py
+"""
+Renderizado de todas las vistas del AST en un único recorrido.
+
+Cada vista es un "emisor" que recibe cada nodo del recorrido y escribe en
+su propio búfer (lista de fragmentos), que se une una sola vez al final.
+Así se evita la concatenación cuadrática de cadenas y el AST se recorre
+una sola vez aunque se pidan varias vistas.
+"""
+
+
+class TextEmitter:
+    """Vista de texto indentado (ast.txt). Omite los hijos None y los node_id."""
+    def __init__(self, indent=0, with_ids=False, max_depth=None):
+        self.indent = indent
+        self.parts = []
+        self.write = self.parts.append
+
+    def enter(self, node, depth):
+        if node is None:
+            return
+        value = f" [{node.value}]" if node.value else ""
+        if node.line and node.column:
+            position = f" (línea {node.line}, col {node.column})"
+        elif node.line:
+            position = f" (línea {node.line})"
+        else:
+            position = ""
+        self.write(f"{'  ' * (self.indent + depth)}{node.type.name}{value}{position}\n")
+
+    def result(self):
+        return "".join(self.parts)
+
+
+class HTMLEmitter:
+    """
+    Vista HTML colapsable del AST sintáctico. Con with_ids=True cada nodo
+    lleva su node_id en el atributo data-node-id (para parchear la vista).
+    Con max_depth, los nodos de esa profundidad con hijos se marcan con la
+    clase 'ast-lazy' y sus hijos se piden después al servidor.
+    """
+    def __init__(self, with_ids=False, max_depth=None):
+        self.with_ids = with_ids
+        self.max_depth = max_depth
+        self.parts = []
+        self.write = self.parts.append
+        # Cierres pendientes de los nodos abiertos con hijos, uno por nivel
+        self.closers = []
+
+    def label(self, node):
+        value = f' <span class="node-value">[{node.value}]</span>' if node.value else ''
+        if node.line is not None and node.column is not None:
+            position = f' <span class="node-position">(línea {node.line}, col {node.column})</span>'
+        elif node.line:
+            position = f' <span class="node-position">(línea {node.line})</span>'
+        else:
+            position = ''
+        return f'<span class="node-type">{node.type.name}</span>{value}{position}'
+
+    def enter(self, node, depth):
+        if node is None:
+            return
+        # Cerrar los nodos que ya no son ancestros del actual
+        closers = self.closers
+        while len(closers) > depth:
+            self.write(closers.pop())
+        lazy = self.max_depth is not None and depth >= self.max_depth and node.children
+        css_class = "ast-node ast-lazy" if lazy else "ast-node"
+        opening = f'<div class="{css_class}" data-node-id="{node.node_id}">' if self.with_ids else f'<div class="{css_class}">'
+        if lazy:
+            self.write(f'{opening}<div class="ast-label">{self.label(node)}</div><div class="ast-children"></div></div>')
+        elif node.children:
+            self.write(f'{opening}<div class="ast-label">{self.label(node)}</div><div class="ast-children">')
+            closers.append('</div></div>')
+        else:
+            self.write(f'{opening}<div class="ast-label">{self.label(node)}</div></div>')
+
+    def result(self):
+        while self.closers:
+            self.write(self.closers.pop())
+        return "".join(self.parts)
+
+
+class SemanticHTMLEmitter(HTMLEmitter):
+    """Vista HTML del AST anotado (tipo, ámbito y estado de cada nodo)."""
+    def label(self, node):
+        value = f' <span class="node-value">[{node.value}]</span>' if node.value else ''
+
+        sem_info = []
+        if node.data_type:
+            sem_info.append(f'Tipo: {node.data_type}')
+        if node.scope:
+            sem_info.append(f'Ámbito: {node.scope}')
+        if node.state:
+            sem_info.append(f'Estado: {node.state}')
+        sem = f' <span class="sem-info">({", ".join(sem_info)})</span>' if sem_info else ''
+
+        return f'<span class="node-type">{node.type.name}</span>{value}{sem}'
+
+
+class DictEmitter:
+    """
+    Estructura de diccionarios equivalente a ASTNode.to_dict(). Con
+    with_ids=True se añade la clave 'id' con el node_id de cada nodo. Con
+    max_depth, los nodos truncados llevan 'collapsed': True y sin hijos.
+    """
+    def __init__(self, with_ids=False, max_depth=None):
+        self.with_ids = with_ids
+        self.max_depth = max_depth
+        # levels[d] es la lista de hijos donde se añaden los nodos de profundidad d
+        self.levels = [[]]
+
+    def enter(self, node, depth):
+        levels = self.levels
+        del levels[depth + 1:]
+        if node is None:
+            levels[depth].append(None)
+            return
+        children = []
+        entry = {
+            'type': node.type.name,
+            'value': node.value,
+            'line': node.line,
+            'column': node.column,
+            'children': children,
+
+            # Atributos adicionales para análisis semántico
+            'data_type': node.data_type,
+            'scope': node.scope,
+            'state': node.state,
+        }
+        if self.with_ids:
+            entry['id'] = node.node_id
+        if self.max_depth is not None and depth >= self.max_depth and node.children:
+            entry['collapsed'] = True
+        levels[depth].append(entry)
+        levels.append(children)
+
+    def result(self):
+        roots = self.levels[0]
+        return roots[0] if roots else None
+
+
+# Nombre de cada vista -> clase del emisor
+VIEW_EMITTERS = {
+    'text': TextEmitter,
+    'html': HTMLEmitter,
+    'semantic_html': SemanticHTMLEmitter,
+    'dict': DictEmitter,
+}
+
+
+def render_ast(root, *emitters, max_depth=None):
+    """
+    Recorre el AST una sola vez (de forma iterativa, en preorden) y envía cada
+    nodo con su profundidad a todos los emisores. Los emisores deducen los
+    cierres a partir de la profundidad, así que no hace falta un evento de
+    salida por nodo. Con max_depth no se visitan los nodos más profundos (los
+    emisores deben haberse creado con el mismo max_depth). Devuelve la lista
+    de resultados, en el mismo orden.
+    """
+    enters = [emitter.enter for emitter in emitters]
+
+    if root is not None:
+        stack = [(root, 0)]
+        pop = stack.pop
+        push = stack.append
+        while stack:
+            node, depth = pop()
+            for enter in enters:
+                enter(node, depth)
+            if node is None:
+                continue
+
+            children = node.children
+            if children and (max_depth is None or depth < max_depth):
+                child_depth = depth + 1
+                for i in range(len(children) - 1, -1, -1):
+                    push((children[i], child_depth))
+
+    return [emitter.result() for emitter in emitters]
+
+
+def render_views(root, views, with_ids=False, max_depth=None):
+    """
+    Produce las vistas pedidas por nombre ('text', 'html', ...) en un solo
+    recorrido. with_ids incluye el node_id en las vistas HTML y dict, y
+    max_depth limita la profundidad renderizada.
+    """
+    emitters = [VIEW_EMITTERS[view](with_ids=with_ids, max_depth=max_depth) for view in views]
+    return dict(zip(views, render_ast(root, *emitters, max_depth=max_depth)))
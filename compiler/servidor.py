@@ -0,0 +1,431 @@
+# servidor.py
+"""
+Servidor del compilador para el editor.
+
+Proceso de larga duración que recibe peticiones JSON (una por línea) por la
+entrada estándar y responde, también una por línea, por la salida estándar:
+
+    -> {"id": 1, "method": "compile", "params": {"document": "a.txt", "code": "..."}}
+    <- {"id": 1, "result": {...}}
+
+A diferencia de compilador.py, conserva entre peticiones el AST anotado de
+cada documento. La primera compilación de un documento devuelve las vistas
+completas (con node_id estables) y las siguientes devuelven en 'ast_diff'
+solo las operaciones que transforman la vista anterior en la nueva.
+
+Las vistas del árbol se envían solo hasta cierta profundidad; los nodos
+truncados se marcan como 'ast-lazy' y sus hijos se piden con 'expand'. Así
+el tamaño de la respuesta inicial no depende del tamaño del programa. Los
+archivos de depuración (tokens.txt, ast.txt...) solo los escribe la CLI.
+"""
+import sys
+import json
+import threading
+import traceback
+
+from renderizador_ast import render_ast, DictEmitter, HTMLEmitter, SemanticHTMLEmitter
+from compilador import (obtener_frontend, generar_resultado, CACHE_DIR, GRAPH_DIR,
+                        BASE_DIR, COMPILER_VERSION)
+from cache_ast import ASTCache, compiler_fingerprint
+from diferencias_ast import NodeIdAllocator, shape_hashes, diff_ast
+from analisis_incremental import FunctionAnalysisCache
+from exportador_grafo import ASTGraphExporter
+from indice_posiciones import PositionIndex
+from tokens_semanticos import SemanticTokenCache, token_edits, TOKEN_TYPES, TOKEN_MODIFIERS
+from autocompletado import CompletionIndex, DEFAULT_LIMIT as DEFAULT_COMPLETION_LIMIT
+from tabla_hash import (populate_hash_table_from_symbol_table, hash_table_page, symbol_table_page,
+                        DEFAULT_PAGE_SIZE, DEFAULT_SYMBOL_PAGE_SIZE)
+
+# Vistas completas que se sustituyen por 'ast_diff' en una compilación incremental
+FULL_AST_VIEWS = ('ast', 'ast_text', 'ast_html', 'semantic_tree_html')
+
+# Niveles del árbol que se envían de entrada y en cada 'expand'
+DEFAULT_VIEW_DEPTH = 2
+
+
+class DocumentState:
+    """Estado que el servidor conserva de cada documento abierto."""
+    def __init__(self, unit_cache=None, completions=None):
+        self.version = 0
+        self.allocator = NodeIdAllocator()
+        self.ast = None
+        self.hashes = {}
+        # Si el AST guardado tiene anotaciones semánticas
+        self.semantic = False
+        self.tabla_de_simbolos = None
+        self.grafo_llamadas = None
+        # Tabla hash de la vista; se construye al primer 'hash_table' tras cada compilación
+        self.hash_table = None
+        # Índice de referencias cruzadas del último análisis semántico (None si no lo hubo)
+        self.referencias = None
+        # node_id -> nodo; se construye al primer 'expand' tras cada compilación
+        self.node_index = None
+        # Código y tokens de la última compilación, e índice de posiciones
+        # (se construye al primer 'hover' tras cada compilación)
+        self.code = None
+        self.tokens = ()
+        self.position_index = None
+        # Tokens semánticos por función y los últimos enviados (con su result_id)
+        self.semantic_tokens = SemanticTokenCache()
+        self.semantic_tokens_data = None
+        self.semantic_tokens_result_id = None
+        # Análisis semántico de cada función, para re-analizar solo lo editado
+        self.unit_cache = unit_cache if unit_cache is not None else FunctionAnalysisCache()
+        # Nombres completables; se sincronizan en la primera 'completion' tras
+        # cada compilación con análisis semántico y sobreviven a las que no lo
+        # tienen (mientras se escribe, el código suele tener errores)
+        self.completions = completions if completions is not None else CompletionIndex()
+        self.completions_stale = False
+
+    def find_node(self, node_id):
+        if self.node_index is None:
+            self.node_index = {}
+            stack = [self.ast]
+            while stack:
+                node = stack.pop()
+                if node is None:
+                    continue
+                self.node_index[node.node_id] = node
+                stack.extend(node.children)
+        return self.node_index.get(node_id)
+
+    def positions(self):
+        if self.position_index is None:
+            self.position_index = PositionIndex(self.ast, self.code, self.tokens)
+        return self.position_index
+
+
+class CompilerServer:
+    def __init__(self, output=sys.stdout, cache=None):
+        self.output = output
+        self.cache = cache
+        self.documents = {}
+        self.graph_exporter = ASTGraphExporter(GRAPH_DIR)
+        # Las respuestas pueden escribirse desde hilos de fondo (grafo)
+        self.output_lock = threading.Lock()
+        self.running = True
+
+        self.handlers = {
+            'compile': self.handle_compile,
+            'expand': self.handle_expand,
+            'graph': self.handle_graph,
+            'hover': self.handle_hover,
+            'definition': self.handle_definition,
+            'semantic_tokens': self.handle_semantic_tokens,
+            'completion': self.handle_completion,
+            'symbols': self.handle_symbols,
+            'hash_table': self.handle_hash_table,
+            'references': self.handle_references,
+            'close': self.handle_close,
+            'shutdown': self.handle_shutdown,
+        }
+
+    # --- Transporte ---
+
+    def send(self, message):
+        line = json.dumps(message)
+        with self.output_lock:
+            self.output.write(line + "\n")
+            self.output.flush()
+
+    def serve(self, input_stream=sys.stdin):
+        for line in input_stream:
+            if not line.strip():
+                continue
+            self.handle_line(line)
+            if not self.running:
+                break
+
+    def handle_line(self, line):
+        request_id = None
+        try:
+            request = json.loads(line)
+            request_id = request.get('id')
+            handler = self.handlers.get(request.get('method'))
+            if handler is None:
+                raise ValueError(f"Método desconocido: {request.get('method')}")
+            result = handler(request_id, request.get('params') or {})
+            # Los métodos asíncronos responden por su cuenta (devuelven None)
+            if result is not None:
+                self.send({'id': request_id, 'result': result})
+        except Exception as e:
+            self.send({
+                'id': request_id,
+                'error': str(e),
+                'traceback': traceback.format_exc()
+            })
+
+    # --- Métodos ---
+
+    def handle_compile(self, request_id, params):
+        """
+        params: document, code, run (opcional), full (opcional, fuerza las
+        vistas completas, p. ej. si la interfaz perdió la sincronización) y
+        depth (opcional, niveles del árbol a enviar; null para todos).
+        """
+        document = params['document']
+        depth = params.get('depth', DEFAULT_VIEW_DEPTH)
+        codigo = params['code']
+        state = self.documents.get(document)
+        unit_cache = state.unit_cache if state is not None else FunctionAnalysisCache()
+        frontend = obtener_frontend(codigo, cache=self.cache, unit_cache=unit_cache)
+        ast = frontend['ast']
+        semantic = frontend['semantico'] is not None
+
+        incremental = (
+            state is not None
+            and not params.get('full', False)
+            and state.ast is not None
+            and ast is not None
+            and state.semantic == semantic
+        )
+
+        hashes = shape_hashes(ast) if ast is not None else {}
+        if incremental:
+            ops = diff_ast(state.ast, state.hashes, ast, hashes, state.allocator,
+                           semantic=semantic, max_depth=depth)
+            resultado = generar_resultado(codigo, frontend, params.get('run', False),
+                                          vistas_ast=False, escribir_archivos=False,
+                                          pagina_tabla_hash=DEFAULT_PAGE_SIZE)
+            for key in FULL_AST_VIEWS:
+                resultado.pop(key, None)
+            resultado['ast_diff'] = {'base_version': state.version, 'ops': ops}
+        else:
+            state = DocumentState(unit_cache, state.completions if state is not None else None)
+            self.documents[document] = state
+            if ast is not None:
+                state.allocator.assign(ast)
+            resultado = generar_resultado(codigo, frontend, params.get('run', False),
+                                          with_ids=True, profundidad_ast=depth, escribir_archivos=False,
+                                          pagina_tabla_hash=DEFAULT_PAGE_SIZE)
+            if depth is not None:
+                # El texto del árbol completo no se usa en la vista perezosa
+                resultado.pop('ast_text', None)
+
+        # La tabla de símbolos y el grafo de llamadas solo se envían si
+        # cambiaron; de la tabla, solo la primera página (el resto con 'symbols')
+        tabla = resultado['tabla_de_simbolos']
+        if incremental and tabla == state.tabla_de_simbolos:
+            del resultado['tabla_de_simbolos']
+            resultado['tabla_de_simbolos_sin_cambios'] = True
+        elif tabla:
+            resultado['tabla_de_simbolos'], total = symbol_table_page(tabla, 0, DEFAULT_SYMBOL_PAGE_SIZE)
+            resultado['tabla_de_simbolos_pagina'] = {
+                'start': 0, 'count': min(total, DEFAULT_SYMBOL_PAGE_SIZE), 'total': total}
+        grafo = resultado['grafo_llamadas']
+        if incremental and grafo == state.grafo_llamadas:
+            del resultado['grafo_llamadas']
+            resultado['grafo_llamadas_sin_cambios'] = True
+
+        state.version += 1
+        state.ast = ast
+        state.hashes = hashes
+        state.semantic = semantic
+        state.tabla_de_simbolos = tabla
+        state.grafo_llamadas = grafo
+        state.hash_table = None
+        state.referencias = frontend['semantico']['referencias'] if semantic else None
+        state.node_index = None
+        state.code = codigo
+        state.tokens = frontend['tokens']
+        state.position_index = None
+        state.completions_stale = semantic
+
+        resultado['document'] = document
+        resultado['version'] = state.version
+        return resultado
+
+    def handle_expand(self, request_id, params):
+        """
+        Devuelve los hijos de un nodo (params: document, node_id, depth) ya
+        renderizados, para insertarlos en el contenedor del nodo perezoso.
+        """
+        state = self.documents.get(params['document'])
+        node = state.find_node(params['node_id']) if state and state.ast else None
+        if node is None:
+            raise ValueError(f"Nodo desconocido: {params.get('node_id')}")
+
+        # Los hijos se renderizan a partir de profundidad 0
+        depth = params.get('depth', DEFAULT_VIEW_DEPTH)
+        child_depth = None if depth is None else max(depth - 1, 0)
+        children = []
+        html_parts = []
+        semantic_parts = []
+        for child in node.children:
+            emitters = [DictEmitter(with_ids=True, max_depth=child_depth), HTMLEmitter(with_ids=True, max_depth=child_depth)]
+            if state.semantic:
+                emitters.append(SemanticHTMLEmitter(with_ids=True, max_depth=child_depth))
+            results = render_ast(child, *emitters, max_depth=child_depth)
+            children.append(results[0])
+            html_parts.append(results[1])
+            if state.semantic:
+                semantic_parts.append(results[2])
+
+        return {
+            'document': params['document'],
+            'version': state.version,
+            'node_id': node.node_id,
+            'children': children,
+            'html': "".join(html_parts),
+            'semantic_html': "".join(semantic_parts),
+        }
+
+    def handle_graph(self, request_id, params):
+        """Exporta en segundo plano el AST actual del documento con Graphviz."""
+        state = self.documents.get(params['document'])
+        if state is None or state.ast is None:
+            raise ValueError(f"El documento no tiene un AST: {params['document']}")
+
+        def reply(future):
+            try:
+                self.send({'id': request_id, 'result': {'ast_visual': future.result()}})
+            except Exception as e:
+                self.send({'id': request_id, 'error': f"Error al exportar el AST con Graphviz: {e}"})
+
+        self.graph_exporter.export_async(state.ast).add_done_callback(reply)
+        return None
+
+    def handle_hover(self, request_id, params):
+        """
+        Nodo más interno del AST bajo (line, column) (params: document, line,
+        column) con su tipo anotado, su intervalo y, si es un nombre, su
+        declaración; null si la posición no cae dentro de ningún nodo.
+        """
+        state = self.document_state(params)
+        hover = None
+        if state.ast is not None:
+            index = state.positions()
+            span = index.span_at(params['line'], params['column'])
+            if span is not None:
+                hover = index.describe(span)
+                node = index.nodes[span]
+                if state.referencias is not None and node.line is not None:
+                    hover['definition'] = state.referencias.definition(node.line, node.column)
+        return {'document': params['document'], 'version': state.version, 'hover': hover}
+
+    def handle_semantic_tokens(self, request_id, params):
+        """
+        Tokens semánticos del documento (params: document, previous_result_id
+        opcional). Si previous_result_id es el de la última respuesta, se
+        devuelven solo las ediciones ('edits') sobre aquellos datos; si no,
+        los datos completos ('data') y la leyenda.
+        """
+        state = self.document_state(params)
+        previous = None
+        previous_id = params.get('previous_result_id')
+        if previous_id is not None and previous_id == state.semantic_tokens_result_id:
+            previous = state.semantic_tokens_data
+
+        result_id = str(state.version)
+        if state.semantic_tokens_result_id != result_id:
+            data = []
+            if state.referencias is not None:
+                data = state.semantic_tokens.compute(state.ast, state.referencias)
+            state.semantic_tokens_data = data
+            state.semantic_tokens_result_id = result_id
+
+        response = {'document': params['document'], 'version': state.version, 'result_id': result_id}
+        if previous is not None:
+            response['edits'] = token_edits(previous, state.semantic_tokens_data)
+        else:
+            response['data'] = state.semantic_tokens_data
+            response['legend'] = {'token_types': list(TOKEN_TYPES), 'token_modifiers': list(TOKEN_MODIFIERS)}
+        return response
+
+    def handle_completion(self, request_id, params):
+        """
+        Nombres visibles en (line, column) que empiezan por el identificador
+        que termina ahí (params: document, line, column, limit opcional).
+        """
+        state = self.document_state(params)
+        positions = state.positions()
+        if state.completions_stale:
+            state.completions.update(state.ast, state.referencias, positions)
+            state.completions_stale = False
+        offset = positions.offset(params['line'], params['column'])
+        if offset is None:
+            raise ValueError(f"Posición fuera del documento: {params['line']}:{params['column']}")
+        prefix, items = state.completions.complete(state.code, offset,
+                                                   params.get('limit', DEFAULT_COMPLETION_LIMIT))
+        return {'document': params['document'], 'version': state.version, 'prefix': prefix, 'items': items}
+
+    def handle_symbols(self, request_id, params):
+        """Página de la tabla de símbolos (params: document, start, count opcional)."""
+        state = self.document_state(params)
+        start = params.get('start', 0)
+        count = params.get('count', DEFAULT_SYMBOL_PAGE_SIZE)
+        scopes, total = symbol_table_page(state.tabla_de_simbolos or [], start, count)
+        return {
+            'document': params['document'],
+            'version': state.version,
+            'tabla_de_simbolos': scopes,
+            'start': start,
+            'count': max(min(count, total - start), 0),
+            'total': total,
+        }
+
+    def handle_hash_table(self, request_id, params):
+        """
+        Página de la vista de la tabla hash (params: document, start y count
+        opcional, en buckets): su HTML, el tamaño de la tabla y el número
+        de símbolos.
+        """
+        state = self.document_state(params)
+        if state.hash_table is None:
+            state.hash_table = populate_hash_table_from_symbol_table(state.tabla_de_simbolos or [])
+        page = hash_table_page(state.hash_table, params.get('start', 0), params.get('count', DEFAULT_PAGE_SIZE))
+        page['document'] = params['document']
+        page['version'] = state.version
+        return page
+
+    def document_state(self, params):
+        state = self.documents.get(params['document'])
+        if state is None:
+            raise ValueError(f"Documento desconocido: {params['document']}")
+        return state
+
+    def document_references(self, params):
+        state = self.document_state(params)
+        return state, state.referencias
+
+    def handle_definition(self, request_id, params):
+        """
+        Declaración del identificador que empieza en (line, column)
+        (params: document, line, column), o null si no hay ninguno o el
+        documento tiene errores que impiden el análisis semántico.
+        """
+        state, index = self.document_references(params)
+        definition = index.definition(params['line'], params['column']) if index else None
+        return {'document': params['document'], 'version': state.version, 'definition': definition}
+
+    def handle_references(self, request_id, params):
+        """
+        Referencias del símbolo del identificador en (line, column)
+        (params: document, line, column, include_declaration opcional).
+        """
+        state, index = self.document_references(params)
+        references = []
+        if index is not None:
+            references = index.find_references(params['line'], params['column'],
+                                               params.get('include_declaration', True))
+        return {'document': params['document'], 'version': state.version, 'references': references}
+
+    def handle_close(self, request_id, params):
+        self.documents.pop(params['document'], None)
+        return {'closed': params['document']}
+
+    def handle_shutdown(self, request_id, params):
+        self.running = False
+        return {'shutdown': True}
+
+
+def main():
+    cache = None
+    if '--no-cache' not in sys.argv[1:]:
+        cache = ASTCache(CACHE_DIR, compiler_fingerprint(BASE_DIR, COMPILER_VERSION))
+    CompilerServer(cache=cache).serve()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,35 +1,362 @@
 # compiler/tabla_hash.py
+"""
+Tabla hash de símbolos (encadenamiento separado) para la vista del IDE.
+
+La clave de cada símbolo es (nombre, ámbito) y su hash es FNV-1a de 64
+bits sobre los bytes UTF-8 de ambos, de modo que nombres con las mismas
+letras en otro orden ('ab' y 'ba') no caen por fuerza en el mismo bucket.
+El número de buckets es potencia de dos y se duplica cuando el factor de
+carga supera MAX_LOAD_FACTOR (y se reduce a la mitad al bajar de
+MIN_LOAD_FACTOR tras borrar), así que las cadenas se mantienen cortas sea
+cual sea el número de símbolos. Los símbolos de cada ámbito están además
+enlazados entre sí para recorrerlos en orden de inserción.
+
+statistics() resume cómo se reparten las claves (histograma de longitudes
+de cadena, sondeo más largo, factor de carga). OpenAddressingHashTable es
+la variante con direccionamiento abierto (sondeo lineal) y las mismas
+operaciones; benchmark_tabla_hash.py compara ambas con distintas funciones
+de hash y con dict.
+"""
+from html import escape
+
+FNV_OFFSET_BASIS = 0xcbf29ce484222325
+FNV_PRIME = 0x100000001b3
+HASH_MASK = 0xffffffffffffffff
+
+DEFAULT_SIZE = 16
+MAX_LOAD_FACTOR = 0.75
+MIN_LOAD_FACTOR = 0.25
+
+# Buckets por página de la vista HTML y símbolos por página de la tabla de símbolos
+DEFAULT_PAGE_SIZE = 64
+DEFAULT_SYMBOL_PAGE_SIZE = 200
+
+
+def fnv1a(text, value=FNV_OFFSET_BASIS):
+    """Hash FNV-1a de 64 bits de una cadena, continuando desde 'value'."""
+    for byte in text.encode('utf-8'):
+        value = ((value ^ byte) * FNV_PRIME) & HASH_MASK
+    return value
+
+
+def key_hash(name, scope):
+    """Hash de la clave (nombre, ámbito); el byte nulo separa las dos partes."""
+    return fnv1a('' if scope is None else str(scope), fnv1a(name + '\0'))
+
+
+def sum_hash(name, scope):
+    """Hash original (suma de los códigos del nombre), para comparar."""
+    return sum(ord(char) for char in name)
+
+
+def builtin_hash(name, scope):
+    """Hash de Python (SipHash para las cadenas), para comparar."""
+    return hash((name, scope)) & HASH_MASK
+
+
+def _histogram(lengths):
+    """{longitud: cuántas veces aparece}, ordenado por longitud."""
+    histogram = {}
+    for length in lengths:
+        histogram[length] = histogram.get(length, 0) + 1
+    return dict(sorted(histogram.items()))
+
+
+class _Entry:
+    __slots__ = ('name', 'scope', 'hash', 'data', 'previous', 'next')
+
+    def __init__(self, name, scope, hash_value, data):
+        self.name = name
+        self.scope = scope
+        self.hash = hash_value
+        self.data = data
+        # Vecinos en la lista de su ámbito
+        self.previous = None
+        self.next = None
+
 
 class HashTable:
-    # Implementación simple de una Tabla Hash con manejo de colisiones por encadenamiento.
-    def __init__(self, size=16):
+    """Tabla hash con encadenamiento, redimensionado por factor de carga y recorrido por ámbito."""
+    def __init__(self, size=DEFAULT_SIZE, hash_function=key_hash):
+        self.size = 1
+        while self.size < max(size, 1):
+            self.size *= 2
+        self.initial_size = self.size
+        self.hash_function = hash_function
+        # La tabla es una lista de listas (buckets) de entradas
+        self.table = [[] for _ in range(self.size)]
+        self.count = 0
+        # ámbito -> [primera entrada, última entrada]
+        self.scope_lists = {}
+
+    def __len__(self):
+        return self.count
+
+    def __contains__(self, key):
+        name, scope = key
+        return self._find(name, scope) is not None
+
+    def __iter__(self):
+        """Datos de todos los símbolos, ámbito a ámbito y en orden de inserción."""
+        for scope in self.scope_lists:
+            yield from self.scope_symbols(scope)
+
+    def _find(self, name, scope):
+        hash_value = self.hash_function(name, scope)
+        for entry in self.table[hash_value & (self.size - 1)]:
+            if entry.hash == hash_value and entry.name == name and entry.scope == scope:
+                return entry
+        return None
+
+    def _resize(self, size):
+        table = [[] for _ in range(size)]
+        mask = size - 1
+        for bucket in self.table:
+            for entry in bucket:
+                table[entry.hash & mask].append(entry)
+        self.table = table
         self.size = size
-        # La tabla es una lista de listas (buckets) para manejar colisiones.
-        self.table = [[] for _ in range(size)]
-
-    def _hash(self, key):
-        # Función de hash simple para cadenas de texto.
-        return sum(ord(char) for char in key) % self.size
-
-    def insert(self, symbol_data):
-        # Inserta un símbolo en la tabla.
-        # symbol_data es un diccionario que debe contener 'name' y otros detalles.
-        key = symbol_data.get('name')
-        if not key:
-            return
-        
-        index = self._hash(key)
-        # Simplemente añade el símbolo al bucket (lista) en ese índice.
-        self.table[index].append(symbol_data)
-
-def populate_hash_table_from_symbol_table(symbol_table_scopes, hash_table_size=16):
+
+    def insert(self, symbol_data, scope=None):
+        """
+        Inserta un símbolo; symbol_data es un diccionario que debe contener
+        'name'. El ámbito de la clave es 'scope' o, si no se da,
+        symbol_data['scope']. Si la clave ya existe se sustituyen sus datos.
+        Devuelve True si el símbolo es nuevo.
+        """
+        name = symbol_data.get('name')
+        if not name:
+            return False
+        if scope is None:
+            scope = symbol_data.get('scope')
+
+        entry = self._find(name, scope)
+        if entry is not None:
+            entry.data = symbol_data
+            return False
+
+        if (self.count + 1) > self.size * MAX_LOAD_FACTOR:
+            self._resize(self.size * 2)
+        entry = _Entry(name, scope, self.hash_function(name, scope), symbol_data)
+        self.table[entry.hash & (self.size - 1)].append(entry)
+        self.count += 1
+
+        ends = self.scope_lists.get(scope)
+        if ends is None:
+            self.scope_lists[scope] = [entry, entry]
+        else:
+            entry.previous = ends[1]
+            ends[1].next = entry
+            ends[1] = entry
+        return True
+
+    def lookup(self, name, scope=None):
+        """Datos del símbolo (nombre, ámbito), o None."""
+        entry = self._find(name, scope)
+        return None if entry is None else entry.data
+
+    def update(self, name, changes, scope=None):
+        """Añade 'changes' a los datos del símbolo (nombre, ámbito); False si no existe."""
+        entry = self._find(name, scope)
+        if entry is None:
+            return False
+        entry.data.update(changes)
+        return True
+
+    def delete(self, name, scope=None):
+        """Borra el símbolo (nombre, ámbito); False si no existe."""
+        entry = self._find(name, scope)
+        if entry is None:
+            return False
+        self.table[entry.hash & (self.size - 1)].remove(entry)
+        self.count -= 1
+
+        ends = self.scope_lists[scope]
+        if entry.previous is None:
+            ends[0] = entry.next
+        else:
+            entry.previous.next = entry.next
+        if entry.next is None:
+            ends[1] = entry.previous
+        else:
+            entry.next.previous = entry.previous
+        if ends[0] is None:
+            del self.scope_lists[scope]
+
+        if self.size > self.initial_size and self.count < self.size * MIN_LOAD_FACTOR:
+            self._resize(self.size // 2)
+        return True
+
+    def scopes(self):
+        """Ámbitos con algún símbolo, en orden de su primera inserción."""
+        return list(self.scope_lists)
+
+    def scope_symbols(self, scope):
+        """Datos de los símbolos de un ámbito en orden de inserción."""
+        ends = self.scope_lists.get(scope)
+        entry = ends[0] if ends else None
+        while entry is not None:
+            yield entry.data
+            entry = entry.next
+
+    def load_factor(self):
+        return self.count / self.size
+
+    def statistics(self):
+        """
+        Reparto de las claves: histograma de longitudes de cadena ({longitud:
+        buckets}), cadena más larga (el sondeo más largo de una búsqueda),
+        sondeos medios de una búsqueda con éxito y factor de carga.
+        """
+        lengths = [len(bucket) for bucket in self.table]
+        return {
+            'size': self.size,
+            'count': self.count,
+            'load_factor': self.load_factor(),
+            'empty_buckets': lengths.count(0),
+            'chain_lengths': _histogram(lengths),
+            'max_probe_length': max(lengths, default=0),
+            # La entrada i de una cadena se encuentra en i + 1 comparaciones
+            'average_probe_length': sum(n * (n + 1) / 2 for n in lengths) / self.count if self.count else 0.0,
+        }
+
+
+# Marca de un hueco borrado en OpenAddressingHashTable: la búsqueda sigue sondeando
+_DELETED = object()
+
+
+class OpenAddressingHashTable:
+    """
+    Variante con direccionamiento abierto: las entradas están en un único
+    arreglo y una colisión se resuelve probando el hueco siguiente (sondeo
+    lineal). Los huecos borrados cuentan para el factor de carga hasta el
+    siguiente redimensionado.
+    """
+    def __init__(self, size=DEFAULT_SIZE, hash_function=key_hash):
+        self.size = 1
+        while self.size < max(size, 1):
+            self.size *= 2
+        self.hash_function = hash_function
+        self.slots = [None] * self.size
+        self.count = 0
+        # Entradas más huecos borrados
+        self.used = 0
+
+    def __len__(self):
+        return self.count
+
+    def __contains__(self, key):
+        name, scope = key
+        return self._find(name, scope, self.hash_function(name, scope))[0] is not None
+
+    def __iter__(self):
+        for entry in self.slots:
+            if entry is not None and entry is not _DELETED:
+                yield entry.data
+
+    def _find(self, name, scope, hash_value):
+        """(entrada, índice) de la clave, o (None, primer hueco libre o borrado)."""
+        mask = self.size - 1
+        index = hash_value & mask
+        free = None
+        while True:
+            entry = self.slots[index]
+            if entry is None:
+                return None, index if free is None else free
+            if entry is _DELETED:
+                if free is None:
+                    free = index
+            elif entry.hash == hash_value and entry.name == name and entry.scope == scope:
+                return entry, index
+            index = (index + 1) & mask
+
+    def _resize(self, size):
+        entries = [entry for entry in self.slots if entry is not None and entry is not _DELETED]
+        self.size = size
+        self.slots = [None] * size
+        mask = size - 1
+        for entry in entries:
+            index = entry.hash & mask
+            while self.slots[index] is not None:
+                index = (index + 1) & mask
+            self.slots[index] = entry
+        self.used = self.count
+
+    def insert(self, symbol_data, scope=None):
+        """Como HashTable.insert."""
+        name = symbol_data.get('name')
+        if not name:
+            return False
+        if scope is None:
+            scope = symbol_data.get('scope')
+
+        hash_value = self.hash_function(name, scope)
+        entry, index = self._find(name, scope, hash_value)
+        if entry is not None:
+            entry.data = symbol_data
+            return False
+
+        if (self.used + 1) > self.size * MAX_LOAD_FACTOR:
+            # Si sobran huecos borrados basta con reorganizar sin crecer
+            self._resize(self.size * 2 if (self.count + 1) > self.size * MAX_LOAD_FACTOR / 2 else self.size)
+            entry, index = self._find(name, scope, hash_value)
+        if self.slots[index] is None:
+            self.used += 1
+        self.slots[index] = _Entry(name, scope, hash_value, symbol_data)
+        self.count += 1
+        return True
+
+    def lookup(self, name, scope=None):
+        entry = self._find(name, scope, self.hash_function(name, scope))[0]
+        return None if entry is None else entry.data
+
+    def update(self, name, changes, scope=None):
+        entry = self._find(name, scope, self.hash_function(name, scope))[0]
+        if entry is None:
+            return False
+        entry.data.update(changes)
+        return True
+
+    def delete(self, name, scope=None):
+        entry, index = self._find(name, scope, self.hash_function(name, scope))
+        if entry is None:
+            return False
+        self.slots[index] = _DELETED
+        self.count -= 1
+        return True
+
+    def load_factor(self):
+        return self.count / self.size
+
+    def statistics(self):
+        """Como HashTable.statistics, con las longitudes de sondeo de cada entrada."""
+        mask = self.size - 1
+        probes = [
+            ((index - entry.hash) & mask) + 1
+            for index, entry in enumerate(self.slots)
+            if entry is not None and entry is not _DELETED
+        ]
+        return {
+            'size': self.size,
+            'count': self.count,
+            'load_factor': self.load_factor(),
+            'deleted_slots': self.used - self.count,
+            'probe_lengths': _histogram(probes),
+            'max_probe_length': max(probes, default=0),
+            'average_probe_length': sum(probes) / self.count if self.count else 0.0,
+        }
+
+def populate_hash_table_from_symbol_table(symbol_table_scopes, hash_table_size=DEFAULT_SIZE):
     """
     Toma la tabla de símbolos por ámbitos y la inserta en una Tabla Hash.
+    Cada diccionario del historial es un ámbito distinto aunque se llame
+    igual que otro (dos bloques 'if' de main), así que la clave usa su
+    posición en la lista; el nombre del ámbito va en los datos.
     """
     hash_table = HashTable(size=hash_table_size)
     
     # Iterar sobre cada diccionario de ámbito en la lista
-    for scope in symbol_table_scopes:
+    for scope_index, scope in enumerate(symbol_table_scopes):
         # Iterar sobre cada símbolo en el ámbito
         for name, details in scope.items():
             if name == '__name__':
@@ -44,50 +371,101 @@ def populate_hash_table_from_symbol_table(symbol_table_scopes, hash_table_size=1
                 'column': details.get('column'),
                 'value': details.get('value'), 
             }
-            hash_table.insert(symbol_data)
+            hash_table.insert(symbol_data, scope=scope_index)
             
     return hash_table
 
-def hash_table_to_html(hash_table):
-    # Convierte la estructura de la Tabla Hash a una tabla HTML.
-    html = '<table class="hash-table">'
-    html += '<thead><tr><th class="ht-header">Índice</th><th class="ht-header">Símbolo (Variable)</th><th class="ht-header">Datos (Tipo, Ámbito, Memoria...)</th></tr></thead>'
-    html += '<tbody>'
-
-    for index, bucket in enumerate(hash_table.table):
+def _bucket_rows(hash_table, start, stop):
+    """Filas HTML de los buckets [start, stop); cada tramo de buckets vacíos es una sola fila."""
+    rows = []
+    index = start
+    while index < stop:
+        bucket = hash_table.table[index]
         if not bucket:
-            # Si el bucket está vacío, mostrar una fila vacía
-            html += f'<tr><td class="ht-cell ht-cell-index">{index}</td><td class="ht-cell">-</td><td class="ht-cell">-</td></tr>'
-        else:
-            # Si hay elementos, usar rowspan para el índice
-            is_collision = len(bucket) > 1
-            first_entry = True
-            for i, symbol in enumerate(bucket):
-                row_class = "collision-row" if is_collision else ""
-                html += f'<tr class="{row_class}">'
-                
-                if first_entry:
-                    html += f'<td class="ht-cell ht-cell-index" rowspan="{len(bucket)}">{index}</td>'
-                    first_entry = False
-                
-                # Formatear los datos del símbolo
-                symbol_name = symbol.get('name', 'N/A')
-                
-                symbol_value = symbol.get('value')
-                
-                if symbol_value is None:
-                    symbol_value = 'N/A'   
-
-                symbol_details = (
-                    f"<b>Tipo:</b> {symbol.get('type', '?')} <br>"
-                    f"<b>Ámbito:</b> {symbol.get('scope', '?')} <br>"
-                    f"<b>Valor Inicial:</b> {symbol_value} <br>" 
-                    f"<b>Pos:</b> L{symbol.get('line', '?')}, C{symbol.get('column', '?')}"
-                )
-                
-                html += f'<td class="ht-cell ht-cell-name">{symbol_name}</td>'
-                html += f'<td class="ht-cell ht-cell-details">{symbol_details}</td>'
-                html += '</tr>'
-
-    html += '</tbody></table>'
-    return html
\ No newline at end of file
+            # Resumir los buckets vacíos consecutivos
+            end = index + 1
+            while end < stop and not hash_table.table[end]:
+                end += 1
+            label = str(index) if end - index == 1 else f'{index}–{end - 1}'
+            rows.append(f'<tr class="empty-row"><td class="ht-cell ht-cell-index">{label}</td>'
+                        f'<td class="ht-cell">-</td><td class="ht-cell">-</td></tr>')
+            index = end
+            continue
+
+        # Si hay elementos, usar rowspan para el índice
+        row_class = "collision-row" if len(bucket) > 1 else ""
+        for position, entry in enumerate(bucket):
+            symbol = entry.data
+            rows.append(f'<tr class="{row_class}">')
+            if position == 0:
+                rows.append(f'<td class="ht-cell ht-cell-index" rowspan="{len(bucket)}">{index}</td>')
+
+            symbol_value = symbol.get('value')
+            if symbol_value is None:
+                symbol_value = 'N/A'
+
+            # Formatear los datos del símbolo (el valor inicial puede ser una cadena con '<')
+            symbol_details = (
+                f"<b>Tipo:</b> {symbol.get('type', '?')} <br>"
+                f"<b>Ámbito:</b> {symbol.get('scope', '?')} <br>"
+                f"<b>Valor Inicial:</b> {escape(str(symbol_value))} <br>"
+                f"<b>Pos:</b> L{symbol.get('line', '?')}, C{symbol.get('column', '?')}"
+            )
+            rows.append(f'<td class="ht-cell ht-cell-name">{symbol.get("name", "N/A")}</td>')
+            rows.append(f'<td class="ht-cell ht-cell-details">{symbol_details}</td>')
+            rows.append('</tr>')
+        index += 1
+    return rows
+
+def hash_table_to_html(hash_table, start=0, count=None):
+    """
+    Convierte la Tabla Hash (o los 'count' buckets desde 'start') a una
+    tabla HTML. Las partes se unen al final en lugar de concatenarse.
+    """
+    stop = hash_table.size if count is None else min(start + count, hash_table.size)
+    parts = [
+        '<table class="hash-table">',
+        '<thead><tr><th class="ht-header">Índice</th><th class="ht-header">Símbolo (Variable)</th><th class="ht-header">Datos (Tipo, Ámbito, Memoria...)</th></tr></thead>',
+        '<tbody>',
+    ]
+    parts.extend(_bucket_rows(hash_table, max(start, 0), stop))
+    parts.append('</tbody></table>')
+    return ''.join(parts)
+
+def hash_table_page(hash_table, start=0, count=DEFAULT_PAGE_SIZE):
+    """Página de la vista: HTML de un tramo de buckets y lo necesario para pedir los demás."""
+    start = min(max(start, 0), hash_table.size)
+    count = min(count, hash_table.size - start)
+    return {
+        'html': hash_table_to_html(hash_table, start, count),
+        'start': start,
+        'count': count,
+        'size': hash_table.size,
+        'symbols': len(hash_table),
+    }
+
+def symbol_table_page(symbol_table_scopes, start=0, count=DEFAULT_SYMBOL_PAGE_SIZE):
+    """
+    Los símbolos [start, start + count) de la tabla de símbolos (contados
+    en orden, ámbito a ámbito), con el mismo formato: una lista de
+    diccionarios de ámbito con su '__name__'. Un ámbito partido entre dos
+    páginas aparece en ambas; los ámbitos sin símbolos se omiten.
+    Devuelve (ámbitos de la página, total de símbolos).
+    """
+    scopes = []
+    total = 0
+    stop = start + count
+    for scope in symbol_table_scopes:
+        size = len(scope) - ('__name__' in scope)
+        if total < stop and total + size > start:
+            page_scope = {'__name__': scope.get('__name__')}
+            position = total
+            for name, details in scope.items():
+                if name == '__name__':
+                    continue
+                if start <= position < stop:
+                    page_scope[name] = details
+                position += 1
+            scopes.append(page_scope)
+        total += size
+    return scopes, total
@@ -0,0 +1,110 @@
+# tipos.py
+"""
+Tipos del lenguaje y tablas de compatibilidad precalculadas.
+
+Los tipos son cadenas internadas (así siguen siendo válidos como anotaciones
+del AST, en JSON y en la caché) y todas las reglas se precalculan en tablas:
+comprobar una operación o una asignación es una sola búsqueda en un
+diccionario. El analizador semántico y el generador de código leen estas
+mismas tablas, de modo que no pueden divergir.
+"""
+import sys
+
+INT = sys.intern('int')
+FLOAT = sys.intern('float')
+STRING = sys.intern('string')
+BOOLEAN = sys.intern('boolean')
+VOID = sys.intern('void')
+# Tipos internos del análisis semántico
+ERROR = sys.intern('error_type')
+FUNCTION = sys.intern('function_type')
+
+NUMERIC_TYPES = (INT, FLOAT)
+# Tipos escalares en el código generado (boolean es un entero de 1 bit)
+SCALAR_TYPES = (INT, FLOAT, BOOLEAN)
+
+ARITHMETIC_OPERATORS = ('+', '-', '*', '/', '%')
+COMPARISON_OPERATORS = ('<', '<=', '>', '>=', '==', '!=')
+LOGICAL_OPERATORS = ('&&', '||')
+
+# Clase de cada operador binario (para elegir el mensaje de error)
+ARITHMETIC = 'arithmetic'
+COMPARISON = 'comparison'
+LOGICAL = 'logical'
+OPERATOR_KIND = {}
+OPERATOR_KIND.update((op, ARITHMETIC) for op in ARITHMETIC_OPERATORS)
+OPERATOR_KIND.update((op, COMPARISON) for op in COMPARISON_OPERATORS)
+OPERATOR_KIND.update((op, LOGICAL) for op in LOGICAL_OPERATORS)
+
+
+def _build_numeric_promotion():
+    """(izquierdo, derecho) -> tipo al que se promueven ambos operandos."""
+    table = {}
+    for left in SCALAR_TYPES:
+        for right in SCALAR_TYPES:
+            table[(left, right)] = FLOAT if FLOAT in (left, right) else INT
+    return table
+
+# Promoción numérica: int (o boolean) se convierte a float si el otro es float
+NUMERIC_PROMOTION = _build_numeric_promotion()
+
+
+def _build_binary_result():
+    """(operador, izquierdo, derecho) -> tipo del resultado. Ausente = error."""
+    table = {}
+    for left in NUMERIC_TYPES:
+        for right in NUMERIC_TYPES:
+            for op in ARITHMETIC_OPERATORS:
+                table[(op, left, right)] = NUMERIC_PROMOTION[(left, right)]
+            for op in COMPARISON_OPERATORS:
+                table[(op, left, right)] = BOOLEAN
+
+    # Concatenación: string + string, string + número y número + string
+    table[('+', STRING, STRING)] = STRING
+    for numeric in NUMERIC_TYPES:
+        table[('+', STRING, numeric)] = STRING
+        table[('+', numeric, STRING)] = STRING
+
+    for op in ('==', '!='):
+        table[(op, STRING, STRING)] = BOOLEAN
+
+    for left in SCALAR_TYPES:
+        for right in SCALAR_TYPES:
+            for op in LOGICAL_OPERATORS:
+                table[(op, left, right)] = BOOLEAN
+    return table
+
+BINARY_RESULT = _build_binary_result()
+
+# (operador, operando) -> tipo del resultado. Ausente = error.
+UNARY_RESULT = {('!', operand): BOOLEAN for operand in SCALAR_TYPES}
+UNARY_RESULT.update((('-', operand), operand) for operand in NUMERIC_TYPES)
+
+# Tipos válidos como condición de if/while/do-until/for (error_type ya se reportó)
+CONDITION_TYPES = frozenset(SCALAR_TYPES + (ERROR,))
+
+# Tipo destino -> tipos que se le pueden asignar (en orden, para los mensajes)
+ACCEPTED_SOURCES = {
+    FLOAT: (FLOAT, INT),
+    INT: (INT,),
+    STRING: (STRING,),
+}
+
+ASSIGNABLE = {(target, source): True for target, sources in ACCEPTED_SOURCES.items() for source in sources}
+
+# Descripción de lo que acepta cada tipo destino ("'float' o 'int'")
+ACCEPTED_DESCRIPTION = {
+    target: " o ".join(f"'{source}'" for source in sources)
+    for target, sources in ACCEPTED_SOURCES.items()
+}
+
+
+def is_assignable(target, source):
+    """
+    Indica si un valor de tipo 'source' puede asignarse (o pasarse, o
+    retornarse) donde se espera 'target'. Los destinos sin reglas propias
+    no se comprueban.
+    """
+    if target in ACCEPTED_SOURCES:
+        return (target, source) in ASSIGNABLE
+    return True
@@ -0,0 +1,164 @@
+# tokens_semanticos.py
+"""
+Tokens semánticos para el resaltado del editor (al estilo de LSP).
+
+El coloreado léxico solo distingue clases de token; con las anotaciones
+del análisis semántico (data_type, state) y el índice de referencias
+cruzadas se puede distinguir cada nombre: variable, parámetro o función,
+su tipo, si es global, si se declara o se modifica ahí y si la declaración
+no se usa nunca.
+
+Cada token son cinco enteros, relativos al anterior como en LSP:
+  línea - línea anterior, columna (relativa a la anterior si están en la
+  misma línea), longitud, índice en TOKEN_TYPES y máscara de TOKEN_MODIFIERS.
+Con la codificación relativa, editar una función solo cambia los números
+de sus tokens y del primero que la sigue, y token_edits() envía solo eso.
+
+Los tokens de cada función (y de main) se guardan en SemanticTokenCache: el
+análisis incremental reutiliza el mismo subárbol para las funciones que no
+cambiaron, y para esas no hace falta volver a recorrerlo.
+"""
+from analizador_sintactico import ASTNodeType
+from tipos import INT, FLOAT, STRING, BOOLEAN
+
+TOKEN_TYPES = ('variable', 'parameter', 'function')
+TOKEN_MODIFIERS = ('declaration', 'modification', 'global', 'unused', INT, FLOAT, STRING, BOOLEAN)
+
+_TYPE_INDEX = {name: index for index, name in enumerate(TOKEN_TYPES)}
+_MODIFIER_BIT = {name: 1 << index for index, name in enumerate(TOKEN_MODIFIERS)}
+_DECLARATION = _MODIFIER_BIT['declaration']
+_UNUSED = _MODIFIER_BIT['unused']
+
+# Nombre del ámbito global en las claves del índice de referencias
+GLOBAL_SCOPE_NAME = 'global'
+
+# Nodos cuya posición es la de un nombre
+NAME_NODES = (ASTNodeType.IDENTIFIER, ASTNodeType.PARAMETER,
+              ASTNodeType.FUNCTION_DECLARATION, ASTNodeType.FUNCTION_CALL)
+# Declaraciones de nivel superior cuyos tokens se guardan entre compilaciones
+CACHED_UNITS = (ASTNodeType.FUNCTION_DECLARATION, ASTNodeType.MAIN)
+
+
+def declaration_tokens(node, index):
+    """
+    Tokens (línea, columna, longitud, tipo, modificadores) de una
+    declaración de nivel superior, en orden de posición. No incluyen el
+    modificador 'unused', que depende del resto del programa.
+    """
+    found = {}
+    parameters = set()
+    pending = [node]
+    while pending:
+        current = pending.pop()
+        if current is None:
+            continue
+        pending.extend(current.children)
+        if current.type not in NAME_NODES or current.line is None or current.column is None:
+            continue
+        position = (current.line, current.column)
+        key = index.declaration_at(*position)
+        # Nombres sin resolver (o sin analizar): sin token
+        if key is None or position in found:
+            continue
+        if current.type == ASTNodeType.PARAMETER:
+            parameters.add(key)
+
+        modifiers = 0
+        if position == key[2:]:
+            modifiers |= _DECLARATION
+        if current.state == 'modificado':
+            modifiers |= _MODIFIER_BIT['modification']
+        if key[1] == GLOBAL_SCOPE_NAME:
+            modifiers |= _MODIFIER_BIT['global']
+        # Tipo declarado (el de retorno para las funciones)
+        symbol_type = index.declarations.get(key)
+        if symbol_type == 'function':
+            symbol_type = current.data_type
+        modifiers |= _MODIFIER_BIT.get(symbol_type, 0)
+        found[position] = (key, len(current.value), modifiers)
+
+    tokens = []
+    for position in sorted(found):
+        key, length, modifiers = found[position]
+        if index.declarations.get(key) == 'function':
+            token_type = 'function'
+        elif key in parameters:
+            token_type = 'parameter'
+        else:
+            token_type = 'variable'
+        tokens.append((position[0], position[1], length, _TYPE_INDEX[token_type], modifiers))
+    return tokens
+
+
+def encode(tokens):
+    """Codificación relativa de LSP de tokens absolutos ordenados por posición."""
+    data = []
+    previous_line = previous_column = 0
+    for line, column, length, token_type, modifiers in tokens:
+        delta_line = line - previous_line
+        delta_column = column - previous_column if delta_line == 0 else column - 1
+        data.extend((delta_line, delta_column, length, token_type, modifiers))
+        previous_line, previous_column = line, column
+    return data
+
+
+def token_edits(previous, current):
+    """
+    Ediciones que transforman 'previous' en 'current' (listas de enteros
+    codificadas): como mucho una, {start, delete_count, data}, que sustituye
+    lo que queda entre el prefijo y el sufijo comunes.
+    """
+    prefix = 0
+    limit = min(len(previous), len(current))
+    while prefix < limit and previous[prefix] == current[prefix]:
+        prefix += 1
+    suffix = 0
+    limit -= prefix
+    while suffix < limit and previous[-1 - suffix] == current[-1 - suffix]:
+        suffix += 1
+    if prefix == len(previous) == len(current):
+        return []
+    return [{
+        'start': prefix,
+        'delete_count': len(previous) - prefix - suffix,
+        'data': current[prefix:len(current) - suffix],
+    }]
+
+
+class SemanticTokenCache:
+    """Tokens de cada función de un documento entre compilaciones."""
+    def __init__(self):
+        # id(nodo de la unidad) -> (nodo, tokens); se guarda el nodo para
+        # que su id no pueda reutilizarse mientras está en la caché
+        self.units = {}
+        # Estadísticas del último cálculo
+        self.reused = 0
+        self.computed = 0
+
+    def compute(self, program, index):
+        """Tokens semánticos codificados de un programa ya analizado."""
+        self.reused = 0
+        self.computed = 0
+        units = {}
+        tokens = []
+        for child in (program.children if program is not None else ()):
+            if child is None:
+                continue
+            cached = self.units.get(id(child))
+            if cached is not None and cached[0] is child:
+                unit_tokens = cached[1]
+                self.reused += 1
+            else:
+                unit_tokens = declaration_tokens(child, index)
+                self.computed += 1
+            if child.type in CACHED_UNITS:
+                units[id(child)] = (child, unit_tokens)
+            tokens.extend(unit_tokens)
+        self.units = units
+
+        # Una declaración sin referencias se marca como no usada
+        references = index.references
+        for position, (line, column, length, token_type, modifiers) in enumerate(tokens):
+            if modifiers & _DECLARATION and not references.get(index.declaration_at(line, column)):
+                tokens[position] = (line, column, length, token_type, modifiers | _UNUSED)
+        return encode(tokens)
@@ -0,0 +1,100 @@
+# visitante.py
+import time
+
+from analizador_sintactico import ASTNodeType
+
+
+class ASTVisitor:
+    """
+    Base de los recorridos del AST (análisis semántico, generación de código).
+
+    La tabla de despacho (valor de ASTNodeType -> método visit_<tipo>) se
+    construye una sola vez por clase, al definirla, así que visit() no
+    formatea nombres ni hace getattr por cada nodo. Se indexa por _value_
+    porque el hash de un miembro de Enum se calcula en Python y es lento.
+    Los tipos sin método propio usan generic_visit.
+
+    Las subclases pueden redefinir pre_visit(node) y post_visit(node, result);
+    solo en ese caso se usa el recorrido con hooks. Con profile=True se mide
+    el número de visitas y el tiempo (total y propio) por tipo de nodo.
+    """
+    _dispatch = {}
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls._dispatch = {
+            node_type._value_: getattr(cls, f'visit_{node_type.name.lower()}', cls.generic_visit)
+            for node_type in ASTNodeType
+        }
+
+    def __init__(self, profile=False):
+        cls = type(self)
+        if cls.pre_visit is not ASTVisitor.pre_visit or cls.post_visit is not ASTVisitor.post_visit:
+            self.visit = self._visit_with_hooks
+
+        # Estadísticas por tipo de nodo: [visitas, tiempo total, tiempo propio]
+        self.profile = None
+        if profile:
+            self.profile = {}
+            # Tiempo de los hijos acumulado en cada nivel del recorrido
+            self._child_time = [0.0]
+            self._unprofiled_visit = self.visit
+            self.visit = self._visit_profiled
+
+    def visit(self, node):
+        if not node:
+            return None
+        return self._dispatch[node.type._value_](self, node)
+
+    def generic_visit(self, node):
+        for child in node.children:
+            self.visit(child)
+
+    # --- Hooks ---
+
+    def pre_visit(self, node):
+        """Se llama antes de visitar cada nodo (si la subclase lo redefine)."""
+
+    def post_visit(self, node, result):
+        """Se llama tras visitar cada nodo con su resultado (si la subclase lo redefine)."""
+
+    def _visit_with_hooks(self, node):
+        if not node:
+            return None
+        self.pre_visit(node)
+        # type(self).visit conserva la lógica propia de la subclase
+        result = type(self).visit(self, node)
+        self.post_visit(node, result)
+        return result
+
+    # --- Perfilado ---
+
+    def _visit_profiled(self, node):
+        if not node:
+            return None
+        self._child_time.append(0.0)
+        start = time.perf_counter()
+        try:
+            return self._unprofiled_visit(node)
+        finally:
+            elapsed = time.perf_counter() - start
+            children_time = self._child_time.pop()
+            self._child_time[-1] += elapsed
+
+            stats = self.profile.get(node.type)
+            if stats is None:
+                stats = self.profile[node.type] = [0, 0.0, 0.0]
+            stats[0] += 1
+            stats[1] += elapsed
+            stats[2] += elapsed - children_time
+
+    def profile_report(self):
+        """Estadísticas por tipo de nodo, de mayor a menor tiempo propio."""
+        if self.profile is None:
+            return []
+        rows = [
+            {'node_type': node_type.name, 'visits': visits, 'total_time': total, 'self_time': own}
+            for node_type, (visits, total, own) in self.profile.items()
+        ]
+        rows.sort(key=lambda row: row['self_time'], reverse=True)
+        return rows
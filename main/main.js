@@ -17,7 +17,10 @@ try {
             callback({
                 error: 'No se pudo cargar el módulo Python Handler: ' + error.message
             });
-        }
+        },
+        solicitar: async () => ({
+            error: 'No se pudo cargar el módulo Python Handler: ' + error.message
+        })
     };
 }
 
@@ -122,6 +125,23 @@ ipcMain.handle('python:compile', async (event, code, runMode) => {
     });
 });
 
+// Peticiones al servidor persistente del compilador (compilación
+// incremental con diferencias del AST, exportación del grafo...)
+ipcMain.handle('python:request', async (event, method, params) => {
+    try {
+        const respuesta = await pythonHandler.solicitar(method, params);
+        if (respuesta.error) {
+            return { success: false, error: respuesta.error };
+        }
+        return { success: true, ...respuesta.result };
+    } catch (error) {
+        return {
+            success: false,
+            error: `Error al comunicarse con el servidor del compilador: ${error.message}`
+        };
+    }
+});
+
 app.whenReady().then(() => {
     createWindow();
 
@@ -132,6 +152,12 @@ app.whenReady().then(() => {
     });
 });
 
+app.on('will-quit', () => {
+    if (pythonHandler.detenerServidor) {
+        pythonHandler.detenerServidor();
+    }
+});
+
 app.on('window-all-closed', () => {
     if (process.platform !== 'darwin') {
         app.quit();
@@ -1,4 +1,4 @@
-const { exec } = require('child_process');
+const { exec, spawn } = require('child_process');
 const path = require('path');
 const fs = require('fs');
 const os = require('os');
@@ -68,4 +68,78 @@ function compilar(codigo, runMode, callback) {
     });
 }
 
-module.exports = { compilar };
\ No newline at end of file
+// --- Servidor del compilador (proceso persistente) ---
+// Conserva el AST de cada documento entre compilaciones y responde con
+// diferencias, así que las actualizaciones de los paneles son incrementales.
+
+let servidor = null;
+let siguienteId = 1;
+const pendientes = new Map();
+
+function iniciarServidor() {
+    if (servidor) {
+        return servidor;
+    }
+
+    const servidorPath = path.join(__dirname, '..', '..', 'compiler', 'servidor.py');
+    const pythonCommand = process.platform === 'win32' ? 'python' : 'python3';
+    servidor = spawn(pythonCommand, [servidorPath], { stdio: ['pipe', 'pipe', 'pipe'] });
+
+    // Las respuestas llegan como JSON, una por línea
+    let buffer = '';
+    servidor.stdout.on('data', (chunk) => {
+        buffer += chunk.toString();
+        let salto;
+        while ((salto = buffer.indexOf('\n')) >= 0) {
+            const linea = buffer.slice(0, salto);
+            buffer = buffer.slice(salto + 1);
+            if (!linea.trim()) {
+                continue;
+            }
+            try {
+                const respuesta = JSON.parse(linea);
+                const pendiente = pendientes.get(respuesta.id);
+                if (pendiente) {
+                    pendientes.delete(respuesta.id);
+                    pendiente(respuesta);
+                }
+            } catch (parseError) {
+                console.error('Error parseando respuesta del servidor:', { parseError, linea });
+            }
+        }
+    });
+
+    servidor.stderr.on('data', (chunk) => {
+        console.error('Servidor Python:', chunk.toString());
+    });
+
+    servidor.on('close', (code) => {
+        console.error('El servidor Python terminó con código:', code);
+        servidor = null;
+        // Rechazar las peticiones que quedaron sin respuesta
+        for (const pendiente of pendientes.values()) {
+            pendiente({ error: 'El servidor del compilador se cerró inesperadamente' });
+        }
+        pendientes.clear();
+    });
+
+    return servidor;
+}
+
+function solicitar(method, params) {
+    return new Promise((resolve) => {
+        const proceso = iniciarServidor();
+        const id = siguienteId++;
+        pendientes.set(id, resolve);
+        proceso.stdin.write(JSON.stringify({ id, method, params }) + '\n');
+    });
+}
+
+function detenerServidor() {
+    if (servidor) {
+        servidor.stdin.write(JSON.stringify({ id: 0, method: 'shutdown', params: {} }) + '\n');
+        servidor.stdin.end();
+    }
+}
+
+module.exports = { compilar, solicitar, detenerServidor };
\ No newline at end of file
@@ -16,4 +16,5 @@ contextBridge.exposeInMainWorld('nodeAPI', {
 
 contextBridge.exposeInMainWorld('compilerAPI', {
     compile: (code, runMode) => ipcRenderer.invoke('python:compile', code, runMode),
+    request: (method, params) => ipcRenderer.invoke('python:request', method, params),
 });
\ No newline at end of file